@@ -0,0 +1,87 @@
+"""Benchmark boolean time and peak memory for a large array of grating teeth.
+
+Operand A is an array of `n` grating teeth, operand B a few rectangles that
+cover part of the array. Each mode runs in its own process so peak RSS
+measurements do not interfere:
+
+- flat: boolean(hierarchical=False), flattens all the polygons.
+- hierarchical: boolean(hierarchical=True), evaluates each cell once.
+- hierarchical_tiled: hierarchical with num_divisions=(4, 4) and one worker per CPU.
+
+Run it with `python benchmarks/benchmark_boolean.py [n]`
+"""
+from __future__ import annotations
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+modes = ("flat", "hierarchical", "hierarchical_tiled")
+
+
+def get_peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def operands(n: int = 100_000):
+    import gdsfactory as gf
+
+    tooth = gf.components.rectangle(size=(0.3, 10), layer=(1, 0))
+    columns = int(n**0.5)
+    A = gf.Component("teeth")
+    A.add_ref(tooth, columns=columns, rows=n // columns, spacing=(0.6, 12))
+
+    B = gf.Component("windows")
+    for i in range(3):
+        window = B << gf.components.rectangle(size=(20, 50), layer=(1, 0))
+        window.move((i * columns * 0.2, 5))
+    return A, B
+
+
+def run_mode(mode: str, n: int) -> dict:
+    import gdsfactory as gf
+
+    A, B = operands(n)
+    rss_before = get_peak_rss_mb()
+
+    t0 = time.perf_counter()
+    c = gf.geometry.boolean(
+        A,
+        B,
+        operation="not",
+        hierarchical=mode != "flat",
+        num_divisions=(4, 4) if mode == "hierarchical_tiled" else (1, 1),
+        workers=os.cpu_count() if mode == "hierarchical_tiled" else 1,
+    )
+    boolean_time = time.perf_counter() - t0
+
+    return dict(
+        mode=mode,
+        teeth=n,
+        boolean_time=boolean_time,
+        polygons=len(c.polygons),
+        peak_rss_before_mb=rss_before,
+        peak_rss_mb=get_peak_rss_mb(),
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps(run_mode(sys.argv[2], int(sys.argv[1]))))
+        sys.exit()
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for mode in modes:
+        output = subprocess.check_output(
+            [sys.executable, __file__, str(n), mode], stderr=subprocess.DEVNULL
+        )
+        r = json.loads(output.decode().strip().splitlines()[-1])
+        print(
+            f"{r['mode']:20s} boolean {r['boolean_time']:7.2f}s  "
+            f"polygons {r['polygons']:8d}  "
+            f"peak RSS before/after {r['peak_rss_before_mb']:8.1f}/"
+            f"{r['peak_rss_mb']:8.1f} MB"
+        )
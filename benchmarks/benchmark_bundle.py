@@ -0,0 +1,57 @@
+"""Benchmark get_bundle for 64, 256 and 1024 wide bundles.
+
+Each bundle fans out `n` ports spaced 5 um into `n` ports spaced 10 um, far
+enough away that every route fits without collisions. Reports the best total
+time of a few repeats and, from the RoutingContext counters of that run:
+
+- waypoints: time spent computing the Manhattan waypoints of all the routes.
+- geometry: time spent placing the bends and straights of all the routes.
+
+Run it with `python benchmarks/benchmark_bundle.py [n ...]`
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import gdsfactory as gf
+from gdsfactory.port import Port
+from gdsfactory.routing import RoutingContext
+
+
+def bundle_ports(n: int = 256) -> Tuple[List[Port], List[Port]]:
+    ports1 = [Port(f"a{i}", 90, (i * 5.0, 0), 0.5, (1, 0)) for i in range(n)]
+    ports2 = [
+        Port(f"b{i}", 270, (i * 10.0 + 100, n * 5.0 + 200), 0.5, (1, 0))
+        for i in range(n)
+    ]
+    return ports1, ports2
+
+
+def run(n: int = 256, repeat: int = 3) -> Dict[str, float]:
+    ports1, ports2 = bundle_ports(n)
+    gf.routing.get_bundle(ports1, ports2, cross_section="strip")
+
+    results = {}
+    for _ in range(repeat):
+        context = RoutingContext(cross_section="strip")
+        t0 = time.perf_counter()
+        gf.routing.get_bundle(ports1, ports2, context=context)
+        total = time.perf_counter() - t0
+        if not results or total < results["total"]:
+            results = dict(
+                waypoints=context.waypoint_time,
+                geometry=context.geometry_time,
+                total=total,
+            )
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [64, 256, 1024]
+    for n in sizes:
+        timings = " ".join(
+            f"{benchmark} {value * 1e3:8.2f} ms" for benchmark, value in run(n).items()
+        )
+        print(f"{n:5d} routes: {timings}")
@@ -0,0 +1,53 @@
+"""Microbenchmark for the @cell decorator (cell_without_validator).
+
+Reports calls per second for:
+
+- hit: same arguments, component returned from CACHE.
+- hit_partial: cross_section partial argument, returned from CACHE.
+- hit_slow: dict argument that can not be fingerprinted, returned from CACHE.
+- miss: new arguments every call, component is built.
+
+Run it with `python benchmarks/benchmark_cell.py`
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict
+
+import gdsfactory as gf
+from gdsfactory.cell import cell_without_validator
+from gdsfactory.component import Component
+
+
+@cell_without_validator
+def dummy(length: float = 3, width: float = 0.5, info_dict=None) -> Component:
+    c = Component()
+    c.add_polygon([(0, 0), (length, 0), (length, width), (0, width)], layer=(1, 0))
+    return c
+
+
+def calls_per_second(function: Callable, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        function(i)
+    return n / (time.perf_counter() - t0)
+
+
+def run(n: int = 20000) -> Dict[str, float]:
+    xs = gf.partial(gf.cross_section.strip, width=0.6)
+    gf.clear_cache()
+    results = dict(
+        hit=calls_per_second(lambda i: dummy(length=10), n),
+        hit_partial=calls_per_second(
+            lambda i: gf.components.straight(length=10, cross_section=xs), n
+        ),
+        hit_slow=calls_per_second(lambda i: dummy(info_dict={"a": 1}), n),
+        miss=calls_per_second(lambda i: dummy(length=i + 0.5), n // 10),
+    )
+    gf.clear_cache()
+    return results
+
+
+if __name__ == "__main__":
+    for benchmark, value in run().items():
+        print(f"{benchmark:12s} {value:12.0f} calls/s")
@@ -0,0 +1,50 @@
+"""Benchmark path extrusion for cross-sections with many sections.
+
+Reports the best time per call for:
+
+- extrude: extrude a path, without the @cell cache.
+- extrude_cached: extrude the same path again, returned from the @cell cache.
+- straight_cached: straight component, returned from the @cell cache.
+
+Run it with `python benchmarks/benchmark_extrude.py`
+"""
+from __future__ import annotations
+
+import timeit
+from typing import Callable, Dict
+
+import gdsfactory as gf
+
+cross_sections = ("strip", "pn", "rib_heater_doped_via_stack")
+
+
+def best_time(function: Callable, number: int = 20, repeat: int = 7) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    results = {}
+    paths = dict(
+        straight=gf.path.straight(length=10),
+        euler=gf.path.euler(radius=10, npoints=720),
+    )
+    extrude = gf.path.extrude.__wrapped__
+    for name in cross_sections:
+        x = gf.get_cross_section(name)
+        for path_name, p in paths.items():
+            results[f"{name} {path_name}"] = dict(
+                extrude=best_time(lambda: extrude(p, x)),
+                extrude_cached=best_time(lambda: gf.path.extrude(p, x)),
+            )
+        results[f"{name} straight"]["straight_cached"] = best_time(
+            lambda: gf.components.straight(length=10, cross_section=name)
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for benchmark, times in run().items():
+        print(
+            f"{benchmark:36s} "
+            + "  ".join(f"{key} {value * 1e3:7.3f} ms" for key, value in times.items())
+        )
@@ -0,0 +1,54 @@
+"""Benchmark xor_polygons for a large array with a local change.
+
+Operand A is an `n` x `n` array of rings, operand B the same array with one
+ring replaced by a larger one. Reports the XOR time and the number of XOR
+polygons of each mode:
+
+- flat: one XOR per layer over all the polygons.
+- tiled: num_divisions=(16, 16), skipping the tiles with the same polygons.
+- tiled_parallel: tiled with one worker per CPU.
+
+Run it with `python benchmarks/benchmark_gdsdiff.py [n]`
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import gdsfactory as gf
+from gdsfactory.gdsdiff.gdsdiff import xor_polygons
+
+modes = {
+    "flat": dict(num_divisions=(1, 1), workers=1),
+    "tiled": dict(num_divisions=(16, 16), workers=1),
+    "tiled_parallel": dict(num_divisions=(16, 16), workers=os.cpu_count() or 1),
+}
+
+
+def operands(n: int = 10):
+    ring = gf.components.ring(radius=10, width=0.5)
+    A = gf.Component("rings_a")
+    B = gf.Component("rings_b")
+    for i in range(n):
+        for j in range(n):
+            A.add_ref(ring).move((i * 30, j * 30))
+            if (i, j) == (n // 2, n // 2):
+                B.add_ref(gf.components.ring(radius=10.5, width=0.5)).move(
+                    (i * 30, j * 30)
+                )
+            else:
+                B.add_ref(ring).move((i * 30, j * 30))
+    return A.flatten(), B.flatten()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    A, B = operands(n)
+    for mode, settings in modes.items():
+        t0 = time.perf_counter()
+        c = xor_polygons(A, B, hash_geometry=False, **settings)
+        print(
+            f"{mode:16s} xor {time.perf_counter() - t0:7.2f}s  "
+            f"polygons {len(c.polygons):6d}"
+        )
@@ -0,0 +1,59 @@
+"""Benchmark `import gdsfactory` with `python -X importtime`.
+
+Each run imports gdsfactory in a new process. Reports:
+
+- the best total import time of gdsfactory over the runs.
+- the modules with the largest cumulative import time in the best run.
+- the lazy gdsfactory subpackages (components, routing, pdk ...) that were
+  imported anyway. Exits with 1 if any, as they should load on first access.
+
+Run it with `python benchmarks/benchmark_import.py [runs]`
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+lazy_modules = (
+    "gdsfactory.components",
+    "gdsfactory.routing",
+    "gdsfactory.read",
+    "gdsfactory.geometry",
+    "gdsfactory.pdk",
+)
+
+
+def import_time() -> Tuple[Dict[str, int], List[str]]:
+    """Returns cumulative import time in us by module and lazy modules imported."""
+    code = (
+        "import sys, gdsfactory; "
+        f"print(','.join(m for m in {lazy_modules!r} if m in sys.modules))"
+    )
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    imported = p.stdout.strip().splitlines()[-1] if p.stdout.strip() else ""
+    return times, [m for m in imported.split(",") if m]
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [import_time() for _ in range(runs)]
+    times, imported = min(results, key=lambda r: r[0]["gdsfactory"])
+
+    print(f"import gdsfactory {times['gdsfactory'] / 1e3:8.1f} ms (best of {runs})")
+    for module, t in sorted(times.items(), key=lambda i: -i[1])[1:11]:
+        print(f"  {module:40s} {t / 1e3:8.1f} ms")
+    if imported:
+        print(f"lazy modules imported by `import gdsfactory`: {imported}")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""Benchmark sorting the ports of a component with many ports.
+
+Reports the best time of a few repeats for:
+
+- sort_ports_clockwise: all ports, with np.lexsort from 512 ports.
+- sort_ports_counter_clockwise: all ports, with np.lexsort from 512 ports.
+- sort_ports_clockwise_python: all ports, always sorting Port objects in Python.
+
+Run it with `python benchmarks/benchmark_ports.py [n]`
+"""
+from __future__ import annotations
+
+import sys
+import timeit
+from typing import Callable, Dict
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory import port
+from gdsfactory.component import Component
+from gdsfactory.port import Port, sort_ports_clockwise, sort_ports_counter_clockwise
+
+
+def component_with_ports(n: int = 10_000) -> Component:
+    rng = np.random.default_rng(0)
+    c = gf.Component(f"ports_{n}")
+    orientations = rng.choice([0, 90, 180, 270], n).tolist()
+    centers = rng.uniform(0, 1000, (n, 2))
+    for i in range(n):
+        c.ports[f"p{i}"] = Port(
+            name=f"p{i}",
+            orientation=orientations[i],
+            center=centers[i],
+            width=0.5,
+            layer=(1, 0) if i % 2 else (49, 0),
+            port_type="optical" if i % 2 else "electrical",
+            parent=c,
+        )
+    return c
+
+
+def best_time(function: Callable, repeat: int = 7) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def sort_ports_clockwise_python(ports: Dict[str, Port]) -> Dict[str, Port]:
+    min_ports = port._sort_ports_min_ports
+    port._sort_ports_min_ports = len(ports) + 1
+    try:
+        return sort_ports_clockwise(ports)
+    finally:
+        port._sort_ports_min_ports = min_ports
+
+
+def run(n: int = 10_000) -> Dict[str, float]:
+    c = component_with_ports(n)
+    return dict(
+        sort_ports_clockwise=best_time(lambda: sort_ports_clockwise(c.ports)),
+        sort_ports_counter_clockwise=best_time(
+            lambda: sort_ports_counter_clockwise(c.ports)
+        ),
+        sort_ports_clockwise_python=best_time(
+            lambda: sort_ports_clockwise_python(c.ports)
+        ),
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for benchmark, value in run(n).items():
+        print(f"{benchmark:28s} {value * 1e3:8.2f} ms")
@@ -0,0 +1,94 @@
+"""Benchmark GDS write time and peak memory for a synthetic wafer.
+
+The wafer has `n` instances of a few hundred different die cells. Each write
+mode runs in its own process so peak RSS measurements do not interfere:
+
+- library: default write_gds, builds a gdstk.Library.
+- streaming: write_gds(streaming=True), writes cells bottom-up.
+- streaming_free_memory: write_gds(streaming=True, free_memory=True).
+
+Run it with `python benchmarks/benchmark_write_gds.py [n]`
+"""
+from __future__ import annotations
+
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+modes = ("library", "streaming", "streaming_free_memory")
+
+
+def get_rss_mb() -> float:
+    """Returns the current resident set size in MB (linux)."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def get_peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def wafer(n: int = 100_000, n_dies: int = 200):
+    import gdsfactory as gf
+
+    dies = [
+        gf.components.grating_coupler_elliptical_trenches(taper_angle=10 + i * 0.1)
+        for i in range(n_dies)
+    ]
+    c = gf.Component("wafer")
+    columns = int(n**0.5)
+    for i in range(n):
+        ref = c.add_ref(dies[i % n_dies])
+        ref.move((40 * (i % columns), 40 * (i // columns)))
+    return c
+
+
+def run_mode(mode: str, n: int) -> dict:
+    c = wafer(n)
+    rss_before = get_rss_mb()
+    gdspath = pathlib.Path(tempfile.mkdtemp()) / "wafer.gds"
+
+    t0 = time.perf_counter()
+    c.write_gds(
+        gdspath,
+        logging=False,
+        streaming=mode.startswith("streaming"),
+        free_memory=mode == "streaming_free_memory",
+    )
+    write_time = time.perf_counter() - t0
+
+    return dict(
+        mode=mode,
+        instances=n,
+        write_time=write_time,
+        rss_before_write_mb=rss_before,
+        rss_after_write_mb=get_rss_mb(),
+        peak_rss_mb=get_peak_rss_mb(),
+        file_size_mb=gdspath.stat().st_size / 1024**2,
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps(run_mode(sys.argv[2], int(sys.argv[1]))))
+        sys.exit()
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for mode in modes:
+        output = subprocess.check_output(
+            [sys.executable, __file__, str(n), mode], stderr=subprocess.DEVNULL
+        )
+        r = json.loads(output.decode().strip().splitlines()[-1])
+        print(
+            f"{r['mode']:24s} write {r['write_time']:7.2f}s  "
+            f"peak RSS {r['peak_rss_mb']:8.1f} MB "
+            f"RSS before/after write {r['rss_before_write_mb']:8.1f}/"
+            f"{r['rss_after_write_mb']:8.1f} MB"
+        )
@@ -17,7 +17,11 @@ modules:
 isort:skip_file
 """
 from __future__ import annotations
+import importlib
+import sys
 from functools import partial
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, List
 from toolz import compose
 from gdsfactory.component_layout import Group
 from gdsfactory.path import Path
@@ -32,53 +36,145 @@ from gdsfactory.cell import cell_without_validator
 from gdsfactory.cell import clear_cache
 from gdsfactory.tech import LAYER
 from gdsfactory.show import show
-from gdsfactory.read.import_gds import import_gds
 from gdsfactory.cross_section import CrossSection, Section
 from gdsfactory.types import Label
 
-from gdsfactory import decorators
+from gdsfactory import cell_cache
 from gdsfactory import cross_section
-from gdsfactory import labels
-from gdsfactory import asserts
-from gdsfactory import components
-from gdsfactory import routing
 from gdsfactory import types
 from gdsfactory import path
 from gdsfactory import snap
 from gdsfactory import tech
-from gdsfactory import read
 from gdsfactory import layers
-from gdsfactory import add_termination
-from gdsfactory import functions
-from gdsfactory import export
-from gdsfactory import geometry
-from gdsfactory import add_ports
-from gdsfactory import write_cells
 from gdsfactory import add_pins
 
-from gdsfactory.add_tapers import add_tapers
-from gdsfactory.add_padding import (
-    add_padding,
-    add_padding_container,
-    get_padding_points,
+from gdsfactory.cross_section import get_cross_section_factories
+
+# components, routing, read, geometry and the PDK import each other and all
+# the component factories, so they are imported on first attribute access
+_lazy_modules = dict(
+    c="components",
+    components="components",
+    routing="routing",
+    read="read",
+    labels="labels",
+    asserts="asserts",
+    decorators="decorators",
+    add_termination="add_termination",
+    functions="functions",
+    export="export",
+    geometry="geometry",
+    add_ports="add_ports",
+    write_cells="write_cells",
+    add_labels="add_labels",
+    containers="containers",
+    difftest="difftest",
+    events="events",
+    fill="fill",
+    gdsdiff="gdsdiff",
+    get_factories="get_factories",
+    pdk="pdk",
+    symbols="symbols",
 )
-from gdsfactory.fill import fill_rectangle
-from gdsfactory.pack import pack
-from gdsfactory.grid import grid, grid_with_text
-from gdsfactory.pdk import (
-    Pdk,
-    get_component,
-    get_cross_section,
-    get_layer,
-    get_active_pdk,
-    get_cell,
-    get_constant,
+_lazy_attributes = dict(
+    import_gds="read.import_gds",
+    add_tapers="add_tapers",
+    add_padding="add_padding",
+    add_padding_container="add_padding",
+    get_padding_points="add_padding",
+    fill_rectangle="fill",
+    pack="pack",
+    build_parallel="build_parallel",
+    grid="grid",
+    grid_with_text="grid",
+    Pdk="pdk",
+    get_component="pdk",
+    get_cross_section="pdk",
+    get_layer="pdk",
+    get_active_pdk="pdk",
+    get_cell="pdk",
+    get_constant="pdk",
+    get_cells="get_factories",
 )
-from gdsfactory.get_factories import get_cells
-from gdsfactory.cross_section import get_cross_section_factories
 
+if TYPE_CHECKING:
+    from gdsfactory import components
+    from gdsfactory import components as c
+    from gdsfactory import routing
+    from gdsfactory import read
+    from gdsfactory import labels
+    from gdsfactory import asserts
+    from gdsfactory import decorators
+    from gdsfactory import add_termination
+    from gdsfactory import functions
+    from gdsfactory import export
+    from gdsfactory import geometry
+    from gdsfactory import add_ports
+    from gdsfactory import write_cells
+    from gdsfactory import add_labels  # noqa: F401
+    from gdsfactory import containers  # noqa: F401
+    from gdsfactory import difftest  # noqa: F401
+    from gdsfactory import events  # noqa: F401
+    from gdsfactory import fill  # noqa: F401
+    from gdsfactory import gdsdiff  # noqa: F401
+    from gdsfactory import get_factories  # noqa: F401
+    from gdsfactory import pdk  # noqa: F401
+    from gdsfactory import symbols  # noqa: F401
+    from gdsfactory.read.import_gds import import_gds
+    from gdsfactory.add_tapers import add_tapers
+    from gdsfactory.add_padding import (
+        add_padding,
+        add_padding_container,
+        get_padding_points,
+    )
+    from gdsfactory.fill import fill_rectangle
+    from gdsfactory.pack import pack
+    from gdsfactory.build_parallel import build_parallel
+    from gdsfactory.grid import grid, grid_with_text
+    from gdsfactory.pdk import (
+        Pdk,
+        get_component,
+        get_cross_section,
+        get_layer,
+        get_active_pdk,
+        get_cell,
+        get_constant,
+    )
+    from gdsfactory.get_factories import get_cells
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the lazy modules and functions on first access (PEP 562)."""
+    if name in _lazy_modules:
+        value = importlib.import_module(f"{__name__}.{_lazy_modules[name]}")
+    elif name in _lazy_attributes:
+        module = importlib.import_module(f"{__name__}.{_lazy_attributes[name]}")
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_lazy_modules) | set(_lazy_attributes))
+
+
+class _Module(ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # importing gdsfactory.grid sets it as an attribute of the package,
+        # which would hide the gf.grid function (also pack, add_tapers ...)
+        if (
+            name in _lazy_attributes
+            and isinstance(value, ModuleType)
+            and value.__name__ == f"{__name__}.{name}"
+        ):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Module
 
-c = components
 
 __all__ = (
     "CONF",
@@ -99,9 +195,11 @@ __all__ = (
     "add_tapers",
     "add_termination",
     "asserts",
+    "build_parallel",
     "c",
     "call_if_func",
     "cell",
+    "cell_cache",
     "cell_without_validator",
     "clear_cache",
     "components",
@@ -0,0 +1,101 @@
+"""Build many Components in parallel with a process pool.
+
+Useful for design of experiments (DOE) sweeps where each variant is
+independent. Each worker builds its ComponentSpecs and sends back the cell as
+GDS bytes + JSON metadata, which are rehydrated into the parent CACHE with
+the same names, settings and ports, as if they were built serially.
+
+Workers inherit the active PDK when processes start with `fork` (default on
+linux). With `spawn` they use the default generic PDK.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from gdsfactory.cell_cache import from_bytes, to_bytes
+from gdsfactory.component import Component
+from gdsfactory.types import ComponentSpec
+
+
+def _build(component: ComponentSpec) -> Tuple[str, bytes, bytes]:
+    """Returns CACHE name, GDS bytes and metadata bytes for a ComponentSpec."""
+    from gdsfactory.cell import CACHE
+    from gdsfactory.pdk import get_component
+
+    component = get_component(component)
+    name = next((k for k, v in CACHE.items() if v is component), component.name)
+    gds, metadata = to_bytes(component)
+    return name, gds, metadata
+
+
+def build_parallel(
+    specs: Sequence[ComponentSpec],
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+    mp_context: Optional[multiprocessing.context.BaseContext] = None,
+) -> List[Component]:
+    """Returns a list of Components built in parallel, in the same order as specs.
+
+    Components are added to the CACHE, so calling the same spec afterwards
+    returns them without rebuilding.
+
+    Args:
+        specs: list of ComponentSpec (function, partial, string or dict).
+            Components are returned as they are.
+        workers: number of processes. Defaults to the number of CPUs.
+            1 builds serially in this process.
+        chunksize: number of specs sent to each worker at once.
+        mp_context: multiprocessing context for the process pool.
+
+    .. code::
+
+        import gdsfactory as gf
+
+        specs = [gf.partial(gf.components.mzi, delta_length=i) for i in range(100)]
+        components = gf.build_parallel(specs, workers=8)
+        c = gf.pack(components)[0]
+    """
+    from gdsfactory.cell import CACHE
+    from gdsfactory.pdk import get_component
+
+    specs = list(specs)
+    workers = workers or os.cpu_count() or 1
+
+    indices = [i for i, spec in enumerate(specs) if not isinstance(spec, Component)]
+    if workers == 1 or len(indices) < 2:
+        return [get_component(spec) for spec in specs]
+
+    components = list(specs)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(indices)), mp_context=mp_context
+    ) as executor:
+        results = executor.map(_build, [specs[i] for i in indices], chunksize=chunksize)
+        for i, (name, gds, metadata) in zip(indices, results):
+            if name in CACHE:
+                components[i] = CACHE[name]
+                continue
+            component = from_bytes(gds, metadata, cache=CACHE)
+            CACHE[name] = component
+            components[i] = component
+
+    return components
+
+
+if __name__ == "__main__":
+    import time
+
+    import gdsfactory as gf
+
+    specs = [gf.partial(gf.components.mzi, delta_length=i) for i in range(200)]
+
+    t0 = time.time()
+    components = build_parallel(specs)
+    print(f"parallel {time.time() - t0:.2f}s")
+
+    gf.clear_cache()
+    t0 = time.time()
+    components = [gf.get_component(spec) for spec in specs]
+    print(f"serial {time.time() - t0:.2f}s")
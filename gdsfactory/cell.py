@@ -4,16 +4,20 @@ from __future__ import annotations
 import functools
 import hashlib
 import inspect
+import math
+import time
+import types
 from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 import toolz
 from pydantic import BaseModel, validate_arguments
 
+from gdsfactory import cell_cache
 from gdsfactory.component import Component
 from gdsfactory.name import MAX_NAME_LENGTH, clean_name, get_name_short
 from gdsfactory.serialization import clean_dict, clean_value_name
 
-CACHE: Dict[str, Component] = {}
+CACHE = cell_cache.ComponentCache()
 
 INFO_VERSION = 2
 
@@ -24,8 +28,7 @@ class CellReturnTypeError(ValueError):
 
 def clear_cache() -> None:
     """Clears Component CACHE."""
-    global CACHE
-    CACHE = {}
+    CACHE.clear()
 
 
 def print_cache() -> None:
@@ -60,18 +63,88 @@ class Settings(BaseModel):
     child: Optional[Dict[str, Any]] = None
 
 
+_FINGERPRINT_TYPES = (type(None), bool, int, str)
+_FINGERPRINT_CALLABLES = (
+    types.FunctionType,
+    functools.partial,
+    toolz.functoolz.Compose,
+)
+MAX_FINGERPRINTS = 10000
+
+
+def _get_fingerprint(value: Any) -> Any:
+    """Returns a hashable fingerprint of a value or raises TypeError.
+
+    Only values whose clean_value_name can not change for the same fingerprint
+    are accepted: None, bool, int, float, str, tuples and lists of those and
+    functions/partials (by identity). The type is part of the fingerprint, so
+    3 and 3.0 (which produce different names) have different fingerprints.
+    """
+    value_type = type(value)
+    if value_type is float:
+        # 0.0 == -0.0 but their names are different
+        return value_type, value, math.copysign(1.0, value)
+    if value_type in _FINGERPRINT_TYPES:
+        return value_type, value
+    if value_type in (tuple, list):
+        return value_type, tuple(_get_fingerprint(v) for v in value)
+    if isinstance(value, _FINGERPRINT_CALLABLES):
+        return value_type, value
+    raise TypeError(f"can not fingerprint {value_type}")
+
+
 def cell_without_validator(func):
     """Decorator for Component functions.
 
     Similar to cell decorator but does not enforce argument types.
 
     I recommend using @cell instead.
+
+    The function signature and defaults are parsed once at decoration time.
+    Calls are fingerprinted from their raw arguments, so that a cache hit
+    for arguments seen before skips the component name computation.
     """
+    if not callable(func):
+        raise ValueError(
+            f"{func!r} is not callable! @cell decorator is only for functions"
+        )
+
+    sig = inspect.signature(func)
+    parameter_names = list(sig.parameters.keys())
+    default = {
+        p.name: p.default
+        for p in sig.parameters.values()
+        if p.default != inspect._empty
+    }
+    check_kwargs = (
+        "args" not in sig.parameters
+        and "kwargs" not in sig.parameters
+        and "settings" not in sig.parameters
+    )
+    # set of default args as strings, built on the first call
+    default_args_set = None
+    # call fingerprint -> component name, for fast cache hits
+    names: Dict[Any, str] = {}
 
     @functools.wraps(func)
     def _cell(*args, **kwargs):
+        nonlocal default_args_set
         from gdsfactory.pdk import get_active_pdk
 
+        fingerprint = None
+        if kwargs.get("cache", True):
+            try:
+                fingerprint = (
+                    _get_fingerprint(args),
+                    tuple((k, _get_fingerprint(kwargs[k])) for k in sorted(kwargs)),
+                )
+                name = names.get(fingerprint)
+            except TypeError:
+                fingerprint = name = None
+
+            if name is not None and name in CACHE:
+                return CACHE.lookup(name, function_name=func.__name__)
+
         with_hash = kwargs.pop("with_hash", False)
         autoname = kwargs.pop("autoname", True)
         name = kwargs.pop("name", None)
@@ -81,34 +154,25 @@ def cell_without_validator(func):
         prefix = kwargs.pop("prefix", func.__name__)
         max_name_length = kwargs.pop("max_name_length", MAX_NAME_LENGTH)
 
-        sig = inspect.signature(func)
-        args_as_kwargs = dict(zip(sig.parameters.keys(), args))
+        args_as_kwargs = dict(zip(parameter_names, args))
         args_as_kwargs.update(kwargs)
 
-        default = {
-            p.name: p.default
-            for p in sig.parameters.values()
-            if p.default != inspect._empty
-        }
-
         changed = args_as_kwargs
         full = default.copy()
         full.update(**args_as_kwargs)
 
-        default2 = default.copy()
-        changed2 = changed.copy()
+        if default_args_set is None:
+            default_args_set = {
+                f"{key}={clean_value_name(value)}" for key, value in default.items()
+            }
 
-        # list of default args as strings
-        default_args_list = [
-            f"{key}={clean_value_name(default2[key])}" for key in sorted(default.keys())
-        ]
         # list of explicitly passed args as strings
         passed_args_list = [
-            f"{key}={clean_value_name(changed2[key])}" for key in sorted(changed.keys())
+            f"{key}={clean_value_name(changed[key])}" for key in sorted(changed.keys())
         ]
 
         # get only the args which are explicitly passed and different from defaults
-        changed_arg_set = set(passed_args_list).difference(default_args_list)
+        changed_arg_set = set(passed_args_list).difference(default_args_set)
         changed_arg_list = sorted(changed_arg_set)
 
         # if any args were different from default, append a hash of those args.
@@ -136,28 +200,47 @@ def cell_without_validator(func):
         decorator = kwargs.pop("decorator", get_active_pdk().default_decorator)
         name = get_name_short(name, max_name_length=max_name_length)
 
-        if (
-            "args" not in sig.parameters
-            and "kwargs" not in sig.parameters
-            and "settings" not in sig.parameters
-        ):
+        if check_kwargs:
             for key in kwargs:
-                if key not in sig.parameters.keys():
+                if key not in sig.parameters:
                     raise TypeError(
                         f"{func.__name__!r}() got invalid argument {key!r}\n"
-                        f"valid arguments are {list(sig.parameters.keys())}"
+                        f"valid arguments are {parameter_names}"
                     )
 
-        if cache and name in CACHE:
-            # print(f"CACHE LOAD {name} {func.__name__}({named_args_string})")
-            return CACHE[name]
+        if fingerprint is not None:
+            if len(names) >= MAX_FINGERPRINTS:
+                names.clear()
+            names[fingerprint] = name
+
+        if cache:
+            component = CACHE.lookup(name, function_name=func.__name__)
+            if component is not None:
+                # print(f"CACHE LOAD {name} {func.__name__}({named_args_string})")
+                return component
         # print(f"BUILD {name} {func.__name__}({named_args_string})")
 
-        if not callable(func):
-            raise ValueError(
-                f"{func!r} is not callable! @cell decorator is only for functions"
+        disk_cache = cell_cache.get_disk_cache() if cache else None
+        disk_cache_key = (
+            cell_cache.get_cache_key(
+                func,
+                name=name,
+                full=full,
+                flatten=flatten,
+                info=info,
+                decorator=decorator,
+                max_name_length=max_name_length,
             )
+            if disk_cache is not None
+            else None
+        )
+        if disk_cache_key:
+            component = disk_cache.load(disk_cache_key, cache=CACHE)
+            if component is not None:
+                CACHE[name] = component
+                return component
 
+        t0 = time.perf_counter()
         component = func(*args, **kwargs)
 
         # if the component is already in the cache, but under a different alias,
@@ -214,6 +297,10 @@ def cell_without_validator(func):
 
         component.lock()
         CACHE[name] = component
+        CACHE.add_build_time(func.__name__, time.perf_counter() - t0)
+
+        if disk_cache_key and not hasattr(component, "imported_gds"):
+            disk_cache.save(disk_cache_key, component)
         return component
 
     return _cell
@@ -245,6 +332,7 @@ def cell(func: _F, *args, **kwargs) -> _F:
         cache (bool): returns component from the cache if it already exists.
             if False creates a new component.
             by default True avoids having duplicated cells with the same name.
+            Also reads/writes the persistent cell_cache.DiskCache when enabled.
         info: updates component.info dict.
         prefix: name_prefix, defaults to function name.
         max_name_length: truncates name beyond some characters (32) with a hash.
@@ -0,0 +1,723 @@
+"""Component caches for the @cell decorator.
+
+ComponentCache is the in-memory CACHE that avoids building the same cell
+twice in one process. It can be bounded by number of entries and polygon
+memory, evicts least recently used entries and keeps hit/miss counters and
+build time per cell function so you can see which cells are worth caching.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.cell import CACHE
+
+    CACHE.set_limits(max_entries=10000, max_memory=2 * 1024**3)
+    print(gf.cell_cache.get_cache_stats())
+
+DiskCache adds an opt-in persistent second tier that stores each built
+Component as GDS (geometry) + JSON (settings, info, ports, reference names) so
+CI jobs, notebooks and worker processes can reuse cells built by others.
+
+Entries are keyed by function module and name, a hash of the function source
+code, the cleaned arguments and the active PDK. Changing the source of a cell
+function invalidates (and deletes) its old entries. Each entry also stores the
+source hash of the functions of all its subcells, so changing the source of a
+subcell function (straight used by a cached mzi) invalidates it on load. The disk cache is size
+bounded and evicts the least recently used entries first.
+
+You can enable it from python
+
+.. code::
+
+    import gdsfactory as gf
+    gf.cell_cache.enable_disk_cache()
+
+or by setting the `GDSFACTORY_CELL_CACHE` environment variable to a directory.
+
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib
+import os
+import pathlib
+import tempfile
+import warnings
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import gdstk
+import orjson
+
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.config import PATH, PathType, __version__, logger
+from gdsfactory.serialization import clean_dict, clean_value_name
+
+DEFAULT_MAX_SIZE = 2 * 1024**3  # 2 GB
+BYTES_PER_POINT = 16  # two float64 per polygon vertex
+
+
+class CellStats:
+    """Cache counters for one cell function."""
+
+    __slots__ = ("hits", "misses", "build_time")
+
+    def __init__(self) -> None:
+        """Initialize the CellStats object."""
+        self.hits = 0
+        self.misses = 0
+        self.build_time = 0.0
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return f"CellStats(hits={self.hits}, misses={self.misses}, build_time={self.build_time:.3g})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(hits=self.hits, misses=self.misses, build_time=self.build_time)
+
+
+def get_memory(component: Component) -> int:
+    """Returns an estimate of the polygon memory of a Component in bytes.
+
+    Only counts the cell's own polygons, as references are cached separately.
+    Lazy imported Components count as 0 until their geometry is loaded.
+    """
+    if not getattr(component, "loaded", True):
+        return 0
+    return BYTES_PER_POINT * sum(p.size for p in component._cell.polygons)
+
+
+class ComponentCache(MutableMapping):
+    """In-memory LRU cache of Components by name.
+
+    Evicted Components are kept as weak references, so a Component that is
+    still used (for example referenced by a live parent) keeps being returned
+    under its name instead of being rebuilt as a duplicated cell. Once nothing
+    references it, it is garbage collected.
+
+    Args:
+        max_entries: maximum number of cached Components. None for no limit.
+        max_memory: maximum polygon memory in bytes. None for no limit.
+    """
+
+    def __init__(
+        self, max_entries: Optional[int] = None, max_memory: Optional[int] = None
+    ) -> None:
+        """Initialize the ComponentCache object."""
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.memory = 0
+        self.evictions = 0
+        self.functions: Dict[str, CellStats] = {}
+        self._components: OrderedDict[str, Component] = OrderedDict()
+        self._memory: Dict[str, int] = {}
+        self._evicted = weakref.WeakValueDictionary()
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"ComponentCache({len(self._components)} components, "
+            f"memory={self.memory}, max_entries={self.max_entries}, "
+            f"max_memory={self.max_memory})"
+        )
+
+    def __getitem__(self, name: str) -> Component:
+        """Returns a Component and marks it as recently used."""
+        if name in self._components:
+            self._components.move_to_end(name)
+            return self._components[name]
+
+        component = self._evicted.get(name)
+        if component is None:
+            raise KeyError(name)
+        # still alive, so bring it back instead of building a duplicate cell
+        del self._evicted[name]
+        self[name] = component
+        return component
+
+    def __setitem__(self, name: str, component: Component) -> None:
+        """Adds a Component and evicts least recently used ones if needed."""
+        if name in self:
+            del self[name]
+        self._components[name] = component
+        self._memory[name] = memory = get_memory(component)
+        self.memory += memory
+        self.evict()
+
+    def __delitem__(self, name: str) -> None:
+        """Removes a Component from the cache."""
+        if name in self._components:
+            del self._components[name]
+            self.memory -= self._memory.pop(name)
+        else:
+            del self._evicted[name]
+
+    def __contains__(self, name: object) -> bool:
+        """Returns True if the name is cached or still alive."""
+        return name in self._components or name in self._evicted
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over cached and alive evicted names."""
+        yield from list(self._components)
+        yield from list(self._evicted.keys())
+
+    def __len__(self) -> int:
+        """Returns the number of cached and alive evicted Components."""
+        return len(self._components) + len(self._evicted)
+
+    def values(self) -> List[Component]:
+        """Returns cached and alive evicted Components without touching the LRU order."""
+        return list(self._components.values()) + list(self._evicted.values())
+
+    def items(self) -> List[Tuple[str, Component]]:
+        """Returns cached and alive evicted (name, Component) pairs without touching the LRU order."""
+        return list(self._components.items()) + list(self._evicted.items())
+
+    def clear(self) -> None:
+        """Removes all Components. Keeps the limits and counters."""
+        self._components.clear()
+        self._memory.clear()
+        self._evicted = weakref.WeakValueDictionary()
+        self.memory = 0
+
+    def set_limits(
+        self, max_entries: Optional[int] = None, max_memory: Optional[int] = None
+    ) -> None:
+        """Sets the cache limits and evicts Components beyond them.
+
+        Args:
+            max_entries: maximum number of cached Components. None for no limit.
+            max_memory: maximum polygon memory in bytes. None for no limit.
+        """
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.evict()
+
+    def evict(self) -> None:
+        """Evicts least recently used Components beyond the limits.
+
+        The most recently used Component is never evicted.
+        """
+        while len(self._components) > 1 and (
+            (self.max_entries is not None and len(self._components) > self.max_entries)
+            or (self.max_memory is not None and self.memory > self.max_memory)
+        ):
+            name, component = self._components.popitem(last=False)
+            self.memory -= self._memory.pop(name)
+            self._evicted[name] = component
+            self.evictions += 1
+
+    def get_stats(self, function_name: str) -> CellStats:
+        """Returns the counters for a cell function."""
+        stats = self.functions.get(function_name)
+        if stats is None:
+            stats = self.functions[function_name] = CellStats()
+        return stats
+
+    def lookup(self, name: str, function_name: str) -> Optional[Component]:
+        """Returns a cached Component or None and counts the hit or miss.
+
+        Args:
+            name: component name.
+            function_name: cell function name for the counters.
+        """
+        stats = self.get_stats(function_name)
+        if name in self:
+            stats.hits += 1
+            return self[name]
+        stats.misses += 1
+        return None
+
+    def add_build_time(self, function_name: str, build_time: float) -> None:
+        """Adds the time in seconds spent building a cell function."""
+        self.get_stats(function_name).build_time += build_time
+
+    @property
+    def hits(self) -> int:
+        return sum(stats.hits for stats in self.functions.values())
+
+    @property
+    def misses(self) -> int:
+        return sum(stats.misses for stats in self.functions.values())
+
+    def reset_stats(self) -> None:
+        """Resets all counters."""
+        self.functions = {}
+        self.evictions = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the cache counters."""
+        return dict(
+            entries=len(self._components),
+            evicted_alive=len(self._evicted),
+            memory=self.memory,
+            max_entries=self.max_entries,
+            max_memory=self.max_memory,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            functions={
+                function_name: stats.to_dict()
+                for function_name, stats in sorted(self.functions.items())
+            },
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_hash(func: Callable) -> Optional[str]:
+    """Returns a hash of the function source code.
+
+    None if the source is not available (functions defined in the REPL).
+    """
+    from gdsfactory.cell import get_source_code
+
+    try:
+        source = get_source_code(func)
+    except (OSError, TypeError):
+        return None
+    return hashlib.md5(source.encode()).hexdigest()[:8]
+
+
+def _get_function(module: str, function_name: str) -> Optional[Callable]:
+    """Returns a cell function from its module and name. None if not found."""
+    try:
+        return getattr(importlib.import_module(module), function_name, None)
+    except ImportError:
+        return None
+
+
+def get_source_hashes(component: Component) -> Dict[str, str]:
+    """Returns the source hash of the cell functions of a Component and its \
+    dependencies, by module.function_name.
+
+    Skips cells without settings or whose function source is not available.
+    """
+    hashes = {}
+    for c in [component] + component.get_dependencies(recursive=True):
+        module = getattr(c.settings, "module", None)
+        function_name = getattr(c.settings, "function_name", None)
+        key = f"{module}.{function_name}"
+        if module is None or function_name is None or key in hashes:
+            continue
+        func = _get_function(module, function_name)
+        source_hash = get_source_hash(func) if func is not None else None
+        if source_hash is not None:
+            hashes[key] = source_hash
+    return hashes
+
+
+def _is_source_changed(sources: Dict[str, str]) -> bool:
+    """Returns True if any cell function source hash changed."""
+    for key, source_hash in sources.items():
+        module, function_name = key.rsplit(".", 1)
+        func = _get_function(module, function_name)
+        if func is not None and get_source_hash(func) not in (None, source_hash):
+            return True
+    return False
+
+
+def _clean_key_value(value: Any) -> str:
+    """Returns a string for a cache key.
+
+    Files are identified by their path, size and modification time so that
+    editing a file passed as an argument invalidates the entry.
+    """
+    if isinstance(value, pathlib.Path):
+        if value.exists():
+            stat = value.stat()
+            return f"{value.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        return str(value.resolve())
+    return clean_value_name(value)
+
+
+def get_cache_key(
+    func: Callable, name: str, full: Dict[str, Any], **kwargs
+) -> Optional[str]:
+    """Returns the DiskCache key for a cell function call.
+
+    None if the function can not be cached (source code not available).
+
+    Args:
+        func: cell function.
+        name: component name.
+        full: full settings (default and changed) passed to the function.
+
+    Keyword Args:
+        extra values that affect the Component (flatten, decorator, info ...).
+    """
+    from gdsfactory.pdk import get_active_pdk
+
+    source_hash = get_source_hash(func)
+    if source_hash is None:
+        return None
+
+    settings = {**full, **kwargs}
+    args = [f"{key}={_clean_key_value(settings[key])}" for key in sorted(settings)]
+    args += [f"name={name}", f"pdk={get_active_pdk().name}", f"version={__version__}"]
+    args_hash = hashlib.md5("_".join(args).encode()).hexdigest()
+
+    return f"{func.__module__}.{func.__name__}_{source_hash}_{args_hash}"
+
+
+def _port_to_dict(port) -> Dict[str, Any]:
+    return dict(
+        name=port.name,
+        center=[float(port.center[0]), float(port.center[1])],
+        width=float(port.width),
+        orientation=None if port.orientation is None else float(port.orientation),
+        layer=list(port.layer),
+        port_type=port.port_type,
+        shear_angle=port.shear_angle,
+    )
+
+
+def _component_to_dict(component: Component) -> Dict[str, Any]:
+    settings = component.settings
+    reference_names = {id(ref._reference): ref.name for ref in component.references}
+    return dict(
+        settings=clean_dict(dict(settings)) if settings else None,
+        info=clean_dict(component.info or {}),
+        ports=[_port_to_dict(port) for port in component.ports.values()],
+        references=[reference_names.get(id(ref)) for ref in component._cell.references],
+    )
+
+
+def get_metadata(component: Component, sources: bool = False) -> bytes:
+    """Returns JSON metadata (settings, info, ports, reference names) \
+    for a Component and all its dependencies.
+
+    Raises TypeError if some settings are not JSON serializable.
+
+    Args:
+        component: to serialize.
+        sources: also stores the cell function source hashes (get_source_hashes).
+    """
+    components = [component] + component.get_dependencies(recursive=True)
+    metadata = dict(
+        name=component.name, cells={c.name: _component_to_dict(c) for c in components}
+    )
+    if sources:
+        metadata["sources"] = get_source_hashes(component)
+    return orjson.dumps(metadata, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def write_gds(component: Component, gdspath: PathType) -> None:
+    """Writes a Component to GDS without logging or duplicated cell warnings."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        component.write_gds(
+            gdspath=gdspath, logging=False, on_duplicate_cell="overwrite"
+        )
+
+
+def from_library(
+    lib: gdstk.Library,
+    metadata: Dict[str, Any],
+    cache: Optional[Dict[str, Component]] = None,
+) -> Optional[Component]:
+    """Returns the top Component from a gdstk Library and its metadata.
+
+    Args:
+        lib: gdstk library.
+        metadata: from get_metadata.
+        cache: in-memory components by name.
+            Cells already in memory are reused instead of duplicated
+            and new cells with settings are added to it.
+    """
+    from gdsfactory.cell import Settings
+
+    cache = {} if cache is None else cache
+    cells_metadata = metadata["cells"]
+    cell_to_component = {}
+    new_cells = []
+
+    for c in lib.cells:
+        if c.name in cache and c.name != metadata["name"]:
+            cell_to_component[c] = cache[c.name]
+            continue
+
+        component = Component(name=c.name)
+        component._cell = c
+        component.name = c.name
+        cell_metadata = cells_metadata.get(c.name, {})
+
+        for port in cell_metadata.get("ports", []):
+            p = component.add_port(
+                name=port["name"],
+                center=port["center"],
+                width=port["width"],
+                orientation=port["orientation"],
+                layer=tuple(port["layer"]),
+                port_type=port["port_type"],
+            )
+            p.shear_angle = port.get("shear_angle")
+
+        component.info = cell_metadata.get("info") or {}
+        if cell_metadata.get("settings"):
+            component.settings = Settings(**cell_metadata["settings"])
+        cell_to_component[c] = component
+        new_cells.append((c, component, cell_metadata))
+
+    # replace gdstk references with ComponentReferences to the new Components
+    for c, component, cell_metadata in new_cells:
+        reference_names = cell_metadata.get("references") or []
+        references = list(c.references)
+        for i, e in enumerate(references):
+            c.remove(e)
+            ref = ComponentReference(
+                component=cell_to_component[e.cell],
+                origin=e.origin,
+                rotation=0,
+                magnification=e.magnification,
+                x_reflection=e.x_reflection,
+                columns=e.repetition.columns or 1,
+                rows=e.repetition.rows or 1,
+                spacing=e.repetition.spacing,
+                v1=e.repetition.v1,
+                v2=e.repetition.v2,
+            )
+            ref._reference.rotation = e.rotation
+            alias = reference_names[i] if i < len(reference_names) else None
+            component._add(ref)
+            component._register_reference(reference=ref, alias=alias)
+
+    for c, component, _ in new_cells:
+        component.lock()
+        if c.name != metadata["name"] and component.settings:
+            cache.setdefault(c.name, component)
+
+    for c, component in cell_to_component.items():
+        if c.name == metadata["name"]:
+            return component
+    return None
+
+
+def to_bytes(component: Component) -> Tuple[bytes, bytes]:
+    """Returns GDS bytes and JSON metadata bytes for a Component."""
+    metadata = get_metadata(component)
+    with tempfile.TemporaryDirectory() as dirpath:
+        gdspath = pathlib.Path(dirpath) / "component.gds"
+        write_gds(component, gdspath)
+        return gdspath.read_bytes(), metadata
+
+
+def from_bytes(
+    gds: bytes, metadata: bytes, cache: Optional[Dict[str, Component]] = None
+) -> Optional[Component]:
+    """Returns a Component from GDS bytes and JSON metadata bytes.
+
+    Args:
+        gds: GDS bytes from to_bytes.
+        metadata: JSON bytes from to_bytes.
+        cache: in-memory components by name, see from_library.
+    """
+    with tempfile.TemporaryDirectory() as dirpath:
+        gdspath = pathlib.Path(dirpath) / "component.gds"
+        gdspath.write_bytes(gds)
+        lib = gdstk.read_gds(str(gdspath))
+    return from_library(lib, metadata=orjson.loads(metadata), cache=cache)
+
+
+class DiskCache:
+    """Stores Components in a directory as GDS + JSON files.
+
+    Args:
+        dirpath: cache directory.
+        max_size: maximum cache size in bytes.
+            Least recently used entries are evicted beyond this size.
+    """
+
+    def __init__(
+        self,
+        dirpath: Optional[PathType] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        """Initialize the DiskCache object."""
+        self.dirpath = pathlib.Path(dirpath or PATH.cell_cache)
+        self.dirpath.mkdir(exist_ok=True, parents=True)
+        self.max_size = max_size
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return f"DiskCache(dirpath={str(self.dirpath)!r}, max_size={self.max_size})"
+
+    def get_gdspath(self, key: str) -> pathlib.Path:
+        return self.dirpath / f"{key}.gds"
+
+    def get_jsonpath(self, key: str) -> pathlib.Path:
+        return self.dirpath / f"{key}.json"
+
+    def _entries(self) -> List[pathlib.Path]:
+        return list(self.dirpath.glob("*.gds"))
+
+    @property
+    def size(self) -> int:
+        """Returns the cache size in bytes."""
+        return sum(
+            path.stat().st_size
+            for path in self.dirpath.iterdir()
+            if path.suffix in {".gds", ".json"}
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of entries in the cache."""
+        return len(self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        """Returns True if the key is in the cache."""
+        return self.get_gdspath(key).exists() and self.get_jsonpath(key).exists()
+
+    def remove(self, key: str) -> None:
+        """Removes one entry from the cache."""
+        for path in (self.get_gdspath(key), self.get_jsonpath(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        for gdspath in self._entries():
+            self.remove(gdspath.stem)
+
+    def evict(self) -> None:
+        """Removes least recently used entries until size <= max_size."""
+        entries = []
+        for gdspath in self._entries():
+            jsonpath = gdspath.with_suffix(".json")
+            try:
+                stat = gdspath.stat()
+                size = stat.st_size
+                size += jsonpath.stat().st_size if jsonpath.exists() else 0
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, size, gdspath.stem))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, key in sorted(entries):
+            if size <= self.max_size:
+                break
+            self.remove(key)
+            size -= entry_size
+
+    def _remove_stale(self, key: str) -> None:
+        """Removes entries of the same function built with different source."""
+        function, source_hash, _ = key.rsplit("_", 2)
+        for gdspath in self.dirpath.glob(f"{function}_*.gds"):
+            function_i, source_hash_i, _ = gdspath.stem.rsplit("_", 2)
+            if function_i == function and source_hash_i != source_hash:
+                self.remove(gdspath.stem)
+
+    def save(self, key: str, component: Component) -> Optional[pathlib.Path]:
+        """Writes a Component (and its dependencies) to the cache.
+
+        Returns the GDS path or None if the component could not be serialized.
+
+        Args:
+            key: cache key from get_cache_key.
+            component: to store.
+        """
+        try:
+            metadata_json = get_metadata(component, sources=True)
+        except TypeError as e:
+            logger.warning(f"DiskCache can not serialize {component.name!r}: {e}")
+            return None
+
+        self._remove_stale(key)
+
+        gdspath = self.get_gdspath(key)
+        jsonpath = self.get_jsonpath(key)
+
+        # write to temporary files first, so other processes never read partial files
+        fd, gdspath_tmp = tempfile.mkstemp(dir=self.dirpath, suffix=".tmp")
+        os.close(fd)
+        write_gds(component, gdspath_tmp)
+        os.replace(gdspath_tmp, gdspath)
+
+        fd, jsonpath_tmp = tempfile.mkstemp(dir=self.dirpath, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(metadata_json)
+        os.replace(jsonpath_tmp, jsonpath)
+
+        self.evict()
+        return gdspath
+
+    def load(
+        self, key: str, cache: Optional[Dict[str, Component]] = None
+    ) -> Optional[Component]:
+        """Returns a Component from the cache. None if the key is not cached.
+
+        Entries whose subcell functions changed source are removed.
+
+        Args:
+            key: cache key from get_cache_key.
+            cache: in-memory components by name.
+                Cells already in memory are reused instead of duplicated
+                and new cells with settings are added to it.
+        """
+        gdspath = self.get_gdspath(key)
+        jsonpath = self.get_jsonpath(key)
+
+        try:
+            metadata = orjson.loads(jsonpath.read_bytes())
+            lib = gdstk.read_gds(str(gdspath))
+            os.utime(gdspath)
+        except (FileNotFoundError, OSError, orjson.JSONDecodeError):
+            return None
+        if _is_source_changed(metadata.get("sources", {})):
+            self.remove(key)
+            return None
+        return from_library(lib, metadata=metadata, cache=cache)
+
+
+DISK_CACHE: Optional[DiskCache] = None
+
+
+def enable_disk_cache(
+    dirpath: Optional[PathType] = None, max_size: int = DEFAULT_MAX_SIZE
+) -> DiskCache:
+    """Enables the persistent cell cache for all @cell functions.
+
+    Args:
+        dirpath: cache directory. Defaults to ~/.gdsfactory/cell_cache.
+        max_size: maximum cache size in bytes.
+    """
+    global DISK_CACHE
+    DISK_CACHE = DiskCache(dirpath=dirpath, max_size=max_size)
+    return DISK_CACHE
+
+
+def disable_disk_cache() -> None:
+    """Disables the persistent cell cache."""
+    global DISK_CACHE
+    DISK_CACHE = None
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """Returns the active DiskCache. None if disabled."""
+    return DISK_CACHE
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Returns the in-memory CACHE counters (hits, misses, build time per cell)."""
+    from gdsfactory.cell import CACHE
+
+    return CACHE.to_dict()
+
+
+if os.environ.get("GDSFACTORY_CELL_CACHE"):
+    enable_disk_cache(dirpath=os.environ["GDSFACTORY_CELL_CACHE"])
+
+
+if __name__ == "__main__":
+    import gdsfactory as gf
+
+    disk_cache = enable_disk_cache()
+    c = gf.components.mzi()
+    gf.clear_cache()
+    c = gf.components.mzi()
+    print(disk_cache, len(disk_cache), disk_cache.size)
+    c.show(show_ports=True)
@@ -3,11 +3,14 @@ from __future__ import annotations
 import datetime
 import hashlib
 import itertools
+import json
 import math
+import os
 import pathlib
 import tempfile
 import uuid
 import warnings
+import weakref
 from collections import Counter
 from collections.abc import Iterable
 from pathlib import Path
@@ -45,6 +48,7 @@ from gdsfactory.port import (
 )
 from gdsfactory.serialization import clean_dict
 from gdsfactory.snap import snap_to_grid
+from gdsfactory.spatial_index import SpatialIndex
 
 Plotter = Literal["holoviews", "matplotlib", "qt"]
 Axis = Literal["x", "y"]
@@ -60,6 +64,50 @@ def _get_dependencies(component, references_set):
         _get_dependencies(ref.ref_cell, references_set)
 
 
+def _get_cells_bottom_up(cell: gdstk.Cell) -> List[gdstk.Cell]:
+    """Returns cell and its dependencies, each cell after all the cells it references."""
+    cells = []
+    visited = set()
+    stack = [(cell, False)]
+    while stack:
+        c, expanded = stack.pop()
+        if expanded:
+            cells.append(c)
+            continue
+        if id(c) in visited:
+            continue
+        visited.add(id(c))
+        stack.append((c, True))
+        for child in c.dependencies(False):
+            if id(child) not in visited:
+                stack.append((child, False))
+    return cells
+
+
+def _get_freeable_cells(
+    component: Component, cells: List[gdstk.Cell], components: Dict[int, Component]
+) -> Dict[int, Component]:
+    """Returns {id(cell): Component} for the cells only used by component.
+
+    A cell can be freed if all the Components referencing it can be freed,
+    so cells shared with Components outside the layout are kept.
+
+    Args:
+        component: top Component being written.
+        cells: component cell and its dependencies, bottom-up.
+        components: {id(cell): Component} for component and its dependencies.
+    """
+    freeable = {id(component._cell): component}
+    for cell in reversed(cells):
+        c = components.get(id(cell))
+        if c is None or id(cell) in freeable:
+            continue
+        parents = list(c._parents)
+        if parents and all(id(parent._cell) in freeable for parent in parents):
+            freeable[id(cell)] = c
+    return freeable
+
+
 mutability_error_message = """
 You cannot modify a Component after creation as it will affect all of its instances.
 
@@ -95,6 +143,143 @@ def _rnd(arr, precision=1e-4):
     return np.ascontiguousarray(arr.round(ndigits) / precision, dtype=np.int64)
 
 
+def _get_reference_transform(ref: gdstk.Reference, precision: float = 1e-4) -> Tuple:
+    """Returns rotation, magnification, x_reflection and repetition of a reference, \
+    rounded to precision, without the origin."""
+    r = ref.repetition
+    repetition = ()
+    if r.size:
+        values = [*(r.spacing or ()), *(r.v1 or ()), *(r.v2 or ())]
+        if r.offsets is not None:
+            values += np.ravel(r.offsets).tolist()
+        repetition = (r.columns, r.rows, *(round(v / precision) for v in values))
+    return (
+        round(math.degrees(ref.rotation) % 360, 6),
+        round(ref.magnification, 9),
+        bool(ref.x_reflection),
+        repetition,
+    )
+
+
+def _hash_cell(cell: gdstk.Cell, precision: float = 1e-4) -> str:
+    """Returns an SHA1 hash of the cell's own content (not flattened).
+
+    Hashes polygons, paths, labels and references (by referenced cell name
+    and transformation) in the order they are stored in the cell, so it can
+    tell if the cell GDS records need to be encoded again.
+
+    Unlike _hash_geometry_cell it covers the cell name, labels and referenced
+    cell names, which are part of the GDS records, and it does not depend on
+    the referenced cells content, so editing a cell does not change the hash
+    of the cells referencing it.
+
+    Args:
+        cell: gdstk Cell.
+        precision: rounding precision for the coordinates.
+    """
+    h = hashlib.sha1(cell.name.encode())
+
+    polygons = cell.polygons
+    for path in cell.paths:
+        polygons += path.to_polygons()
+
+    if polygons:
+        points = np.concatenate([p.points for p in polygons])
+        specs = np.array(
+            [(p.layer, p.datatype, p.size) for p in polygons], dtype=np.int64
+        )
+        h.update(specs.tobytes())
+        h.update(_rnd(points, precision).tobytes())
+
+    for label in cell.labels:
+        h.update(
+            str(
+                (
+                    label.text,
+                    label.layer,
+                    label.texttype,
+                    label.anchor,
+                    label.rotation,
+                    label.magnification,
+                    label.x_reflection,
+                )
+            ).encode()
+        )
+        h.update(_rnd(label.origin, precision).tobytes())
+
+    for ref in cell.references:
+        child = ref.cell if isinstance(ref.cell, str) else ref.cell.name
+        h.update(str((child, _get_reference_transform(ref, precision))).encode())
+        h.update(_rnd(ref.origin, precision).tobytes())
+
+    return h.hexdigest()
+
+
+def _hash_geometry_cell(
+    cell: Union[gdstk.Cell, gdstk.RawCell, str],
+    precision: float = 1e-4,
+    digests: Optional[Dict[int, bytes]] = None,
+) -> bytes:
+    """Returns the Merkle SHA1 digest of a cell geometry.
+
+    Hashes the cell own polygons once, sorted by layer and by polygon hash as
+    in Component.hash_geometry, and combines the digests of the referenced
+    cells with their transformations, repetitions and sorted origins, so it
+    does not depend on the order of polygons or references.
+
+    Args:
+        cell: gdstk Cell. RawCells and cell names are hashed by name and size.
+        precision: rounding precision for the coordinates.
+        digests: digests of the cells already hashed by id(cell), updated in place.
+    """
+    digests = {} if digests is None else digests
+    if id(cell) in digests:
+        return digests[id(cell)]
+    if not isinstance(cell, gdstk.Cell):
+        name, size = (cell, 0) if isinstance(cell, str) else (cell.name, cell.size)
+        return hashlib.sha1(f"{name}_{size}".encode()).digest()
+
+    polygons = cell.polygons
+    for path in cell.paths:
+        polygons += path.to_polygons()
+    polygon_hashes: Dict[Tuple[int, int], List[bytes]] = {}
+    for polygon in polygons:
+        polygon_hashes.setdefault((polygon.layer, polygon.datatype), []).append(
+            hashlib.sha1(_rnd(polygon.points, precision)).digest()
+        )
+
+    # references to the same cell with the same transformation only differ
+    # by their origin, so they are hashed together with the sorted origins
+    origins: Dict[Tuple, List[Tuple[float, float]]] = {}
+    for ref in cell.references:
+        key = (
+            _hash_geometry_cell(ref.cell, precision, digests),
+            _get_reference_transform(ref, precision),
+        )
+        origins.setdefault(key, []).append(ref.origin)
+
+    reference_hashes = []
+    for (child, transform), points in origins.items():
+        points = _rnd(points, precision)
+        points = points[np.lexsort(points.T[::-1])]
+        h = hashlib.sha1(child + str(transform).encode())
+        h.update(np.ascontiguousarray(points))
+        reference_hashes.append(h.digest())
+    reference_hashes.sort()
+
+    h = hashlib.sha1()
+    for layer in sorted(polygon_hashes):
+        h.update(np.array([*layer, len(polygon_hashes[layer])], dtype=np.int64))
+        for polygon_hash in sorted(polygon_hashes[layer]):
+            h.update(polygon_hash)
+    h.update(np.array([len(reference_hashes)], dtype=np.int64))
+    for reference_hash in reference_hashes:
+        h.update(reference_hash)
+
+    digests[id(cell)] = h.digest()
+    return digests[id(cell)]
+
+
 class Component(_GeometryHelper):
     """A Component is an empty canvas where you add polygons, references and ports \
             (to connect to other components).
@@ -142,11 +327,16 @@ class Component(_GeometryHelper):
 
         self.settings: Dict[str, Any] = {}
         self._locked = False
+        self._cell_hash = None
+        self._geometry_hashes: Dict[float, bytes] = {}
+        self._parents = weakref.WeakSet()
+        self._freed = False
         self.get_child_name = False
         self._reference_names_counter = Counter()
         self._reference_names_used = set()
         self._named_references = {}
         self._references = []
+        self._spatial_index = None
 
         self.ports = {}
 
@@ -264,6 +454,24 @@ class Component(_GeometryHelper):
     def unlock(self) -> None:
         """Only do this if you know what you are doing."""
         self._locked = False
+        self._clear_hashes()
+
+    def _clear_hashes(self) -> None:
+        """Clears the cached hashes after the cell changes."""
+        self._cell_hash = None
+        self._clear_geometry_hashes()
+
+    def _clear_geometry_hashes(self) -> None:
+        """Clears the hierarchical hashes of this Component and of the \
+        Components that reference it, directly or through other Components."""
+        components = [self]
+        seen = set()
+        while components:
+            c = components.pop()
+            if id(c) not in seen:
+                seen.add(id(c))
+                c._geometry_hashes = {}
+                components.extend(c._parents)
 
     def lock(self) -> None:
         """Makes sure components can't add new elements or move existing ones.
@@ -880,6 +1088,9 @@ class Component(_GeometryHelper):
     def _add_polygons(self, *polygons: List[Polygon]):
         self.is_unlocked()
         self._cell.add(*polygons)
+        if self._spatial_index is not None:
+            for polygon in polygons:
+                self._spatial_index.add(polygon)
 
     def copy(self) -> Component:
         return copy(self)
@@ -928,10 +1139,18 @@ class Component(_GeometryHelper):
         """
         self.is_unlocked()
         if isinstance(element, ComponentReference):
+            if element.parent._freed:
+                raise ValueError(
+                    f"Component {element.parent.name!r} was freed by "
+                    "write_gds(free_memory=True) and can not be referenced"
+                )
             self._cell.add(element._reference)
             self._references.append(element)
+            element.parent._parents.add(self)
         else:
             self._cell.add(element)
+        if self._spatial_index is not None:
+            self._spatial_index.add(element)
 
     def add(self, element) -> None:
         """Add a new element or list of elements to this Component.
@@ -1412,6 +1631,9 @@ class Component(_GeometryHelper):
         logging: bool = True,
         on_duplicate_cell: Optional[str] = "warn",
         with_oasis: bool = False,
+        streaming: bool = False,
+        free_memory: bool = False,
+        incremental: bool = False,
         **kwargs,
     ) -> Path:
         """Write component to GDS and returns gdspath.
@@ -1429,7 +1651,22 @@ class Component(_GeometryHelper):
                 "error": throw a ValueError when attempting to write a gds with duplicate cells.
                 "overwrite": overwrite all duplicate cells with one of the duplicates, without warning.
                 None: do not try to resolve (at your own risk!)
+            with_oasis: write OASIS instead of GDS.
+            streaming: write cells one by one (bottom-up) with gdstk.GdsWriter
+                instead of building a gdstk.Library first. Only for GDS.
+            free_memory: only for streaming. Removes polygons and paths from each
+                cell once written, and the written Components from the CACHE.
+                Cells also referenced by Components outside this layout are kept.
+                The Component can not be written or referenced after writing.
+            incremental: only re-encode cells that changed since the last write
+                to the same gdspath. Keeps cell hashes in a `.hashes.json` file
+                next to the GDS and copies unchanged cells from the previous GDS.
         """
+        if (streaming or incremental) and with_oasis:
+            raise ValueError("streaming is only supported for GDS, not OASIS")
+        if free_memory and not (streaming or incremental):
+            raise ValueError("free_memory requires streaming=True or incremental=True")
+
         from gdsfactory.pdk import get_grid_size
 
         precision = precision or get_grid_size() * 1e-6
@@ -1447,6 +1684,12 @@ class Component(_GeometryHelper):
         gdsdir.mkdir(exist_ok=True, parents=True)
 
         cells = self.get_dependencies(recursive=True)
+        freed = [c.name for c in [self, *cells] if c._freed]
+        if freed:
+            raise ValueError(
+                f"Components {freed} were freed by write_gds(free_memory=True) "
+                "and can not be written"
+            )
         cell_names = [cell.name for cell in list(cells)]
         cell_names_unique = set(cell_names)
 
@@ -1484,6 +1727,19 @@ class Component(_GeometryHelper):
         # for cell in all_cells:
         #     print(cell.name, type(cell))
 
+        if streaming or incremental:
+            self._write_gds_streaming(
+                gdspath=gdspath,
+                unit=unit,
+                precision=precision,
+                timestamp=timestamp,
+                free_memory=free_memory,
+                incremental=incremental,
+            )
+            if logging:
+                logger.info(f"Wrote to {str(gdspath)!r}")
+            return gdspath
+
         lib = gdstk.Library(unit=unit, precision=precision)
         lib.add(self._cell)
         lib.add(*self._cell.dependencies(True))
@@ -1496,6 +1752,106 @@ class Component(_GeometryHelper):
             logger.info(f"Wrote to {str(gdspath)!r}")
         return gdspath
 
+    def _write_gds_streaming(
+        self,
+        gdspath: PathType,
+        unit: float = 1e-6,
+        precision: float = 1e-9,
+        timestamp: Optional[datetime.datetime] = _timestamp2019,
+        free_memory: bool = False,
+        incremental: bool = False,
+    ) -> None:
+        """Writes cells bottom-up with gdstk.GdsWriter, one cell at a time.
+
+        Only the first cell with a given name is written.
+
+        Args:
+            gdspath: GDS file path to write to.
+            unit: unit size for objects in library.
+            precision: for dimensions in the library (m).
+            timestamp: for the GDS file.
+            free_memory: removes polygons and paths from the cells only used
+                by this Component once written.
+            incremental: keeps a hash of each cell in a JSON file next to the GDS
+                and copies the raw records of the cells that did not change
+                from the previous GDS file instead of encoding them again.
+        """
+        from gdsfactory.cell import CACHE
+
+        gdspath = pathlib.Path(gdspath)
+        hashes_path = gdspath.with_suffix(".hashes.json")
+        hashes_previous = {}
+        hashes = {}
+        rawcells = {}
+
+        if incremental and gdspath.exists() and hashes_path.exists():
+            metadata = json.loads(hashes_path.read_text())
+            if metadata.get("unit") == unit and metadata.get("precision") == precision:
+                hashes_previous = metadata["cells"]
+                rawcells = gdstk.read_rawcells(str(gdspath))
+
+        gdspath_tmp = gdspath.with_suffix(".tmp") if incremental else gdspath
+        writer = gdstk.GdsWriter(
+            str(gdspath_tmp), unit=unit, precision=precision, timestamp=timestamp
+        )
+        names_written = set()
+        cells_reused = 0
+
+        # locked components can not change, so their hash is computed only once
+        components = (
+            {id(c._cell): c for c in [self, *self.get_dependencies(recursive=True)]}
+            if incremental or free_memory
+            else {}
+        )
+        cells = _get_cells_bottom_up(self._cell)
+        freeable = _get_freeable_cells(self, cells, components) if free_memory else {}
+
+        for cell in cells:
+            if cell.name in names_written:
+                continue
+
+            if incremental and isinstance(cell, gdstk.Cell):
+                component = components.get(id(cell))
+                if component is not None and component._cell_hash:
+                    cell_hash = component._cell_hash
+                else:
+                    cell_hash = _hash_cell(cell)
+                    if component is not None and component._locked:
+                        component._cell_hash = cell_hash
+                hashes[cell.name] = cell_hash
+                if (
+                    hashes_previous.get(cell.name) == cell_hash
+                    and cell.name in rawcells
+                ):
+                    writer.write(rawcells[cell.name])
+                    cells_reused += 1
+                else:
+                    writer.write(cell)
+            else:
+                writer.write(cell)
+            names_written.add(cell.name)
+
+            if id(cell) in freeable:
+                cell.remove(*cell.polygons)
+                cell.remove(*cell.paths)
+                freeable[id(cell)]._freed = True
+        writer.close()
+
+        if incremental:
+            rawcells = None
+            os.replace(gdspath_tmp, gdspath)
+            hashes_path.write_text(
+                json.dumps(dict(unit=unit, precision=precision, cells=hashes))
+            )
+            logger.debug(
+                f"Reused {cells_reused} of {len(names_written)} cells in {str(gdspath)!r}"
+            )
+
+        if free_memory:
+            for name, component in list(CACHE.items()):
+                if id(component._cell) in freeable:
+                    del CACHE[name]
+
     def write_gds(
         self,
         gdspath: Optional[PathType] = None,
@@ -1504,6 +1860,9 @@ class Component(_GeometryHelper):
         precision: Optional[float] = None,
         logging: bool = True,
         on_duplicate_cell: Optional[str] = "warn",
+        streaming: bool = False,
+        free_memory: bool = False,
+        incremental: bool = False,
     ) -> Path:
         """Write component to GDS and returns gdspath.
 
@@ -1518,6 +1877,15 @@ class Component(_GeometryHelper):
                 "error": throw a ValueError when attempting to write a gds with duplicate cells.
                 "overwrite": overwrite all duplicate cells with one of the duplicates, without warning.
                 None: do not try to resolve (at your own risk!)
+            streaming: write cells one by one (bottom-up) as they are finalized,
+                instead of building a full gdstk.Library. Lower peak memory for large layouts.
+            free_memory: only for streaming. Removes polygons and paths from each
+                cell once written, and the written Components from the CACHE.
+                Cells also referenced by Components outside this layout are kept.
+                The Component can not be written or referenced after writing.
+            incremental: only re-encode cells that changed since the last write
+                to the same gdspath. Keeps cell hashes in a `.hashes.json` file
+                next to the GDS and copies unchanged cells from the previous GDS.
         """
         return self._write_library(
             gdspath=gdspath,
@@ -1526,6 +1894,9 @@ class Component(_GeometryHelper):
             precision=precision,
             logging=logging,
             on_duplicate_cell=on_duplicate_cell,
+            streaming=streaming,
+            free_memory=free_memory,
+            incremental=incremental,
         )
 
     def write_oas(
@@ -1802,23 +2173,53 @@ class Component(_GeometryHelper):
                 self._named_references.pop(item.name)
             else:
                 self._cell.remove(item)
+            if self._spatial_index is not None:
+                self._spatial_index.remove(item)
 
+        self._clear_hashes()
         self._bb_valid = False
         return self
 
-    def hash_geometry(self, precision: float = 1e-4) -> str:
+    def get_spatial_index(self, cell_size: float = 100.0) -> SpatialIndex:
+        """Returns a spatial index over the bounding boxes of the references, \
+        polygons and paths of this Component.
+
+        The index is kept up to date as references and polygons are added or
+        removed, and references that moved are indexed again when it is queried.
+
+        Args:
+            cell_size: bucket size in um.
+        """
+        index = self._spatial_index
+        if index is None or index.cell_size != cell_size:
+            index = self._spatial_index = SpatialIndex(self, cell_size=cell_size)
+        else:
+            index.update()
+        return index
+
+    def hash_geometry(self, precision: float = 1e-4, hierarchical: bool = False) -> str:
         """Returns an SHA1 hash of the geometry in the Component.
 
         For each layer, each polygon is individually hashed and then the polygon hashes
         are sorted, to ensure the hash stays constant regardless of the ordering
         the polygons.  Similarly, the layers are sorted by (layer, datatype).
 
+        With hierarchical=True returns a Merkle hash instead: each cell hashes
+        its own polygons once and the hashes of its references with their
+        transformations, without flattening. Hashes of locked cells are cached.
+        It depends on the hierarchy, so the same geometry split in different
+        cells has a different hierarchical hash.
+
         Args:
             precision: Rounding precision for the the objects in the Component.
                 For instance, a precision of 1e-2 will round a point at
                 (0.124, 1.748) to (0.12, 1.75).
+            hierarchical: returns the Merkle hash of the cell hierarchy.
 
         """
+        if hierarchical:
+            return self._hash_geometry_hierarchical(precision).hex()
+
         polygons_by_spec = self.get_polygons(by_spec=True, as_array=False)
         layers = np.array(list(polygons_by_spec.keys()))
         sorted_layers = layers[np.lexsort((layers[:, 0], layers[:, 1]))]
@@ -1835,6 +2236,34 @@ class Component(_GeometryHelper):
 
         return final_hash.hexdigest()
 
+    def _hash_geometry_hierarchical(self, precision: float = 1e-4) -> bytes:
+        if self._locked and precision in self._geometry_hashes:
+            return self._geometry_hashes[precision]
+
+        # locked components can not change, so their hash is computed only once
+        components = {
+            id(c._cell): c for c in [self, *self.get_dependencies(recursive=True)]
+        }
+        digests = {
+            cell_id: c._geometry_hashes[precision]
+            for cell_id, c in components.items()
+            if c._locked and precision in c._geometry_hashes
+        }
+        digest = _hash_geometry_cell(self._cell, precision, digests)
+
+        # the hash of a cell that references unlocked cells can still change
+        unlocked = [c for c in components.values() if not c._locked]
+        while unlocked:
+            c = unlocked.pop()
+            for parent in c._parents:
+                if components.pop(id(parent._cell), None) is parent:
+                    unlocked.append(parent)
+
+        for cell_id, c in components.items():
+            if c._locked and cell_id in digests:
+                c._geometry_hashes[precision] = digests[cell_id]
+        return digest
+
     def get_labels(
         self, apply_repetitions=True, depth: Optional[int] = None, layer=None
     ) -> List[Label]:
@@ -1861,6 +2290,7 @@ class Component(_GeometryHelper):
     def remove_labels(self) -> None:
         """Remove labels."""
         self._cell.remove(*self.labels)
+        self._clear_hashes()
 
     # Deprecated
     def get_info(self):
@@ -1893,6 +2323,8 @@ class Component(_GeometryHelper):
         all_D = list(self.get_dependencies(True))
         all_D.append(self)
         for D in all_D:
+            D._spatial_index = None
+            D._clear_hashes()
             for p in D.polygons:
                 layer = (p.layer, p.datatype)
                 if layer in layermap:
@@ -179,6 +179,8 @@ class ComponentReference(_GeometryHelper):
         self._local_ports = {
             name: port._copy() for name, port in component.ports.items()
         }
+        self._ports_key = None
+        self._ports_state = None
         self.visual_label = visual_label
         # self.uid = str(uuid.uuid4())[:8]
 
@@ -431,31 +433,89 @@ class ComponentReference(_GeometryHelper):
         """This property allows you to access myref.ports, and receive a copy.
 
         of the ports dict which is correctly rotated and translated.
+
+        The transformed ports are cached and only computed again when the
+        reference moves, rotates or mirrors, when the parent ports change or
+        when a cached port is moved or rotated.
+        Ports of locked parents are assumed not to change.
         """
-        for name, port in self.parent.ports.items():
-            port = self.parent.ports[name]
-            new_center, new_orientation = self._transform_port(
-                port.center,
-                port.orientation,
+        parent_ports = self.parent.ports
+        key = (
+            self._reference.origin,
+            self._reference.rotation,
+            self._reference.x_reflection,
+            id(self.parent),
+            id(parent_ports),
+            len(parent_ports),
+        )
+        if not self.parent._locked:
+            key += tuple(
+                (name, id(port), id(port.center), port.orientation)
+                for name, port in parent_ports.items()
+            )
+        if key == self._ports_key and not self._local_ports_changed():
+            return self._local_ports
+
+        names = list(parent_ports)
+        ports = list(parent_ports.values())
+        if ports:
+            centers, orientations = self._transform_ports(
+                np.array([port.center for port in ports], dtype=float),
+                np.array(
+                    [
+                        np.nan if port.orientation is None else port.orientation
+                        for port in ports
+                    ],
+                    dtype=float,
+                ),
                 self.origin,
                 self.rotation,
                 self.x_reflection,
             )
+        for i, (name, port) in enumerate(zip(names, ports)):
             if name not in self._local_ports:
                 self._local_ports[name] = port.copy()
-            self._local_ports[name].center = new_center
-            self._local_ports[name].orientation = (
-                mod(new_orientation, 360) if new_orientation else new_orientation
+            local_port = self._local_ports[name]
+            local_port.center = centers[i]
+            local_port.orientation = (
+                None if port.orientation is None else orientations[i]
             )
-            self._local_ports[name].parent = self
+            local_port.parent = self
         # Remove any ports that no longer exist in the reference's parent
-        parent_names = self.parent.ports.keys()
-        local_names = list(self._local_ports.keys())
-        for name in local_names:
-            if name not in parent_names:
-                self._local_ports.pop(name)
+        if len(self._local_ports) != len(names):
+            for name in list(self._local_ports):
+                if name not in parent_ports:
+                    self._local_ports.pop(name)
+        self._ports_key = key
+        if ports:
+            self._ports_state = (
+                centers,
+                centers.copy(),
+                [
+                    (name, port, port.center, port.orientation)
+                    for name, port in self._local_ports.items()
+                ],
+            )
+        else:
+            self._ports_state = None
         return self._local_ports
 
+    def _local_ports_changed(self) -> bool:
+        """Returns True if a cached port was moved, rotated, added or removed."""
+        if self._ports_state is None:
+            return bool(self._local_ports)
+        centers, centers_copy, ports = self._ports_state
+        return (
+            len(ports) != len(self._local_ports)
+            or not np.array_equal(centers, centers_copy)
+            or any(
+                self._local_ports.get(name) is not port
+                or port.center is not center
+                or port.orientation != orientation
+                for name, port, center, orientation in ports
+            )
+        )
+
     @property
     def info(self) -> Dict[str, Any]:
         return self.parent.info
@@ -502,6 +562,33 @@ class ComponentReference(_GeometryHelper):
 
         return new_point, new_orientation
 
+    def _transform_ports(
+        self,
+        points: ndarray,
+        orientations: ndarray,
+        origin: Coordinate = (0, 0),
+        rotation: Optional[int] = None,
+        x_reflection: bool = False,
+    ) -> Tuple[ndarray, ndarray]:
+        """Apply GDS-type transformation to many ports at once.
+
+        Same as _transform_port for (N, 2) points and N orientations,
+        where NaN orientations stay NaN.
+        """
+        new_points = np.array(points, dtype=float)
+        new_orientations = np.array(orientations, dtype=float)
+
+        if x_reflection:
+            new_points[:, 1] = -new_points[:, 1]
+            new_orientations = -new_orientations
+        if rotation is not None:
+            new_points = _rotate_points(new_points, angle=rotation, center=[0, 0])
+            new_orientations += rotation
+        if origin is not None:
+            new_points = new_points + np.array(origin)
+
+        return new_points, mod(new_orientations, 360)
+
     def _transform_point(
         self,
         point: ndarray,
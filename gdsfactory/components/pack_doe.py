@@ -6,7 +6,6 @@ from typing import Any, Dict, List, Tuple
 import gdsfactory as gf
 from gdsfactory.cell import cell
 from gdsfactory.component import Component
-from gdsfactory.grid import grid, grid_with_text
 from gdsfactory.pack import pack
 from gdsfactory.types import CellSpec, ComponentSpec, Optional
 
@@ -148,6 +147,8 @@ def pack_doe_grid(
             gf.get_component(doe, **settings) for settings in settings_list
         ]
 
+    from gdsfactory.grid import grid, grid_with_text
+
     if with_text:
         c = grid_with_text(component_list, **kwargs)
 
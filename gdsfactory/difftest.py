@@ -17,12 +17,18 @@ class GdsRegressionFixture(FileRegressionFixture):
             difftest(c)
 """
 import filecmp
+import hashlib
+import json
 import os
 import pathlib
 import shutil
-from typing import Optional
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-from gdsfactory.component import Component
+import gdstk
+
+from gdsfactory.component import Component, _hash_cell, _hash_geometry_cell
 from gdsfactory.config import PATH, logger
 from gdsfactory.gdsdiff.gdsdiff import gdsdiff
 
@@ -121,6 +127,37 @@ def run_xor(file1, file2, tolerance: int = 1, verbose: bool = False) -> None:
         )
 
 
+def _get_test_name(component: Component) -> str:
+    # containers function_name is different from component.name
+    # we store the container with a different name from original component
+    return (
+        f"{component.function_name}_{component.name}"
+        if hasattr(component, "function_name")
+        and component.name != component.function_name
+        else f"{component.name}"
+    )
+
+
+def hash_gds(gdspath: pathlib.Path, precision: float = 1e-4) -> str:
+    """Returns the hierarchical geometry hash of the top cells of a GDS file.
+
+    Two GDS files with the same hash have the same units, top cell names and
+    cell hierarchy with the same polygons, regardless of the order of the
+    cells, polygons and references in the file.
+
+    Args:
+        gdspath: GDS file.
+        precision: rounding precision for the coordinates.
+    """
+    lib = gdstk.read_gds(str(gdspath))
+    h = hashlib.sha1(str((lib.unit, lib.precision)).encode())
+    digests = {}
+    for cell in sorted(lib.top_level(), key=lambda cell: cell.name):
+        h.update(cell.name.encode())
+        h.update(_hash_geometry_cell(cell, precision, digests))
+    return h.hexdigest()
+
+
 def difftest(
     component: Component,
     test_name: Optional[str] = None,
@@ -128,7 +165,8 @@ def difftest(
 ) -> None:
     """Avoids GDS regressions tests on the GeometryDifference.
 
-    If files are the same it returns None. If files are different runs XOR
+    If files or their hierarchical geometry hashes are the same it returns None.
+    If files are different runs XOR
     between new component and the GDS reference stored in dirpath and
     raises GeometryDifference if there are differences and show differences in KLayout.
 
@@ -139,14 +177,7 @@ def difftest(
         test_name: used to store the GDS file.
         dirpath: defaults to cwd refers to where the test is being invoked.
     """
-    # containers function_name is different from component.name
-    # we store the container with a different name from original component
-    test_name = test_name or (
-        f"{component.function_name}_{component.name}"
-        if hasattr(component, "function_name")
-        and component.name != component.function_name
-        else f"{component.name}"
-    )
+    test_name = test_name or _get_test_name(component)
     filename = f"{test_name}.gds"
     ref_file = dirpath / "gds_ref" / filename
     run_file = dirpath / "gds_run" / filename
@@ -163,6 +194,9 @@ def difftest(
     if filecmp.cmp(ref_file, run_file, shallow=False):
         return
 
+    if hash_gds(ref_file) == hash_gds(run_file):
+        return
+
     try:
         run_xor(str(ref_file), str(run_file), tolerance=1, verbose=False)
     except GeometryDifference as error:
@@ -205,6 +239,226 @@ def difftest(
             ) from exc
 
 
+_layouts: Dict[Tuple[str, int], Any] = {}
+
+
+def _read_layout(gdspath: str):
+    """Returns a klayout Layout, read once per process and file version."""
+    import klayout.db as kdb
+
+    key = (gdspath, os.stat(gdspath).st_mtime_ns)
+    if key not in _layouts:
+        layout = kdb.Layout()
+        layout.read(gdspath)
+        _layouts[key] = layout
+    return _layouts[key]
+
+
+def _xor_cell_layer(
+    file1: str,
+    file2: str,
+    cell_name: str,
+    layer: Tuple[int, int],
+    tolerance: int = 1,
+) -> Tuple[int, float]:
+    """Returns the number of XOR polygons of a cell on a layer and the time it took.
+
+    Args:
+        file1: ref gdspath.
+        file2: run gdspath.
+        cell_name: cell to XOR, with all its references.
+        layer: (layer, datatype).
+        tolerance: in database units.
+    """
+    import klayout.db as kdb
+
+    t0 = time.perf_counter()
+    regions = []
+    for gdspath in (file1, file2):
+        layout = _read_layout(gdspath)
+        cell = layout.cell(cell_name)
+        layer_index = layout.find_layer(*layer)
+        if cell is None or layer_index is None:
+            regions.append(kdb.Region())
+        else:
+            regions.append(kdb.Region(cell.begin_shapes_rec(layer_index)))
+
+    xor = regions[0] ^ regions[1]
+    if tolerance > 0:
+        xor.size(-tolerance)
+    return xor.count(), time.perf_counter() - t0
+
+
+def _get_changed_cells(
+    file1: pathlib.Path, file2: pathlib.Path, precision: float = 1e-4
+) -> Optional[Dict[str, Any]]:
+    """Returns None if two GDS files have the same hierarchical geometry hash.
+
+    Otherwise returns the cells whose own polygons or references changed, the
+    cells only in one of the files and the layers of both files.
+    """
+    lib1 = gdstk.read_gds(str(file1))
+    lib2 = gdstk.read_gds(str(file2))
+    tops1 = sorted(cell.name for cell in lib1.top_level())
+    tops2 = sorted(cell.name for cell in lib2.top_level())
+
+    if (lib1.unit, lib1.precision) == (lib2.unit, lib2.precision) and tops1 == tops2:
+        digests1: Dict[int, bytes] = {}
+        digests2: Dict[int, bytes] = {}
+        if all(
+            _hash_geometry_cell(cell1, precision, digests1)
+            == _hash_geometry_cell(cell2, precision, digests2)
+            for cell1, cell2 in zip(
+                sorted(lib1.top_level(), key=lambda cell: cell.name),
+                sorted(lib2.top_level(), key=lambda cell: cell.name),
+            )
+        ):
+            return None
+
+    cells1 = {cell.name: cell for cell in lib1.cells}
+    cells2 = {cell.name: cell for cell in lib2.cells}
+    changed = [
+        name
+        for name in cells1
+        if name in cells2
+        and _hash_cell(cells1[name], precision) != _hash_cell(cells2[name], precision)
+    ]
+    layers = set(lib1.layers_and_datatypes()) | set(lib2.layers_and_datatypes())
+    return dict(
+        changed_cells=changed,
+        removed_cells=sorted(set(cells1) - set(cells2)),
+        added_cells=sorted(set(cells2) - set(cells1)),
+        top_cells=(tops1, tops2),
+        layers=sorted(layers),
+    )
+
+
+def difftest_batch(
+    components: Union[Dict[str, Component], Sequence[Component]],
+    dirpath: pathlib.Path = PATH.gdsdiff,
+    workers: Optional[int] = None,
+    tolerance: int = 1,
+    precision: float = 1e-4,
+    report: Optional[pathlib.Path] = None,
+    raise_error: bool = True,
+) -> Dict[str, Any]:
+    """Runs GDS regression tests for many components and returns a report.
+
+    Like difftest, without prompts. For each component the run GDS is compared
+    with the reference GDS in dirpath:
+
+    - new: no reference, writes it.
+    - same: same file or same hierarchical geometry hash (see hash_gds).
+    - equivalent: some cells changed, but their XOR is empty.
+    - changed: some cells have XOR differences, or the top cells changed.
+
+    Only cells whose own polygons or references changed are XORed, each with
+    all its references, and the XOR of each changed cell and layer runs in a
+    process pool.
+
+    Args:
+        components: dict of test_name to Component, or list of Components.
+        dirpath: with gds_ref and gds_run directories.
+        workers: number of processes for the XOR. Defaults to the number of CPUs.
+            1 runs the XOR in this process.
+        tolerance: in database units (nm).
+        precision: rounding precision for the hashes.
+        report: JSON filepath for the report. Defaults to dirpath/report.json.
+        raise_error: raises GeometryDifference if any component changed and
+            AssertionError if any reference was missing.
+
+    Returns:
+        report dict with the status, time in seconds, changed cells and XOR
+        differences of each component. The differences of each changed cell
+        have the XOR time in seconds and the number of XOR polygons of each
+        layer with differences.
+    """
+    t0 = time.perf_counter()
+    if not isinstance(components, dict):
+        components = {_get_test_name(c): c for c in components}
+    dirpath = pathlib.Path(dirpath)
+    workers = workers or os.cpu_count() or 1
+
+    results: Dict[str, Dict[str, Any]] = {}
+    tasks: List[Tuple[str, Tuple[str, str, str, Tuple[int, int], int]]] = []
+
+    for test_name, component in components.items():
+        t1 = time.perf_counter()
+        filename = f"{test_name}.gds"
+        ref_file = dirpath / "gds_ref" / filename
+        run_file = dirpath / "gds_run" / filename
+        component.write_gds(gdspath=run_file)
+        result: Dict[str, Any] = dict(status="same")
+        results[test_name] = result
+
+        if not ref_file.exists():
+            component.write_gds(gdspath=ref_file)
+            result["status"] = "new"
+        elif not filecmp.cmp(ref_file, run_file, shallow=False):
+            changes = _get_changed_cells(ref_file, run_file, precision=precision)
+            if changes is not None:
+                top_cells = changes.pop("top_cells")
+                layers = changes.pop("layers")
+                result.update(changes)
+                result["status"] = (
+                    "changed" if top_cells[0] != top_cells[1] else "equivalent"
+                )
+                result["differences"] = {}
+                tasks += [
+                    (test_name, (str(ref_file), str(run_file), cell, layer, tolerance))
+                    for cell in changes["changed_cells"]
+                    for layer in layers
+                ]
+        result["time"] = time.perf_counter() - t1
+
+    try:
+        if workers == 1 or len(tasks) < 2:
+            xors = [_xor_cell_layer(*args) for _, args in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                xors = list(executor.map(_xor_cell_layer, *zip(*(t[1] for t in tasks))))
+    finally:
+        # layouts read in this process are only reused within one batch
+        _layouts.clear()
+
+    for (test_name, args), (count, xor_time) in zip(tasks, xors):
+        _, _, cell, layer, _ = args
+        result = results[test_name]
+        result["time"] += xor_time
+        differences = result["differences"].setdefault(cell, dict(time=0.0, layers={}))
+        differences["time"] += xor_time
+        if count:
+            result["status"] = "changed"
+            differences["layers"][f"{layer[0]}/{layer[1]}"] = count
+
+    summary = {
+        "time": time.perf_counter() - t0,
+        "workers": workers,
+        "components": results,
+    }
+    report = pathlib.Path(report) if report else dirpath / "report.json"
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(json.dumps(summary, indent=2))
+
+    changed = [name for name, r in results.items() if r["status"] == "changed"]
+    new = [name for name, r in results.items() if r["status"] == "new"]
+    logger.info(
+        f"difftest_batch: {len(results)} components, {len(changed)} changed, "
+        f"{len(new)} new in {summary['time']:.1f} s. Report in {str(report)!r}"
+    )
+    if raise_error and changed:
+        raise GeometryDifference(
+            f"{changed} changed from reference in {str(dirpath / 'gds_ref')!r}. "
+            f"See {str(report)!r}"
+        )
+    if raise_error and new:
+        raise AssertionError(
+            f"Reference GDS files for {new} not found. "
+            f"Writing to {str(dirpath / 'gds_ref')!r}"
+        )
+    return summary
+
+
 if __name__ == "__main__":
     import gdsfactory as gf
 
@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import itertools
-from typing import Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
 
 import gdstk
 import numpy as np
@@ -12,7 +13,8 @@ from gdsfactory.cell import cell
 from gdsfactory.component import Component
 from gdsfactory.component_layout import _parse_layer
 from gdsfactory.components.rectangle import rectangle
-from gdsfactory.types import Float2, Floats, LayerSpecs
+from gdsfactory.pdk import get_layer
+from gdsfactory.types import Float2, Floats, LayerSpec, LayerSpecs
 
 
 def _loop_over(var):
@@ -30,43 +32,118 @@ def _loop_over(var):
     return var if hasattr(var, "__iter__") else [var]
 
 
-def _rasterize_polygons(polygons, bounds=([-100, -100], [100, 100]), dx=1, dy=1):
-    """Converts polygons to a black/white (1/0) matrix."""
-    try:
-        from skimage import draw
-    except ImportError as e:
-        raise ImportError(
-            "The fill function requires the module "
-            '"scikit-image" to operate.  Please retry '
-            "after installing scikit-image:\n\n"
-            "$ pip install --upgrade scikit-image"
-        ) from e
-
-    # Prepare polygon array by shifting all points into the first quadrant and
-    # separating points into x and y lists
-    xpts = []
-    ypts = []
+def _get_raster_shape(bounds, dx: float, dy: float) -> Tuple[int, int]:
+    """Returns the (rows, columns) of the raster of a bounding box."""
+    xsize = int(np.ceil(bounds[1][0] - bounds[0][0]) / dx)
+    ysize = int(np.ceil(bounds[1][1] - bounds[0][1]) / dy)
+    return ysize, xsize
+
+
+def _to_raster_coords(polygons, bounds, dx: float, dy: float) -> List[np.ndarray]:
+    """Returns polygons as (row, column) coordinates of the raster.
+
+    Pixel (i, j) is centered at (i, j).
+    """
+    raster_polygons = []
     for p in polygons:
         p_array = np.asarray(p)
         x = p_array[:, 0]
         y = p_array[:, 1]
-        xpts.append((x - bounds[0][0]) / dx - 0.5)
-        ypts.append((y - bounds[0][1]) / dy - 0.5)
+        raster_polygons.append(
+            np.column_stack(
+                [(y - bounds[0][1]) / dy - 0.5, (x - bounds[0][0]) / dx - 0.5]
+            )
+        )
+    return raster_polygons
 
-    # Initialize the raster matrix we'll be writing to
-    xsize = int(np.ceil(bounds[1][0] - bounds[0][0]) / dx)
-    ysize = int(np.ceil(bounds[1][1] - bounds[0][1]) / dy)
-    raster = np.zeros((ysize, xsize), dtype=bool)
 
-    # TODO: Replace polygon_perimeter with the supercover version
-    for n in range(len(xpts)):
-        rr, cc = draw.polygon(ypts[n], xpts[n], shape=raster.shape)
-        rrp, ccp = draw.polygon_perimeter(
-            ypts[n], xpts[n], shape=raster.shape, clip=False
-        )
-        raster[rr, cc] = 1
-        raster[rrp, ccp] = 1
+def _fill_polygon(raster: np.ndarray, r: np.ndarray, c: np.ndarray, window) -> None:
+    """Sets the pixels with their center inside a polygon with a scanline.
+
+    Even-odd rule: pixel centers on the left or bottom edges are inside.
+    """
+    i0, i1, j0, j1 = window
+    rmin = max(i0, int(np.ceil(r.min())))
+    rmax = min(i1 - 1, int(np.floor(r.max())))
+    if rmax < rmin or c.max() < j0 or c.min() >= j1:
+        return
+
+    # edges from the previous vertex (rj, cj) to each vertex (r, c)
+    rj = np.roll(r, 1)
+    cj = np.roll(c, 1)
+    chunk = max(1, 2**20 // len(r))
+    for row0 in range(rmin, rmax + 1, chunk):
+        rows = np.arange(row0, min(row0 + chunk, rmax + 1))[:, None]
+        crossing = ((r <= rows) & (rows < rj)) | ((rj <= rows) & (rows < r))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (cj - c) * (rows - r) / (rj - r) + c
+        x = np.sort(np.where(crossing, x, np.inf), axis=1)
+        npairs = x.shape[1] // 2
+        starts = np.clip(np.ceil(x[:, 0 : 2 * npairs : 2]), j0, j1) - j0
+        ends = np.clip(np.ceil(x[:, 1 : 2 * npairs : 2]), j0, j1) - j0
+        valid = np.isfinite(x[:, 1 : 2 * npairs : 2]) & (ends > starts)
+        row, pair = np.nonzero(valid)
+        counts = np.zeros((len(rows), j1 - j0 + 1), dtype=np.int32)
+        np.add.at(counts, (row, starts[row, pair].astype(int)), 1)
+        np.add.at(counts, (row, ends[row, pair].astype(int)), -1)
+        raster[rows[:, 0] - i0] |= counts.cumsum(axis=1)[:, :-1] > 0
+
+
+def _draw_perimeter(raster: np.ndarray, r: np.ndarray, c: np.ndarray, window) -> None:
+    """Sets the pixels of the Bresenham lines between rounded polygon vertices."""
+    # TODO: Replace with the supercover version
+    i0, i1, j0, j1 = window
+    r = np.round(np.append(r, r[:1])).astype(int)
+    c = np.round(np.append(c, c[:1])).astype(int)
+    r0, r1, c0, c1 = r[:-1], r[1:], c[:-1], c[1:]
+    dr = np.abs(r1 - r0)
+    dc = np.abs(c1 - c0)
+    sr = np.where(r1 - r0 > 0, 1, -1)
+    sc = np.where(c1 - c0 > 0, 1, -1)
+    steep = dr > dc
+    major = np.where(steep, dr, dc)
+    minor = np.where(steep, dc, dr)
+
+    # pixel i along the major axis of each line, m along the minor axis
+    counts = major + 1
+    line = np.repeat(np.arange(len(counts)), counts)
+    i = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    major, minor, steep = major[line], minor[line], steep[line]
+    m = (2 * minor * i + major) // np.maximum(2 * major, 1)
+    rows = r0[line] + sr[line] * np.where(steep, i, m)
+    cols = c0[line] + sc[line] * np.where(steep, m, i)
+    inside = (rows >= i0) & (rows < i1) & (cols >= j0) & (cols < j1)
+    raster[rows[inside] - i0, cols[inside] - j0] = 1
+
+
+def _rasterize_polygons(
+    polygons, bounds=([-100, -100], [100, 100]), dx=1, dy=1, window=None
+):
+    """Converts polygons to a black/white (1/0) matrix.
+
+    Pixels with their center inside a polygon or on its perimeter are 1.
+
+    Args:
+        polygons: list of polygon points.
+        bounds: ((xmin, ymin), (xmax, ymax)) of the raster.
+        dx: pixel width.
+        dy: pixel height.
+        window: (i0, i1, j0, j1) only returns rows i0:i1 and columns j0:j1
+            of the raster. Defaults to the full raster.
+    """
+    if window is None:
+        rows, columns = _get_raster_shape(bounds, dx, dy)
+        window = (0, rows, 0, columns)
+    return _rasterize(_to_raster_coords(polygons, bounds, dx, dy), window)
 
+
+def _rasterize(polygons: List[np.ndarray], window) -> np.ndarray:
+    """Returns the raster window of polygons in (row, column) coordinates."""
+    i0, i1, j0, j1 = window
+    raster = np.zeros((i1 - i0, j1 - j0), dtype=bool)
+    for p in polygons:
+        _fill_polygon(raster, p[:, 0], p[:, 1], window)
+        _draw_perimeter(raster, p[:, 0], p[:, 1], window)
     return raster
 
 
@@ -77,28 +154,281 @@ def _raster_index_to_coords(i, j, bounds=([-100, -100], [100, 100]), dx=1, dy=1)
     return x, y
 
 
+def _get_neighborhood(distance) -> np.ndarray:
+    """Returns the elliptical footprint used to expand the raster."""
+    num_pixels = np.array(np.ceil(distance), dtype=int)
+    rows, cols = np.ogrid[
+        -num_pixels[1] : num_pixels[1] + 1, -num_pixels[0] : num_pixels[0] + 1
+    ]
+    return (rows / (distance[1] + 0.5)) ** 2 + (cols / (distance[0] + 0.5)) ** 2 < 1
+
+
 def _expand_raster(raster, distance=(4, 2)):
-    """Expands all black (1) pixels in the raster."""
-    try:
-        from skimage import draw, morphology
-    except ImportError as e:
-        raise ImportError(
-            "The fill function requires the module "
-            '"scikit-image" to operate.  Please retry '
-            "after installing scikit-image:\n\n"
-            "$ pip install --upgrade scikit-image"
-        ) from e
+    """Expands all black (1) pixels in the raster.
+
+    Dilates each row of the elliptical footprint with running sums, so the
+    cost does not grow with the footprint width.
+    """
     if distance[0] <= 0.5 and distance[1] <= 0.5:
         return raster
 
-    num_pixels = np.array(np.ceil(distance), dtype=int)
-    neighborhood = np.zeros((num_pixels[1] * 2 + 1, num_pixels[0] * 2 + 1), dtype=bool)
-    rr, cc = draw.ellipse(
-        num_pixels[1], num_pixels[0], distance[1] + 0.5, distance[0] + 0.5
+    neighborhood = _get_neighborhood(distance)
+    num_rows = neighborhood.shape[0] // 2
+    nrows, ncols = raster.shape
+    s = np.zeros((nrows, ncols + 1), dtype=np.int32)
+    s[:, 1:] = raster.cumsum(axis=1)
+    j = np.arange(ncols)
+
+    expanded = np.zeros_like(raster, dtype=bool)
+    dilated_rows = {}
+    for k, footprint_row in enumerate(neighborhood):
+        width = footprint_row.sum() // 2
+        if not footprint_row.any():
+            continue
+        if width not in dilated_rows:
+            left = np.clip(j - width, 0, ncols)
+            right = np.clip(j + width + 1, 0, ncols)
+            dilated_rows[width] = (s[:, right] - s[:, left]) > 0
+        dilated = dilated_rows[width]
+        shift = k - num_rows
+        if shift >= 0:
+            expanded[shift:] |= dilated[: nrows - shift]
+        else:
+            expanded[:shift] |= dilated[-shift:]
+    return expanded
+
+
+def _get_runs(free: np.ndarray) -> np.ndarray:
+    """Returns (row, column, length) of the runs of True in each row."""
+    padded = np.zeros((free.shape[0], free.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = free
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return np.column_stack([rows, starts, ends - starts])
+
+
+def _merge_runs(runs: np.ndarray) -> np.ndarray:
+    """Returns (row, column, rows, columns) rectangles from runs.
+
+    Joins abutting runs of the same row, then equal runs of consecutive rows.
+    """
+    if not len(runs):
+        return np.zeros((0, 4), dtype=int)
+    runs = runs[np.lexsort((runs[:, 1], runs[:, 0]))]
+    new = np.ones(len(runs), dtype=bool)
+    new[1:] = (runs[1:, 0] != runs[:-1, 0]) | (
+        runs[1:, 1] != runs[:-1, 1] + runs[:-1, 2]
+    )
+    first = np.flatnonzero(new)
+    runs = np.column_stack(
+        [runs[first, 0], runs[first, 1], np.add.reduceat(runs[:, 2], first)]
+    )
+
+    runs = runs[np.lexsort((runs[:, 0], runs[:, 2], runs[:, 1]))]
+    new = np.ones(len(runs), dtype=bool)
+    new[1:] = (
+        (runs[1:, 1] != runs[:-1, 1])
+        | (runs[1:, 2] != runs[:-1, 2])
+        | (runs[1:, 0] != runs[:-1, 0] + 1)
     )
-    neighborhood[rr, cc] = 1
+    first = np.flatnonzero(new)
+    nrows = np.diff(np.append(first, len(runs)))
+    return np.column_stack([runs[first, 0], runs[first, 1], nrows, runs[first, 2]])
+
+
+def _fill_tile(args) -> np.ndarray:
+    """Returns the (row, column, length) runs of free pixels of a tile.
+
+    The tile is rasterized with a halo as wide as the expansion, so tiles
+    give the same result as one raster of the whole die.
+    """
+    exclude_polys, include_polys, shape, window, distance = args
+    i0, i1, j0, j1 = window
+    halo = np.array(np.ceil(distance), dtype=int) if max(distance) > 0.5 else (0, 0)
+    expanded_window = (
+        max(i0 - halo[1], 0),
+        min(i1 + halo[1], shape[0]),
+        max(j0 - halo[0], 0),
+        min(j1 + halo[0], shape[1]),
+    )
+    raster = _rasterize(exclude_polys, expanded_window)
+    if include_polys:
+        raster &= ~_rasterize(include_polys, expanded_window)
+    raster = _expand_raster(raster, distance=distance)
+
+    di = i0 - expanded_window[0]
+    dj = j0 - expanded_window[2]
+    free = ~raster[di : di + i1 - i0, dj : dj + j1 - j0]
+    runs = _get_runs(free)
+    runs[:, 0] += i0
+    runs[:, 1] += j0
+    return runs
+
+
+def _get_polygons_in_window(
+    polygons: List[np.ndarray], bboxes: np.ndarray, window
+) -> List[np.ndarray]:
+    """Returns the polygons with a (row, column) bbox close to a raster window."""
+    if not polygons:
+        return []
+    i0, i1, j0, j1 = window
+    inside = (
+        (bboxes[:, 0] <= i1)
+        & (bboxes[:, 1] >= i0 - 1)
+        & (bboxes[:, 2] <= j1)
+        & (bboxes[:, 3] >= j0 - 1)
+    )
+    return [polygons[k] for k in np.flatnonzero(inside)]
+
+
+def _get_bboxes(polygons: List[np.ndarray]) -> np.ndarray:
+    """Returns (rmin, rmax, cmin, cmax) of polygons in raster coordinates."""
+    return np.array(
+        [[p[:, 0].min(), p[:, 0].max(), p[:, 1].min(), p[:, 1].max()] for p in polygons]
+    ).reshape(-1, 4)
 
-    return morphology.binary_dilation(image=raster, footprint=neighborhood)
+
+def _get_areas(
+    polygons: List[np.ndarray],
+    xedges: np.ndarray,
+    yedges: np.ndarray,
+    precision: float = 1e-4,
+) -> np.ndarray:
+    """Returns the (ny, nx) area of the union of polygons in each grid cell.
+
+    Polygons are merged, sliced along the grid lines with gdstk and the area
+    of all the pieces is computed at once with the shoelace formula.
+    """
+    areas = np.zeros((len(yedges) - 1, len(xedges) - 1))
+    if not polygons:
+        return areas
+    merged = gdstk.boolean(polygons, [], "or", precision=precision)
+
+    pieces = []
+    cells = []
+    columns = gdstk.slice(merged, list(xedges), "x")[1:-1]
+    for j, column in enumerate(columns):
+        rows = gdstk.slice(column, list(yedges), "y")[1:-1]
+        for i, row in enumerate(rows):
+            pieces.extend(p.points for p in row)
+            cells.extend([i * areas.shape[1] + j] * len(row))
+    if not pieces:
+        return areas
+
+    points = np.concatenate(pieces)
+    following = np.roll(points, -1, axis=0)
+    starts = np.cumsum([0] + [len(p) for p in pieces[:-1]])
+    ends = starts + [len(p) for p in pieces]
+    following[ends - 1] = points[starts]
+    cross = points[:, 0] * following[:, 1] - following[:, 0] * points[:, 1]
+    piece_areas = np.abs(np.add.reduceat(cross, starts)) / 2
+    areas.flat += np.bincount(cells, weights=piece_areas, minlength=areas.size)
+    return areas
+
+
+def get_density_map(
+    component: Component,
+    layer: LayerSpec,
+    window_size: Float2 = (100.0, 100.0),
+    step: Optional[Float2] = None,
+    bbox: Optional[Float2] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the density of a layer in windows over a Component.
+
+    Args:
+        component: to compute the density of.
+        layer: layer spec.
+        window_size: x, y size of the density windows.
+        step: x, y distance between windows, for sliding windows.
+            Rounded so window_size is a multiple of it. Defaults to window_size.
+        bbox: ((xmin, ymin), (xmax, ymax)) area to compute the density.
+            Defaults to the component bbox.
+
+    Returns:
+        density: (ny, nx) array with the density of each window.
+        x: nx window centers.
+        y: ny window centers.
+
+    .. code::
+
+        import numpy as np
+        import gdsfactory as gf
+
+        c = gf.components.mzi()
+        density, x, y = gf.fill.get_density_map(c, layer=(1, 0), window_size=(20, 20))
+        np.savez("density.npz", density=density, x=x, y=y)
+    """
+    layer = _parse_layer(get_layer(layer))
+    bbox = np.array(component.bbox if bbox is None else bbox, dtype=float)
+    window_size = np.array(window_size, dtype=float)
+    step = window_size if step is None else np.array(step, dtype=float)
+    k = np.maximum(np.round(window_size / step), 1).astype(int)
+    step = window_size / k
+
+    size = bbox[1] - bbox[0]
+    n = np.maximum(np.ceil(size / step - 1e-9).astype(int), k)
+    xedges = bbox[0][0] + step[0] * np.arange(n[0] + 1)
+    yedges = bbox[0][1] + step[1] * np.arange(n[1] + 1)
+
+    polygons = component.get_polygons(by_spec=True).get(layer, [])
+    areas = _get_areas(polygons, xedges, yedges)
+
+    # sum the areas of the k x k steps of each window
+    s = np.zeros((areas.shape[0] + 1, areas.shape[1] + 1))
+    s[1:, 1:] = areas.cumsum(axis=0).cumsum(axis=1)
+    window_areas = s[k[1] :, k[0] :] - s[: -k[1], k[0] :] - s[k[1] :, : -k[0]]
+    window_areas += s[: -k[1], : -k[0]]
+    density = np.maximum(window_areas, 0) / np.prod(window_size)
+    x = xedges[: len(xedges) - k[0]] + window_size[0] / 2
+    y = yedges[: len(yedges) - k[1]] + window_size[1] / 2
+    return density, x, y
+
+
+def _select_runs(runs: np.ndarray, needed: np.ndarray, window: Tuple[int, int]):
+    """Returns runs keeping the needed number of pixels in each window.
+
+    Keeps whole runs, in rows spread over each window (bit reversed row order),
+    and cuts the last run of each window to the exact number of pixels.
+
+    Args:
+        runs: (row, column, length) of free pixels.
+        needed: (rows, columns) number of pixels to keep in each window.
+        window: (rows, columns) of pixels of each window.
+    """
+    rows, columns = window
+
+    # split runs at the window boundaries
+    last = runs[:, 1] + runs[:, 2] - 1
+    pieces = last // columns - runs[:, 1] // columns + 1
+    index = np.repeat(np.arange(len(runs)), pieces)
+    k = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    start = np.maximum(runs[index, 1], (runs[index, 1] // columns + k) * columns)
+    end = np.minimum(last[index] + 1, (runs[index, 1] // columns + k + 1) * columns)
+    runs = np.column_stack([runs[index, 0], start, end - start])
+
+    wi = runs[:, 0] // rows
+    wj = runs[:, 1] // columns
+    w = wi * needed.shape[1] + wj
+
+    nbits = max(int(np.ceil(np.log2(rows))), 1)
+    local = runs[:, 0] % rows
+    rank = np.zeros_like(local)
+    for bit in range(nbits):
+        rank |= ((local >> bit) & 1) << (nbits - 1 - bit)
+
+    order = np.lexsort((runs[:, 1], rank, w))
+    runs, w = runs[order], w[order]
+    lengths = runs[:, 2]
+    cumsum = np.cumsum(lengths)
+    first = np.flatnonzero(np.r_[True, w[1:] != w[:-1]])
+    group_start = np.repeat(
+        cumsum[first] - lengths[first], np.diff(np.r_[first, len(w)])
+    )
+    before = cumsum - lengths - group_start
+    keep = needed.flat[w] - before
+    runs[:, 2] = np.minimum(lengths, keep)
+    return runs[runs[:, 2] > 0]
 
 
 @cell
@@ -152,12 +482,24 @@ def fill_rectangle(
     fill_densities: Union[float, Floats] = (0.5, 0.25, 0.7),
     fill_inverted: bool = False,
     bbox: Optional[Float2] = None,
+    tile_size: Optional[Float2] = None,
+    workers: int = 1,
+    target_density: Optional[float] = None,
+    density_window: Float2 = (100.0, 100.0),
 ) -> Component:
     """Returns rectangular fill pattern and fills all empty areas.
 
     In the input component and returns a component that contains just the fill
     Dummy fill keeps density constant during fabrication
 
+    The die is rasterized in tiles (optionally in a process pool) and the fill
+    cells are added as array references, one for each rectangle of free cells.
+    The fill density of each tile is stored in component.info["tiles"].
+
+    With target_density, each density_window only gets the fill cells needed to
+    reach target_density on every fill layer, counting the existing polygons
+    of the component on that layer (see get_density_map).
+
     Args:
         component: Component to fill.
         fill_layers: list of layers. fill pattern layers.
@@ -168,6 +510,12 @@ def fill_rectangle(
         fill_densities: defines the fill pattern density (1.0 == fully filled).
         fill_inverted: inverts the fill pattern.
         bbox: x, y limit the fill pattern to the area defined by this bounding box.
+        tile_size: x, y size of the tiles, rounded to a whole number of fill cells.
+            Defaults to 1000 x 1000 fill cells.
+        workers: number of processes to rasterize the tiles.
+        target_density: density to reach in each window. None fills all areas.
+        density_window: x, y size of the windows for target_density,
+            rounded to a whole number of fill cells.
 
     """
     D = component
@@ -224,23 +572,91 @@ def fill_rectangle(
     if bbox is None:
         bbox = D.bbox
 
-    raster = _rasterize_polygons(
-        polygons=exclude_polys, bounds=bbox, dx=fill_size[0], dy=fill_size[1]
+    dx, dy = fill_size
+    shape = _get_raster_shape(bbox, dx, dy)
+    distance = tuple(margin / np.array(fill_size))
+    exclude_polys = _to_raster_coords(exclude_polys, bbox, dx, dy)
+    include_polys = _to_raster_coords(include_polys, bbox, dx, dy)
+    exclude_bboxes = _get_bboxes(exclude_polys)
+    include_bboxes = _get_bboxes(include_polys)
+    halo = np.ceil(distance).astype(int) + 1
+
+    tile_columns, tile_rows = (
+        (1000, 1000)
+        if tile_size is None
+        else (max(1, round(tile_size[0] / dx)), max(1, round(tile_size[1] / dy)))
     )
-    raster = raster & ~_rasterize_polygons(
-        polygons=include_polys, bounds=bbox, dx=fill_size[0], dy=fill_size[1]
-    )
-    raster = _expand_raster(raster, distance=margin / np.array(fill_size))
-
-    for i in range(np.size(raster, 0)):
-        sub_rasters = [list(g) for k, g in itertools.groupby(raster[i])]
-        j = 0
-        for s in sub_rasters:
-            if s[0] == 0:
-                x, y = _raster_index_to_coords(i, j, bbox, fill_size[0], fill_size[1])
-                a = F.add_array(fill_cell, columns=len(s), rows=1, spacing=fill_size)
-                a.move((x, y))
-            j += len(s)
+    windows = [
+        (i0, min(i0 + tile_rows, shape[0]), j0, min(j0 + tile_columns, shape[1]))
+        for i0 in range(0, shape[0], tile_rows)
+        for j0 in range(0, shape[1], tile_columns)
+    ]
+    tasks = []
+    for i0, i1, j0, j1 in windows:
+        expanded_window = (i0 - halo[1], i1 + halo[1], j0 - halo[0], j1 + halo[0])
+        tasks.append(
+            (
+                _get_polygons_in_window(exclude_polys, exclude_bboxes, expanded_window),
+                _get_polygons_in_window(include_polys, include_bboxes, expanded_window),
+                shape,
+                (i0, i1, j0, j1),
+                distance,
+            )
+        )
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_fill_tile, tasks))
+    else:
+        results = [_fill_tile(task) for task in tasks]
+
+    runs = np.concatenate(results) if results else np.zeros((0, 3), int)
+
+    layer_densities = [
+        1 - density if inverted else density
+        for density, inverted in zip(fill_densities, fill_inverted)
+    ]
+    if target_density is not None:
+        window_columns = max(1, round(density_window[0] / dx))
+        window_rows = max(1, round(density_window[1] / dy))
+        xedges = (
+            bbox[0][0] + dx * np.r_[np.arange(0, shape[1], window_columns), shape[1]]
+        )
+        yedges = bbox[0][1] + dy * np.r_[np.arange(0, shape[0], window_rows), shape[0]]
+        window_areas = np.outer(np.diff(yedges), np.diff(xedges))
+        polygons = D.get_polygons(by_spec=True)
+        needed = np.zeros_like(window_areas)
+        for layer, density in zip(fill_layers, layer_densities):
+            if density <= 0:
+                continue
+            layer = _parse_layer(get_layer(layer))
+            areas = _get_areas(polygons.get(layer, []), xedges, yedges)
+            missing = target_density * window_areas - areas
+            needed = np.maximum(needed, missing / (density * dx * dy))
+        needed = np.ceil(needed - 1e-6).astype(int)
+        runs = _select_runs(runs, needed, (window_rows, window_columns))
+
+    rectangles = _merge_runs(runs)
+    for i, j, rows, columns in rectangles:
+        x, y = _raster_index_to_coords(i, j, bbox, dx, dy)
+        a = F.add_array(fill_cell, columns=columns, rows=rows, spacing=fill_size)
+        a.move((x, y))
+
+    tiles_per_row = -(-shape[1] // tile_columns)
+    tile = (runs[:, 0] // tile_rows) * tiles_per_row + runs[:, 1] // tile_columns
+    fill_cells = np.bincount(tile, weights=runs[:, 2], minlength=len(windows))
+    tiles = []
+    for (i0, i1, j0, j1), free in zip(windows, fill_cells.astype(int).tolist()):
+        fill_fraction = free / ((i1 - i0) * (j1 - j0))
+        xmin, ymin = bbox[0][0] + j0 * dx, bbox[0][1] + i0 * dy
+        tiles.append(
+            dict(
+                bbox=((xmin, ymin), (xmin + (j1 - j0) * dx, ymin + (i1 - i0) * dy)),
+                fill_cells=free,
+                density=[fill_fraction * d for d in layer_densities],
+            )
+        )
+    F.info["tiles"] = tiles
     return F
 
 
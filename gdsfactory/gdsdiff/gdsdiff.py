@@ -1,30 +1,149 @@
 from __future__ import annotations
 
+import hashlib
 import itertools
 import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterator, List, Tuple, Union
 
 import gdstk
+import numpy as np
 
 from gdsfactory.component import Component
+from gdsfactory.config import logger
+from gdsfactory.geometry.boolean import _boolean_tile
 from gdsfactory.read.import_gds import import_gds
+from gdsfactory.types import Int2
 
 COUNTER = itertools.count()
 
+Layer = Tuple[int, int]
+
+
+def _get_tiles(
+    polygons: List[np.ndarray], xs: np.ndarray, ys: np.ndarray, precision: float
+) -> Dict[Tuple[int, int], List[Tuple[bytes, np.ndarray]]]:
+    """Returns the (hash, points) of the polygons whose bbox overlaps each tile."""
+    nx, ny = len(xs) - 1, len(ys) - 1
+    tiles: Dict[Tuple[int, int], List[Tuple[bytes, np.ndarray]]] = {}
+    for points in polygons:
+        (xmin, ymin), (xmax, ymax) = points.min(axis=0), points.max(axis=0)
+        i0, i1 = np.clip(np.searchsorted(xs, (xmin, xmax), side="right") - 1, 0, nx - 1)
+        j0, j1 = np.clip(np.searchsorted(ys, (ymin, ymax), side="right") - 1, 0, ny - 1)
+        h = hashlib.sha1(np.round(points / precision).astype(np.int64)).digest()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                tiles.setdefault((i, j), []).append((h, points))
+    return tiles
+
+
+def _xor_polygons_tiled(
+    A_polys: Dict[Layer, List[np.ndarray]],
+    B_polys: Dict[Layer, List[np.ndarray]],
+    num_divisions: Int2,
+    workers: int,
+    precision: float = 1e-3,
+) -> Iterator[Tuple[Layer, List[np.ndarray]]]:
+    """Yields the layer and XOR polygons of each tile that differs.
+
+    Splits the bbox of both operands in num_divisions tiles. Tiles with the
+    same polygons in A and B are skipped, the others are XORed (clipped to the
+    tile) in a process pool and yielded as they finish, in tile order.
+    """
+    points = [p for polys in (A_polys, B_polys) for ps in polys.values() for p in ps]
+    if not points:
+        return
+    points = np.concatenate(points)
+    (xmin, ymin), (xmax, ymax) = points.min(axis=0), points.max(axis=0)
+    nx, ny = num_divisions
+    xs = np.linspace(xmin, xmax, nx + 1)
+    ys = np.linspace(ymin, ymax, ny + 1)
+
+    layers = []
+    tasks = []
+    skipped = 0
+    for layer in sorted(set(A_polys) | set(B_polys)):
+        A_tiles = _get_tiles(A_polys.get(layer, []), xs, ys, precision)
+        B_tiles = _get_tiles(B_polys.get(layer, []), xs, ys, precision)
+        for i, j in sorted(set(A_tiles) | set(B_tiles)):
+            A_tile = A_tiles.get((i, j), [])
+            B_tile = B_tiles.get((i, j), [])
+            if sorted(h for h, _ in A_tile) == sorted(h for h, _ in B_tile):
+                skipped += 1
+                continue
+            tile = None if nx == ny == 1 else ((xs[i], ys[j]), (xs[i + 1], ys[j + 1]))
+            layers.append(layer)
+            tasks.append(
+                (
+                    [p for _, p in A_tile],
+                    [p for _, p in B_tile],
+                    "xor",
+                    precision,
+                    tile,
+                )
+            )
 
-def xor_polygons(A: Component, B: Component, hash_geometry: bool = True):
+    logger.info(f"xor_polygons: {len(tasks)} tiles differ, {skipped} tiles skipped")
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            yield from zip(layers, executor.map(_boolean_tile, tasks))
+    else:
+        yield from zip(layers, map(_boolean_tile, tasks))
+
+
+def xor_polygons(
+    A: Component,
+    B: Component,
+    hash_geometry: bool = True,
+    num_divisions: Union[int, Int2] = (1, 1),
+    workers: int = 1,
+):
     """Given two devices A and B, performs a layer-by-layer XOR diff between A \
     and B, and returns polygons representing the differences between A and B.
 
     Adapted from lytest/kdb_xor.py
 
+    With more than one division or worker, the bbox is split into tiles.
+    Tiles where A and B have the same polygons are skipped and the others are
+    XORed in a process pool. The number of XOR polygons of each layer is
+    stored in info["differences"].
+
+    Args:
+        A: reference Component.
+        B: Component to compare.
+        hash_geometry: returns an empty Component if the geometry hashes match.
+        num_divisions: number of tiles in x and y.
+        workers: number of processes to XOR the tiles.
     """
     # first do a geometry hash to vastly speed up if they are equal
-    if hash_geometry and (A.hash_geometry() == B.hash_geometry()):
+    # the hierarchical hash does not flatten, but depends on the hierarchy
+    if hash_geometry and (
+        A.hash_geometry(hierarchical=True) == B.hash_geometry(hierarchical=True)
+        or A.hash_geometry() == B.hash_geometry()
+    ):
         return Component()
 
+    if isinstance(num_divisions, int):
+        num_divisions = (num_divisions, num_divisions)
+
     D = Component()
+    if tuple(num_divisions) != (1, 1) or workers > 1:
+        differences: Dict[str, int] = {}
+        for layer, polygons in _xor_polygons_tiled(
+            A.get_polygons(by_spec=True),
+            B.get_polygons(by_spec=True),
+            num_divisions=num_divisions,
+            workers=workers,
+        ):
+            for polygon in polygons:
+                D.add_polygon(polygon, layer=layer)
+            if polygons:
+                key = f"{layer[0]}/{layer[1]}"
+                differences[key] = differences.get(key, 0) + len(polygons)
+        D.info["differences"] = differences
+        return D
+
     A_polys = A.get_polygons(by_spec=True)
     B_polys = B.get_polygons(by_spec=True)
     A_layers = A_polys.keys()
@@ -57,6 +176,8 @@ def gdsdiff(
     component2: Union[Path, Component, str],
     name: str = "TOP",
     xor: bool = True,
+    num_divisions: Union[int, Int2] = (1, 1),
+    workers: int = 1,
 ) -> Component:
     """Compare two Components.
 
@@ -65,6 +186,8 @@ def gdsdiff(
         component2: Component or path to gds file (run).
         name: name of the top cell.
         xor: makes boolean operation.
+        num_divisions: number of XOR tiles in x and y.
+        workers: number of processes to XOR the tiles.
 
     Returns:
         Component with both cells (xor, common and diffs).
@@ -85,7 +208,13 @@ def gdsdiff(
     ref2 = top << component2
 
     if xor:
-        diff = xor_polygons(ref1, ref2, hash_geometry=False)
+        diff = xor_polygons(
+            ref1,
+            ref2,
+            hash_geometry=False,
+            num_divisions=num_divisions,
+            workers=workers,
+        )
         diff.name = f"{name}_xor"
         top.add_ref(diff)
 
@@ -34,6 +34,19 @@ def test_no_differences() -> None:
     assert area == 0, area
 
 
+def test_differences_tiled() -> None:
+    c1 = gf.components.mzi(length_x=3)
+    c2 = gf.components.mzi(length_x=2)
+    area = xor_polygons(c1, c2, hash_geometry=False).area()
+    c = xor_polygons(c1, c2, hash_geometry=False, num_divisions=(4, 4), workers=2)
+    assert abs(c.area() - area) < 1e-3, (c.area(), area)
+    assert sum(c.info["differences"].values()) == len(c.polygons)
+
+    c = xor_polygons(c1, c1, hash_geometry=False, num_divisions=4)
+    assert c.area() == 0
+    assert c.info["differences"] == {}
+
+
 if __name__ == "__main__":
     # test_no_differences()
     # test_differences()
@@ -1,8 +1,17 @@
+"""Boolean operations between Components.
+
+The hierarchical engine evaluates the merged polygons of each cell once and
+places them with the transformation of each instance. Only the instances
+whose bounding box overlaps the other operand go through the actual boolean,
+which runs on num_divisions tiles, optionally in a process pool.
+"""
 from __future__ import annotations
 
-from typing import Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 
 import gdstk
+import numpy as np
 
 import gdsfactory as gf
 from gdsfactory.component import Component
@@ -10,6 +19,258 @@ from gdsfactory.component_layout import Polygon, _parse_layer
 from gdsfactory.component_reference import ComponentReference
 from gdsfactory.types import ComponentOrReference, Int2, LayerSpec
 
+# cell, polygons (merged and fractured) in cell coordinates, matrix, offsets
+Instances = Tuple[gdstk.Cell, List[np.ndarray], np.ndarray, np.ndarray]
+
+
+def _get_matrix(reference: gdstk.Reference) -> np.ndarray:
+    """Returns the 2x2 linear part of the transformation of a reference."""
+    c, s = np.cos(reference.rotation), np.sin(reference.rotation)
+    m = reference.magnification or 1
+    r = -1 if reference.x_reflection else 1
+    return m * np.array([[c, -s * r], [s, c * r]])
+
+
+def _get_offsets(reference: gdstk.Reference) -> np.ndarray:
+    """Returns the origin of each repetition of a reference."""
+    origin = np.array(reference.origin, dtype=float)
+    if reference.repetition.size:
+        return origin + reference.repetition.get_offsets()
+    return origin[None]
+
+
+def _get_cell_polygons(cell: gdstk.Cell, precision: float) -> List[np.ndarray]:
+    """Returns the merged and fractured polygons of a cell (not its references)."""
+    polygons = list(cell.polygons)
+    for path in cell.paths:
+        polygons.extend(path.to_polygons())
+    if not polygons:
+        return []
+    merged = gdstk.boolean(polygons, [], "or", precision=precision)
+    return [
+        p.points for polygon in merged for p in polygon.fracture(precision=precision)
+    ]
+
+
+def _add_instances(
+    cell: gdstk.Cell,
+    matrix: np.ndarray,
+    offsets: np.ndarray,
+    instances: Dict[int, List],
+    cell_polygons: Dict[int, List[np.ndarray]],
+    precision: float,
+) -> None:
+    """Adds the instances of a cell and of all its references.
+
+    Instances of the same cell share their polygons, evaluated once.
+    """
+    key = id(cell)
+    if key not in cell_polygons:
+        cell_polygons[key] = _get_cell_polygons(cell, precision)
+    if cell_polygons[key]:
+        instances.setdefault(key, []).append(
+            (cell, cell_polygons[key], matrix, offsets)
+        )
+
+    for reference in cell.references:
+        if not isinstance(reference.cell, gdstk.Cell):
+            continue
+        ref_offsets = _get_offsets(reference) @ matrix.T
+        _add_instances(
+            reference.cell,
+            matrix @ _get_matrix(reference),
+            (offsets[:, None] + ref_offsets[None]).reshape(-1, 2),
+            instances,
+            cell_polygons,
+            precision,
+        )
+
+
+def _get_instances(
+    operands: List, cell_polygons: Dict[int, List[np.ndarray]], precision: float
+) -> List[Instances]:
+    """Returns instances of cells and Polygons for a list of operands."""
+    instances: Dict[int, List] = {}
+    identity = np.eye(2)
+    origin = np.zeros((1, 2))
+    polygons = []
+    for e in operands:
+        if isinstance(e, Component):
+            _add_instances(
+                e._cell, identity, origin, instances, cell_polygons, precision
+            )
+        elif isinstance(e, ComponentReference):
+            reference = e._reference
+            _add_instances(
+                reference.cell,
+                _get_matrix(reference),
+                _get_offsets(reference),
+                instances,
+                cell_polygons,
+                precision,
+            )
+        elif isinstance(e, Polygon):
+            polygons.append(e.points)
+
+    result = [instance for group in instances.values() for instance in group]
+    if polygons:
+        result.append((None, polygons, identity, origin))
+    return result
+
+
+def _get_bboxes(instance: Instances) -> np.ndarray:
+    """Returns (xmin, ymin, xmax, ymax) of each offset of an instance."""
+    _, polygons, matrix, offsets = instance
+    points = np.concatenate(polygons)
+    corners = np.array(
+        [
+            [points[:, 0].min(), points[:, 1].min()],
+            [points[:, 0].min(), points[:, 1].max()],
+            [points[:, 0].max(), points[:, 1].min()],
+            [points[:, 0].max(), points[:, 1].max()],
+        ]
+    )
+    corners = corners @ matrix.T
+    return np.hstack([offsets + corners.min(axis=0), offsets + corners.max(axis=0)])
+
+
+def _get_overlaps(
+    bboxes: np.ndarray, other_bboxes: np.ndarray, max_size: int = 1024
+) -> np.ndarray:
+    """Returns which bboxes may overlap any of other_bboxes.
+
+    Rasterizes other_bboxes into a grid of up to max_size x max_size cells,
+    so the result is conservative: it never misses an overlap.
+    """
+    if not len(bboxes) or not len(other_bboxes):
+        return np.zeros(len(bboxes), dtype=bool)
+    xmin, ymin = np.minimum(bboxes[:, :2].min(0), other_bboxes[:, :2].min(0))
+    xmax, ymax = np.maximum(bboxes[:, 2:].max(0), other_bboxes[:, 2:].max(0))
+    size = max(xmax - xmin, ymax - ymin, 1e-9) / max_size
+    shape = (int((xmax - xmin) / size) + 1, int((ymax - ymin) / size) + 1)
+
+    def _get_ranges(b: np.ndarray):
+        i0 = np.clip(((b[:, 0] - xmin) / size).astype(int), 0, shape[0] - 1)
+        j0 = np.clip(((b[:, 1] - ymin) / size).astype(int), 0, shape[1] - 1)
+        i1 = np.clip(((b[:, 2] - xmin) / size).astype(int), 0, shape[0] - 1) + 1
+        j1 = np.clip(((b[:, 3] - ymin) / size).astype(int), 0, shape[1] - 1) + 1
+        return i0, j0, i1, j1
+
+    i0, j0, i1, j1 = _get_ranges(other_bboxes)
+    counts = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int64)
+    np.add.at(counts, (i0, j0), 1)
+    np.add.at(counts, (i1, j0), -1)
+    np.add.at(counts, (i0, j1), -1)
+    np.add.at(counts, (i1, j1), 1)
+    occupied = counts.cumsum(0).cumsum(1)[:-1, :-1] > 0
+
+    s = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int64)
+    s[1:, 1:] = occupied.cumsum(0).cumsum(1)
+    i0, j0, i1, j1 = _get_ranges(bboxes)
+    return (s[i1, j1] - s[i0, j1] - s[i1, j0] + s[i0, j0]) > 0
+
+
+def _place(
+    polygons: List[np.ndarray], matrix: np.ndarray, offsets: np.ndarray
+) -> List[np.ndarray]:
+    """Returns the polygons transformed by matrix for each offset."""
+    transformed = [points @ matrix.T for points in polygons]
+    return [points + offset for offset in offsets for points in transformed]
+
+
+def _boolean_tile(
+    args: Tuple[List[np.ndarray], List[np.ndarray], str, float, Optional[Tuple]]
+) -> List[np.ndarray]:
+    """Returns the fractured polygons of a boolean operation clipped to a tile."""
+    A_polys, B_polys, operation, precision, tile = args
+    polygons = gdstk.boolean(A_polys, B_polys, operation, precision=precision)
+    if tile is not None and polygons:
+        polygons = gdstk.boolean(
+            polygons, gdstk.rectangle(*tile), "and", precision=precision
+        )
+    return [
+        p.points for polygon in polygons for p in polygon.fracture(precision=precision)
+    ]
+
+
+def _boolean_hierarchical(
+    A: List,
+    B: List,
+    operation: str,
+    precision: float,
+    num_divisions: Int2,
+    workers: int,
+) -> List[np.ndarray]:
+    """Returns the polygons of a boolean operation between two operand lists."""
+    cell_polygons: Dict[int, List[np.ndarray]] = {}
+    A_instances = _get_instances(A, cell_polygons, precision)
+    B_instances = _get_instances(B, cell_polygons, precision)
+    A_bboxes = [_get_bboxes(instance) for instance in A_instances]
+    B_bboxes = [_get_bboxes(instance) for instance in B_instances]
+    A_all = np.concatenate(A_bboxes) if A_bboxes else np.zeros((0, 4))
+    B_all = np.concatenate(B_bboxes) if B_bboxes else np.zeros((0, 4))
+
+    # instances away from the other operand keep their own polygons or vanish
+    keep = {
+        "not": (True, False),
+        "and": (False, False),
+        "or": (True, True),
+        "xor": (True, True),
+    }[operation]
+
+    polygons = []
+    overlapping = []  # (operand, polygons, matrix, offsets, bboxes)
+    for operand, instances, bboxes, other_bboxes in (
+        (0, A_instances, A_bboxes, B_all),
+        (1, B_instances, B_bboxes, A_all),
+    ):
+        for (_, polys, matrix, offsets), bbox in zip(instances, bboxes):
+            overlaps = _get_overlaps(bbox, other_bboxes)
+            if keep[operand] and not overlaps.all():
+                polygons += _place(polys, matrix, offsets[~overlaps])
+            if overlaps.any():
+                overlapping.append(
+                    (operand, polys, matrix, offsets[overlaps], bbox[overlaps])
+                )
+
+    if not overlapping:
+        return polygons
+
+    bboxes = np.concatenate([o[-1] for o in overlapping])
+    xmin, ymin = bboxes[:, :2].min(0)
+    xmax, ymax = bboxes[:, 2:].max(0)
+    nx, ny = num_divisions
+    xs = np.linspace(xmin, xmax, nx + 1)
+    ys = np.linspace(ymin, ymax, ny + 1)
+
+    tasks = []
+    for i in range(nx):
+        for j in range(ny):
+            tile = None if nx == ny == 1 else ((xs[i], ys[j]), (xs[i + 1], ys[j + 1]))
+            operands = ([], [])
+            for operand, polys, matrix, offsets, bbox in overlapping:
+                inside = (
+                    (bbox[:, 0] <= xs[i + 1])
+                    & (bbox[:, 2] >= xs[i])
+                    & (bbox[:, 1] <= ys[j + 1])
+                    & (bbox[:, 3] >= ys[j])
+                )
+                if inside.any():
+                    operands[operand].extend(_place(polys, matrix, offsets[inside]))
+            if operands[0] or operands[1]:
+                tasks.append((*operands, operation, precision, tile))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_boolean_tile, tasks))
+    else:
+        results = [_boolean_tile(task) for task in tasks]
+
+    # tiles do not overlap, so stitching them is concatenating their polygons
+    for result in results:
+        polygons += result
+    return polygons
+
 
 @gf.cell
 def boolean(
@@ -19,6 +280,8 @@ def boolean(
     precision: float = 1e-4,
     num_divisions: Union[int, Int2] = (1, 1),
     layer: LayerSpec = (1, 0),
+    hierarchical: bool = True,
+    workers: int = 1,
 ) -> Component:
     """Performs boolean operations between 2 Component/Reference/list objects.
 
@@ -37,7 +300,13 @@ def boolean(
         num_divisions: number of divisions with which the geometry is divided into
           multiple rectangular regions. This allows for each region to be
           processed sequentially, which is more computationally efficient.
+          Polygons are split at the region boundaries.
         layer: Specific layer to put polygon geometry on.
+        hierarchical: evaluates the polygons of each cell once and only runs
+          the boolean operation on the instances that overlap the other operand.
+          Polygons of instances that do not overlap are not merged together.
+          False flattens all operands (slower, uses more memory).
+        workers: number of processes to evaluate the num_divisions regions.
 
     Returns: Component with polygon(s) of the boolean operations between
       the 2 input Components performed.
@@ -55,13 +324,6 @@ def boolean(
     A = list(A) if isinstance(A, (list, tuple)) else [A]
     B = list(B) if isinstance(B, (list, tuple)) else [B]
 
-    for X, polys in ((A, A_polys), (B, B_polys)):
-        for e in X:
-            if isinstance(e, (Component, ComponentReference)):
-                polys.extend(e.get_polygons())
-            elif isinstance(e, Polygon):
-                polys.extend(e.polygons)
-
     layer = gf.pdk.get_layer(layer)
     gds_layer, gds_datatype = _parse_layer(layer)
 
@@ -70,7 +332,7 @@ def boolean(
         operation = "not"
     elif operation == "b-a":
         operation = "not"
-        A_polys, B_polys = B_polys, A_polys
+        A, B = B, A
     elif operation == "a+b":
         operation = "or"
     elif operation not in ["not", "and", "or", "xor", "a-b", "b-a", "a+b"]:
@@ -81,6 +343,33 @@ def boolean(
             "'B-A', 'A+B'"
         )
 
+    if isinstance(num_divisions, int):
+        num_divisions = (num_divisions, num_divisions)
+
+    if hierarchical:
+        polygons = _boolean_hierarchical(
+            A,
+            B,
+            operation=operation,
+            precision=precision,
+            num_divisions=num_divisions,
+            workers=workers,
+        )
+        D._add_polygons(
+            *[
+                Polygon(points, layer=gds_layer, datatype=gds_datatype)
+                for points in polygons
+            ]
+        )
+        return D
+
+    for X, polys in ((A, A_polys), (B, B_polys)):
+        for e in X:
+            if isinstance(e, (Component, ComponentReference)):
+                polys.extend(e.get_polygons())
+            elif isinstance(e, Polygon):
+                polys.extend(e.polygons)
+
     # Check for trivial solutions
     if (not A_polys or not B_polys) and operation != "or":
         if (
@@ -143,9 +432,10 @@ if __name__ == "__main__":
     c1 = gf.c.array(gf.c.circle(radius=10), columns=n, rows=n)
     c2 = gf.c.array(gf.c.circle(radius=9), columns=n, rows=n).movex(5)
 
-    t0 = time.time()
-    c = boolean(c1, c2, operation="xor")
-    t1 = time.time()
-    print(t1 - t0)
+    for hierarchical in (False, True):
+        t0 = time.time()
+        c = boolean(c1, c2, operation="xor", hierarchical=hierarchical)
+        t1 = time.time()
+        print(f"hierarchical={hierarchical} {t1 - t0:.2f}s")
 
     c.show(show_ports=True)
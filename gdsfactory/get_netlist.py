@@ -19,7 +19,7 @@ Assumes two ports are connected when they have same width, x, y
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import omegaconf
@@ -229,10 +229,6 @@ def get_netlist(
         else:
             # lower level ports
             for port in reference.ports.values():
-                reference_name = get_instance_name(
-                    component,
-                    reference,
-                )
                 src = f"{reference_name},{port.name}"
                 name2port[src] = port
                 ports_by_type[port.port_type].append(src)
@@ -325,18 +321,23 @@ def _extract_connections_two_sweep(
 
     connections = []
 
-    for _grid_name, grid_size in grids:
-        by_xy = defaultdict(list)
+    # port centers are snapped and grouped on each grid with NumPy, in one go
+    centers = np.array(
+        [ports[port_name].center for port_name in unconnected_port_names],
+        dtype=float,
+    ).reshape(-1, 2)
 
-        for port_name in unconnected_port_names:
-            port = ports[port_name]
-            by_xy[tuple(snap_to_grid(port.center, nm=grid_size))].append(port_name)
+    for _grid_name, grid_size in grids:
+        if not unconnected_port_names:
+            break
 
-        unconnected_port_names = []
+        by_xy = _group_by_xy(centers, grid_size)
+        unconnected = []
 
-        for xy, ports_at_xy in by_xy.items():
+        for indices in by_xy:
+            ports_at_xy = [unconnected_port_names[i] for i in indices]
             if len(ports_at_xy) == 1:
-                unconnected_port_names.append(ports_at_xy[0])
+                unconnected.append(indices[0])
 
             elif len(ports_at_xy) == 2:
                 port1 = ports[ports_at_xy[0]]
@@ -345,9 +346,13 @@ def _extract_connections_two_sweep(
                 connections.append(ports_at_xy)
 
             else:
+                xy = tuple(snap_to_grid(centers[indices[0]], nm=grid_size))
                 warnings["multiple_connections"].append(ports_at_xy)
                 raise ValueError(f"Found multiple connections at {xy}:{ports_at_xy}")
 
+        unconnected_port_names = [unconnected_port_names[i] for i in unconnected]
+        centers = centers[unconnected]
+
     if unconnected_port_names:
         unconnected_non_top_level = [
             pname for pname in unconnected_port_names if ("," in pname)
@@ -375,6 +380,29 @@ def _extract_connections_two_sweep(
     return connections, dict(warnings)
 
 
+def _group_by_xy(centers: np.ndarray, grid_size: int) -> List[List[int]]:
+    """Returns indices of the centers that snap to the same grid point.
+
+    Groups are sorted by first appearance and indices within a group are sorted.
+
+    Args:
+        centers: (N, 2) array of port centers in um.
+        grid_size: in nm. 0 groups only centers that are exactly the same.
+    """
+    if len(centers) == 0:
+        return []
+    # adding 0.0 turns -0.0 into 0.0
+    snapped = np.asarray(snap_to_grid(centers, nm=grid_size)) + 0.0
+    _, first, inverse = np.unique(
+        snapped, axis=0, return_index=True, return_inverse=True
+    )
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse))[:-1]
+    groups = np.split(order, splits)
+    return [groups[i].tolist() for i in np.argsort(first)]
+
+
 def _make_warning(ports: List[str], values: Any, message: str) -> Dict[str, Any]:
     w = {
         "ports": ports,
@@ -513,6 +541,9 @@ def get_netlist_recursive(
 ) -> Dict[str, Any]:
     """Returns recursive netlist for a component and subcomponents.
 
+    The netlist of each cell is extracted only once,
+    no matter how many times the cell is instantiated.
+
     Args:
         component: to extract netlist.
         component_suffix: suffix to append to each component name.
@@ -530,37 +561,69 @@ def get_netlist_recursive(
 
     """
     all_netlists = {}
+    _get_netlist_recursive(
+        component=component,
+        all_netlists=all_netlists,
+        visited=set(),
+        component_suffix=component_suffix,
+        get_netlist_func=get_netlist_func,
+        get_instance_name=get_instance_name,
+        **kwargs,
+    )
+    return all_netlists
+
+
+def _get_netlist_recursive(
+    component: Component,
+    all_netlists: Dict[str, Any],
+    visited: Set[str],
+    component_suffix: str,
+    get_netlist_func: Callable,
+    get_instance_name: Callable[..., str],
+    **kwargs,
+) -> None:
+    """Adds the netlists of component and its subcomponents to all_netlists.
+
+    Args:
+        component: to extract netlist.
+        all_netlists: netlists keyed by component name + suffix.
+        visited: names of the components already expanded.
+        component_suffix: suffix to append to each component name.
+        get_netlist_func: function to extract individual netlists.
+        get_instance_name: function to get instance name.
+    """
+    visited.add(component.name)
 
     # only components with references (subcomponents) warrant a netlist
     references = _get_references_to_netlist(component)
+    if not references:
+        return
 
-    if references:
-        netlist = get_netlist_func(component, **kwargs)
-        all_netlists[f"{component.name}{component_suffix}"] = netlist
+    netlist = get_netlist_func(component, **kwargs)
+    all_netlists[f"{component.name}{component_suffix}"] = netlist
 
-        # for each reference, expand the netlist
-        for ref in references:
-            rcell = ref.parent
-            grandchildren = get_netlist_recursive(
+    # for each reference, expand the netlist
+    for ref in references:
+        rcell = ref.parent
+        if rcell.name not in visited:
+            _get_netlist_recursive(
                 component=rcell,
+                all_netlists=all_netlists,
+                visited=visited,
                 component_suffix=component_suffix,
                 get_netlist_func=get_netlist_func,
+                get_instance_name=get_instance_name,
                 **kwargs,
             )
-            all_netlists.update(grandchildren)
 
-            child_references = _get_references_to_netlist(ref.ref_cell)
-
-            if child_references:
-                inst_name = get_instance_name(component, ref)
-                netlist_dict = {"component": f"{rcell.name}{component_suffix}"}
-                if hasattr(rcell, "settings") and hasattr(rcell.settings, "full"):
-                    netlist_dict.update(settings=rcell.settings.full)
-                if hasattr(rcell, "info"):
-                    netlist_dict.update(info=rcell.info)
-                netlist["instances"][inst_name] = netlist_dict
-
-    return all_netlists
+        if f"{rcell.name}{component_suffix}" in all_netlists:
+            inst_name = get_instance_name(component, ref)
+            netlist_dict = {"component": f"{rcell.name}{component_suffix}"}
+            if hasattr(rcell, "settings") and hasattr(rcell.settings, "full"):
+                netlist_dict.update(settings=rcell.settings.full)
+            if hasattr(rcell, "info"):
+                netlist_dict.update(info=rcell.info)
+            netlist["instances"][inst_name] = netlist_dict
 
 
 def _demo_ring_single_array() -> None:
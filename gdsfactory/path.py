@@ -253,25 +253,58 @@ class Path(_GeometryHelper):
     ):
         """Creates a offset curve (but does not account for cusps etc)\
         by computing the centerpoint offset of the supplied x and y points."""
-        new_points = np.array(points, dtype=np.float64)
+        return self._centerpoint_offset_curves(
+            points, [offset_distance], start_angle, end_angle
+        )[0]
+
+    def _centerpoint_offset_curves(
+        self, points, offset_distances, start_angle, end_angle
+    ) -> np.ndarray:
+        """Returns centerpoint offset curves for many offset distances at once.
+
+        The angles between segments are computed once for all the curves.
+
+        Args:
+            points: (N, 2) path points.
+            offset_distances: list of offsets, each a number or N numbers.
+            start_angle: in degrees.
+            end_angle: in degrees.
+
+        Returns:
+            (len(offset_distances), N, 2) array of offset curves.
+        """
+        points = np.asarray(points, dtype=np.float64)
         dx = np.diff(points[:, 0])
         dy = np.diff(points[:, 1])
         theta = np.arctan2(dy, dx)
         theta = np.concatenate([theta[:1], theta, theta[-1:]])
         theta_mid = (np.pi + theta[1:] + theta[:-1]) / 2  # Mean angle between segments
         dtheta_int = np.pi + theta[:-1] - theta[1:]  # Internal angle between segments
-        offset_distance = offset_distance / np.sin(dtheta_int / 2)
-        new_points[:, 0] -= offset_distance * np.cos(theta_mid)
-        new_points[:, 1] -= offset_distance * np.sin(theta_mid)
+        scale = np.sin(dtheta_int / 2)
+        distances = np.empty((len(offset_distances), len(points)))
+        for i, offset_distance in enumerate(offset_distances):
+            distances[i] = offset_distance
+        offset_distances = distances / scale
+        new_points = np.empty((len(offset_distances), len(points), 2))
+        new_points[..., 0] = points[:, 0] - offset_distances * np.cos(theta_mid)
+        new_points[..., 1] = points[:, 1] - offset_distances * np.sin(theta_mid)
         if start_angle is not None:
-            new_points[0, :] = points[0, :] + (
-                np.sin(start_angle * np.pi / 180) * offset_distance[0],
-                -np.cos(start_angle * np.pi / 180) * offset_distance[0],
+            new_points[:, 0, 0] = (
+                points[0, 0]
+                + np.sin(start_angle * np.pi / 180) * offset_distances[:, 0]
+            )
+            new_points[:, 0, 1] = (
+                points[0, 1]
+                - np.cos(start_angle * np.pi / 180) * offset_distances[:, 0]
             )
         if end_angle is not None:
-            new_points[-1, :] = points[-1, :] + (
-                np.sin(end_angle * np.pi / 180) * offset_distance[-1],
-                -np.cos(end_angle * np.pi / 180) * offset_distance[-1],
+            new_points[:, -1, 0] = (
+                points[-1, 0]
+                + np.sin(end_angle * np.pi / 180) * offset_distances[:, -1]
+            )
+            new_points[:, -1, 1] = (
+                points[-1, 1]
+                - np.cos(end_angle * np.pi / 180) * offset_distances[:, -1]
             )
         return new_points
 
@@ -758,13 +791,14 @@ def extrude(
                 )
             ]
 
+    # sections that follow the path are offset all at once
+    length = p.length()
+    lengths = None
+    extrusions = []
     for section in sections:
         width = section.width
         offset = section.offset
         layer = get_layer(section.layer)
-        port_names = section.port_names
-        port_types = section.port_types
-        hidden = section.hidden
 
         if isinstance(width, (int, float)) and isinstance(offset, (int, float)):
             xsection_points.append([width, offset])
@@ -778,7 +812,6 @@ def extrude(
         ):
             xsection_points.append([layer[0], layer[1]])
 
-        # print(offset, type(offset))
         if callable(offset):
             P_offset = p.copy()
             P_offset.offset(offset)
@@ -792,30 +825,48 @@ def extrude(
             end_angle = p.end_angle
 
         if callable(width):
-            # Compute lengths
-            dx = np.diff(p.points[:, 0])
-            dy = np.diff(p.points[:, 1])
-            lengths = np.cumsum(np.sqrt(dx**2 + dy**2))
-            lengths = np.concatenate([[0], lengths])
-            width = width(lengths / lengths[-1])
-        dy = offset + width / 2
-        # _points = _shear_face(points, dy, shear_angle_start, shear_angle_end)
-
-        points1 = p._centerpoint_offset_curve(
-            points,
-            offset_distance=dy,
-            start_angle=start_angle,
-            end_angle=end_angle,
+            if lengths is None:
+                # Compute lengths
+                dx = np.diff(p.points[:, 0])
+                dy = np.diff(p.points[:, 1])
+                lengths = np.cumsum(np.sqrt(dx**2 + dy**2))
+                lengths = np.concatenate([[0], lengths])
+                lengths = lengths / lengths[-1]
+            width = width(lengths)
+        extrusions.append(
+            (section, layer, width, offset, points, start_angle, end_angle)
         )
-        dy = offset - width / 2
-        # _points = _shear_face(points, dy, shear_angle_start, shear_angle_end)
-
-        points2 = p._centerpoint_offset_curve(
-            points,
-            offset_distance=dy,
-            start_angle=start_angle,
-            end_angle=end_angle,
+
+    offset_distances = [
+        offset_distance
+        for _, _, width, offset, points, _, _ in extrusions
+        if points is p.points
+        for offset_distance in (offset + width / 2, offset - width / 2)
+    ]
+    curves = iter(
+        p._centerpoint_offset_curves(
+            p.points, offset_distances, p.start_angle, p.end_angle
         )
+        if offset_distances
+        else []
+    )
+
+    for section, layer, width, offset, points, start_angle, end_angle in extrusions:
+        port_names = section.port_names
+        port_types = section.port_types
+        hidden = section.hidden
+
+        if points is p.points:
+            points1 = next(curves)
+            points2 = next(curves)
+        else:
+            points1, points2 = p._centerpoint_offset_curves(
+                points,
+                [offset + width / 2, offset - width / 2],
+                start_angle,
+                end_angle,
+            )
+
         if shear_angle_start or shear_angle_end:
             _face_angle_start = (
                 start_angle + shear_angle_start - 90 if shear_angle_start else None
@@ -857,7 +908,7 @@ def extrude(
         points_poly = np.concatenate([points1, points2[::-1, :]])
 
         layers = layer if hidden else [layer, layer]
-        if not hidden and p.length() > 1e-3:
+        if not hidden and length > 1e-3:
             c.add_polygon(points_poly, layer=layer)
 
         pdk = get_active_pdk()
@@ -920,7 +971,7 @@ def extrude(
             )
             port2.info["face"] = face
 
-    c.info["length"] = float(np.round(p.length(), 3))
+    c.info["length"] = float(np.round(length, 3))
 
     if x.decorator:
         c = x.decorator(c) or c
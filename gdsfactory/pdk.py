@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import logging
 import pathlib
+import time
 import warnings
 from functools import partial
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Hashable, Optional, Tuple
 
 import numpy as np
 from omegaconf import DictConfig
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 from gdsfactory.components import cells
 from gdsfactory.config import PATH, sparameters_path
@@ -49,6 +50,84 @@ constants = dict(
     fiber_input_to_output_spacing=200.0,
     metal_spacing=10.0,
 )
+max_cross_sections = 4096
+
+
+class SpecStats:
+    """Counters for the specs resolved by a Pdk.
+
+    hits counts the CrossSections returned from the cache. resolve_time is
+    the time spent resolving specs, not counting factories, and build_time
+    the time spent in cross_section factories.
+    """
+
+    __slots__ = ("calls", "hits", "resolve_time", "build_time")
+
+    def __init__(self) -> None:
+        """Initialize the SpecStats object."""
+        self.calls = 0
+        self.hits = 0
+        self.resolve_time = 0.0
+        self.build_time = 0.0
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"SpecStats(calls={self.calls}, hits={self.hits}, "
+            f"resolve_time={self.resolve_time:.3g}, build_time={self.build_time:.3g})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            calls=self.calls,
+            hits=self.hits,
+            resolve_time=self.resolve_time,
+            build_time=self.build_time,
+        )
+
+
+def _freeze(value: Any) -> Hashable:
+    """Returns a hashable version of a setting value.
+
+    Raises TypeError if the value cannot be hashed.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (dict, DictConfig)):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, partial):
+        return _get_factory_key(value, {})
+    hash(value)
+    return value
+
+
+def _copy_model(value: Any) -> Any:
+    """Returns a copy of a pydantic model, with copies of its lists, dicts and models.
+
+    Faster than BaseModel.copy(deep=True), which also copies immutable values.
+    """
+    if isinstance(value, BaseModel):
+        values = {k: _copy_model(v) for k, v in value.__dict__.items()}
+        return value._copy_and_set_values(values, set(value.__fields_set__), deep=False)
+    if isinstance(value, list):
+        return [_copy_model(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_model(v) for k, v in value.items()}
+    return value
+
+
+def _get_factory_key(factory: Callable, kwargs: Dict[str, Any]) -> Hashable:
+    """Returns a cache key for the output of factory(**kwargs).
+
+    Partials are unpacked, so equal partials created in different places
+    share their key. Raises TypeError if a setting cannot be hashed.
+    """
+    args: Tuple = ()
+    while isinstance(factory, partial):
+        args = factory.args + args
+        kwargs = {**factory.keywords, **kwargs}
+        factory = factory.func
+    return (factory, _freeze(args), _freeze(kwargs))
 
 
 class Pdk(BaseModel):
@@ -100,6 +179,13 @@ class Pdk(BaseModel):
     constants: Dict[str, Any] = constants
     materials_index: Dict[str, MaterialSpec] = materials_index_default
 
+    _cross_section_cache: Dict[Hashable, CrossSection] = PrivateAttr(
+        default_factory=dict
+    )
+    _stats: Dict[str, SpecStats] = PrivateAttr(
+        default_factory=lambda: dict(component=SpecStats(), cross_section=SpecStats())
+    )
+
     class Config:
         """Configuration."""
 
@@ -127,6 +213,7 @@ class Pdk(BaseModel):
         from gdsfactory.cell import clear_cache
 
         clear_cache()
+        self.clear_cross_section_cache()
 
         if self.base_pdk:
             cross_sections = self.base_pdk.cross_sections
@@ -192,6 +279,19 @@ class Pdk(BaseModel):
             on_cross_section_registered.fire(
                 name=name, cross_section=cross_section, pdk=self
             )
+        self.clear_cross_section_cache()
+
+    def clear_cross_section_cache(self) -> None:
+        """Clears the CrossSections cached by get_cross_section."""
+        self._cross_section_cache = {}
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the spec resolution counters for components and cross_sections."""
+        return {kind: stats.to_dict() for kind, stats in self._stats.items()}
+
+    def clear_stats(self) -> None:
+        """Resets the spec resolution counters."""
+        self._stats = dict(component=SpecStats(), cross_section=SpecStats())
 
     def register_cells_yaml(
         self,
@@ -241,20 +341,10 @@ class Pdk(BaseModel):
 
     def get_cell(self, cell: CellSpec, **kwargs) -> ComponentFactory:
         """Returns ComponentFactory from a cell spec."""
-        cells_and_containers = set(self.cells.keys()).union(set(self.containers.keys()))
-
         if callable(cell):
             return cell
         elif isinstance(cell, str):
-            if cell not in cells_and_containers:
-                cells = list(self.cells.keys())
-                containers = list(self.containers.keys())
-                raise ValueError(
-                    f"{cell!r} from PDK {self.name!r} not in cells: {cells} "
-                    f"or containers: {containers}"
-                )
-            cell = self.cells[cell] if cell in self.cells else self.containers[cell]
-            return cell
+            return self._get_factory(cell, cells=self.cells, containers=self.containers)
         elif isinstance(cell, (dict, DictConfig)):
             for key in cell.keys():
                 if key not in component_settings:
@@ -264,18 +354,8 @@ class Pdk(BaseModel):
             settings = dict(cell.get("settings", {}))
             settings.update(**kwargs)
 
-            cell_name = cell.get("function")
-            if not isinstance(cell_name, str) or cell_name not in cells_and_containers:
-                cells = list(self.cells.keys())
-                containers = list(self.containers.keys())
-                raise ValueError(
-                    f"{cell_name!r} from PDK {self.name!r} not in cells: {cells} "
-                    f"or containers: {containers}"
-                )
-            cell = (
-                self.cells[cell_name]
-                if cell_name in self.cells
-                else self.containers[cell_name]
+            cell = self._get_factory(
+                cell.get("function"), cells=self.cells, containers=self.containers
             )
             return partial(cell, **settings)
         else:
@@ -301,6 +381,26 @@ class Pdk(BaseModel):
             component = self.get_component(component, **kwargs)
             return self.default_symbol_factory(component)
 
+    def _get_factory(
+        self,
+        name: Any,
+        cells: Dict[str, Callable],
+        containers: Dict[str, Callable],
+    ) -> Callable:
+        """Returns the cell or container factory registered under a name.
+
+        Looks the name up in the dicts directly, so cells registered or
+        modified in place are always found.
+        """
+        if isinstance(name, str):
+            cell = cells.get(name) or containers.get(name)
+            if cell is not None:
+                return cell
+        raise ValueError(
+            f"{name!r} from PDK {self.name!r} not in cells: {list(cells.keys())} "
+            f"or containers: {list(containers.keys())}"
+        )
+
     def _get_component(
         self,
         component: ComponentSpec,
@@ -309,23 +409,21 @@ class Pdk(BaseModel):
         **kwargs,
     ) -> Component:
         """Returns component from a component spec."""
-        cells_and_containers = set(cells.keys()).union(set(containers.keys()))
+        t0 = time.perf_counter()
+        stats = self._stats["component"]
+        stats.calls += 1
 
         if isinstance(component, Component):
             if kwargs:
                 raise ValueError(f"Cannot apply kwargs {kwargs} to {component.name!r}")
+            stats.resolve_time += time.perf_counter() - t0
             return component
         elif callable(component):
+            stats.resolve_time += time.perf_counter() - t0
             return component(**kwargs)
         elif isinstance(component, str):
-            if component not in cells_and_containers:
-                cells = list(cells.keys())
-                containers = list(containers.keys())
-                raise ValueError(
-                    f"{component!r} not in PDK {self.name!r} cells: {cells} "
-                    f"or containers: {containers}"
-                )
-            cell = cells[component] if component in cells else containers[component]
+            cell = self._get_factory(component, cells=cells, containers=containers)
+            stats.resolve_time += time.perf_counter() - t0
             return cell(**kwargs)
         elif isinstance(component, (dict, DictConfig)):
             for key in component.keys():
@@ -338,16 +436,9 @@ class Pdk(BaseModel):
 
             cell_name = component.get("component", None)
             cell_name = cell_name or component.get("function")
-            if not isinstance(cell_name, str) or cell_name not in cells_and_containers:
-                cells = list(cells.keys())
-                containers = list(containers.keys())
-                raise ValueError(
-                    f"{cell_name!r} from PDK {self.name!r} not in cells: {cells} "
-                    f"or containers: {containers}"
-                )
-            cell = cells[cell_name] if cell_name in cells else containers[cell_name]
-            component = cell(**settings)
-            return component
+            cell = self._get_factory(cell_name, cells=cells, containers=containers)
+            stats.resolve_time += time.perf_counter() - t0
+            return cell(**settings)
         else:
             raise ValueError(
                 "get_component expects a ComponentSpec (Component, ComponentFactory, "
@@ -357,19 +448,28 @@ class Pdk(BaseModel):
     def get_cross_section(
         self, cross_section: CrossSectionSpec, **kwargs
     ) -> CrossSection:
-        """Returns cross_section from a cross_section spec."""
+        """Returns cross_section from a cross_section spec.
+
+        CrossSections built from a factory are cached by factory and settings.
+        Each call returns a copy, so modifying it does not change the cache.
+        """
+        t0 = time.perf_counter()
+        stats = self._stats["cross_section"]
+        stats.calls += 1
+
         if isinstance(cross_section, CrossSection):
             if kwargs:
                 raise ValueError(f"Cannot apply {kwargs} to a defined CrossSection")
+            stats.resolve_time += time.perf_counter() - t0
             return cross_section
         elif callable(cross_section):
-            return cross_section(**kwargs)
+            return self._build_cross_section(cross_section, kwargs, t0)
         elif isinstance(cross_section, str):
             if cross_section not in self.cross_sections:
                 cross_sections = list(self.cross_sections.keys())
                 raise ValueError(f"{cross_section!r} not in {cross_sections}")
             cross_section_factory = self.cross_sections[cross_section]
-            return cross_section_factory(**kwargs)
+            return self._build_cross_section(cross_section_factory, kwargs, t0)
         elif isinstance(cross_section, (dict, DictConfig)):
             for key in cross_section.keys():
                 if key not in cross_section_settings:
@@ -391,14 +491,48 @@ class Pdk(BaseModel):
             cross_section_factory = self.cross_sections[cross_section_factory_name]
             settings = dict(cross_section.get("settings", {}))
             settings.update(**kwargs)
-
-            return cross_section_factory(**settings)
+            return self._build_cross_section(cross_section_factory, settings, t0)
         else:
             raise ValueError(
                 "get_cross_section expects a CrossSectionSpec (CrossSection, "
                 f"CrossSectionFactory, string or dict), got {type(cross_section)}"
             )
 
+    def _build_cross_section(
+        self, factory: Callable, settings: Dict[str, Any], t0: float
+    ) -> CrossSection:
+        """Returns factory(**settings), cached if the settings are hashable.
+
+        Args:
+            factory: cross_section factory.
+            settings: cross_section settings.
+            t0: perf_counter when the spec resolution started.
+        """
+        stats = self._stats["cross_section"]
+        try:
+            key = _get_factory_key(factory, settings)
+        except TypeError:
+            key = None
+        else:
+            xs = self._cross_section_cache.get(key)
+            if xs is not None:
+                xs = _copy_model(xs)
+                stats.hits += 1
+                stats.resolve_time += time.perf_counter() - t0
+                return xs
+
+        t1 = time.perf_counter()
+        stats.resolve_time += t1 - t0
+        xs = factory(**settings)
+        stats.build_time += time.perf_counter() - t1
+
+        if key is not None and isinstance(xs, CrossSection):
+            cache = self._cross_section_cache
+            if len(cache) >= max_cross_sections:
+                del cache[next(iter(cache))]
+            cache[key] = _copy_model(xs)
+        return xs
+
     def get_layer(self, layer: LayerSpec) -> Layer:
         """Returns layer from a layer spec."""
         if isinstance(layer, (tuple, list)):
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import functools
+import tempfile
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, List, Optional, Union
 
 import gdstk
 from omegaconf import OmegaConf
@@ -13,6 +15,224 @@ from gdsfactory.config import logger
 from gdsfactory.name import get_name_short
 
 
+class GdsIndex:
+    """Cell table of a GDS file, read without parsing any geometry.
+
+    Keeps the raw bytes of each cell (gdstk.RawCell) and the reference graph,
+    so any cell can be parsed together with its dependencies only.
+
+    Args:
+        gdspath: path of GDS file.
+    """
+
+    def __init__(self, gdspath: Union[str, Path]) -> None:
+        """Initialize the GdsIndex object."""
+        self.gdspath = Path(gdspath)
+        self.unit, self.precision = gdstk.gds_units(str(gdspath))
+        self.rawcells: Dict[str, gdstk.RawCell] = gdstk.read_rawcells(str(gdspath))
+        self.children: Dict[str, List[str]] = {
+            name: sorted({c.name for c in rawcell.dependencies(False)})
+            for name, rawcell in self.rawcells.items()
+        }
+        referenced = {name for names in self.children.values() for name in names}
+        self.top_cellnames = [name for name in self.rawcells if name not in referenced]
+
+    @property
+    def cellnames(self) -> List[str]:
+        return list(self.rawcells)
+
+    def get_size(self, cellname: str, recursive: bool = True) -> int:
+        """Returns the number of bytes of a cell (and its dependencies)."""
+        rawcell = self.rawcells[cellname]
+        size = rawcell.size
+        if recursive:
+            size += sum(c.size for c in rawcell.dependencies(True))
+        return size
+
+    def read_cells(self, cellname: str) -> Dict[str, gdstk.Cell]:
+        """Returns a cell and all its dependencies parsed into gdstk Cells.
+
+        Only the bytes of those cells are parsed, not the rest of the file.
+        """
+        rawcell = self.rawcells[cellname]
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = str(Path(dirpath) / "cells.gds")
+            writer = gdstk.GdsWriter(filepath, unit=self.unit, precision=self.precision)
+            writer.write(rawcell, *rawcell.dependencies(True))
+            writer.close()
+            library = gdstk.read_gds(filepath)
+        return {c.name: c for c in library.cells}
+
+
+@functools.lru_cache(maxsize=16)
+def _get_gds_index(gdspath: str, mtime: int, size: int) -> GdsIndex:
+    return GdsIndex(gdspath)
+
+
+def get_gds_index(gdspath: Union[str, Path]) -> GdsIndex:
+    """Returns the GdsIndex of a GDS file, cached until the file changes."""
+    stat = Path(gdspath).stat()
+    return _get_gds_index(str(gdspath), stat.st_mtime_ns, stat.st_size)
+
+
+class LazyComponent(Component):
+    """Component from a GDS file that loads its geometry on first use.
+
+    Name, ports and info are available right away. Polygons, references and
+    anything that needs them (bbox, area, write_gds ...) load the cell and its
+    dependencies from the GdsIndex the first time they are accessed.
+
+    Args:
+        index: GdsIndex of the GDS file.
+        cellname: name of the cell in the GDS file.
+        components: LazyComponents of the same file by cellname, shared by all
+            the cells of one import so each cell loads into one Component.
+        hashed_name: appends a hash to a shortened component name.
+    """
+
+    def __init__(
+        self,
+        index: GdsIndex,
+        cellname: str,
+        components: Dict[str, LazyComponent],
+        hashed_name: bool = True,
+    ) -> None:
+        """Initialize the LazyComponent object."""
+        self._loaded = False
+        self._index = index
+        self._cellname = cellname
+        self._components = components
+        self._hashed_name = hashed_name
+        super().__init__(name=get_name_short(cellname) if hashed_name else cellname)
+        components[cellname] = self
+
+    @property
+    def loaded(self) -> bool:
+        """True if the geometry of the cell has been loaded."""
+        return self._loaded
+
+    @property
+    def _cell(self) -> gdstk.Cell:
+        if not self._loaded:
+            self._load()
+        return self._gdstk_cell
+
+    @_cell.setter
+    def _cell(self, cell: gdstk.Cell) -> None:
+        self._gdstk_cell = cell
+
+    @property
+    def name(self) -> str:
+        return self._gdstk_cell.name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._gdstk_cell.name = value
+
+    @property
+    def references(self):
+        if not self._loaded:
+            self._load()
+        return self._references
+
+    @property
+    def named_references(self):
+        if not self._loaded:
+            self._load()
+        return self._named_references
+
+    def _load(self) -> None:
+        """Loads this cell and the dependencies that are not loaded yet."""
+        cells = self._index.read_cells(self._cellname)
+        cellnames = {id(c): cellname for cellname, c in cells.items()}
+
+        loaded = []
+        for cellname, c in cells.items():
+            component = self._components.get(cellname) or LazyComponent(
+                self._index, cellname, self._components, self._hashed_name
+            )
+            if not component._loaded:
+                c.name = component.name
+                component._gdstk_cell = c
+                component._loaded = True
+                loaded.append(component)
+
+        for component in loaded:
+            for e in component._gdstk_cell.references:
+                ref_device = self._components[cellnames[id(e.cell)]]
+                # dependencies loaded before keep their own gdstk Cell
+                e.cell = ref_device._gdstk_cell
+                _add_reference(component, ref_device, e)
+
+
+def _add_reference(
+    component: Component, ref_device: Component, e: gdstk.Reference
+) -> None:
+    """Adds a ComponentReference wrapping a gdstk Reference to a Component."""
+    ref = ComponentReference(
+        component=ref_device,
+        origin=e.origin,
+        rotation=e.rotation,
+        magnification=e.magnification,
+        x_reflection=e.x_reflection,
+        columns=e.repetition.columns or 1,
+        rows=e.repetition.rows or 1,
+        spacing=e.repetition.spacing,
+        v1=e.repetition.v1,
+        v2=e.repetition.v2,
+    )
+    component._register_reference(ref)
+    component._references.append(ref)
+    ref_device._parents.add(component)
+    ref._reference = e
+
+
+def _get_cellname(
+    cellname: Optional[str],
+    cellnames: List[str],
+    top_cellnames: List[str],
+    gdspath: Path,
+) -> str:
+    """Returns the cell to import, checking it exists in the file."""
+    if not top_cellnames:
+        raise ValueError(f"no top cells found in {str(gdspath)!r}")
+
+    if cellname is not None:
+        if cellname not in cellnames:
+            raise ValueError(
+                f"cell {cellname!r} is not in file {gdspath} with cells {cellnames}"
+            )
+    elif len(top_cellnames) == 1:
+        cellname = top_cellnames[0]
+    elif len(top_cellnames) > 1:
+        raise ValueError(
+            f"import_gds() There are multiple top-level cells in {gdspath!r}, "
+            f"you must specify `cellname` to select of one of them among {cellnames}"
+        )
+    return cellname
+
+
+def _read_metadata(component: Component, metadata_filepath: Path) -> None:
+    """Adds settings and ports from a YAML metadata file to a Component."""
+    logger.info(f"Read YAML metadata from {metadata_filepath}")
+    metadata = OmegaConf.load(metadata_filepath)
+
+    if "settings" in metadata:
+        component.settings = Settings(**OmegaConf.to_container(metadata.settings))
+
+    if "ports" in metadata:
+        for port_name, port in metadata.ports.items():
+            if port_name not in component.ports:
+                component.add_port(
+                    name=port_name,
+                    center=port.center,
+                    width=port.width,
+                    orientation=port.orientation,
+                    layer=tuple(port.layer),
+                    port_type=port.port_type,
+                )
+
+
 @cell
 def import_gds(
     gdspath: Union[str, Path],
@@ -20,6 +240,7 @@ def import_gds(
     gdsdir: Optional[Union[str, Path]] = None,
     read_metadata: bool = False,
     hashed_name: bool = True,
+    lazy: bool = False,
     **kwargs,
 ) -> Component:
     """Returns a Component from a GDS file.
@@ -32,6 +253,9 @@ def import_gds(
         gdsdir: optional GDS directory.
         read_metadata: loads metadata (ports, settings) if it exists in YAML format.
         hashed_name: appends a hash to a shortened component name.
+        lazy: only indexes the cell table of the file (see GdsIndex) and
+            returns a LazyComponent that loads the geometry of the cell and its
+            dependencies the first time it is used. GDS files only.
         kwargs: extra to add to component.info (polarization, wavelength ...).
     """
     gdspath = Path(gdsdir) / Path(gdspath) if gdsdir else Path(gdspath)
@@ -40,6 +264,20 @@ def import_gds(
 
     metadata_filepath = gdspath.with_suffix(".yml")
 
+    if lazy:
+        if gdspath.suffix.lower() != ".gds":
+            raise ValueError(f"lazy import needs a .gds file, got {gdspath.suffix!r}")
+        index = get_gds_index(gdspath)
+        cellname = _get_cellname(
+            cellname, index.cellnames, index.top_cellnames, gdspath
+        )
+        component = LazyComponent(index, cellname, {}, hashed_name=hashed_name)
+        if read_metadata and metadata_filepath.exists():
+            _read_metadata(component, metadata_filepath)
+        component.info.update(**kwargs)
+        component.imported_gds = True
+        return component
+
     if gdspath.suffix.lower() == ".gds":
         gdsii_lib = gdstk.read_gds(str(gdspath))
     elif gdspath.suffix.lower() == ".oas":
@@ -50,9 +288,6 @@ def import_gds(
     top_level_cells = gdsii_lib.top_level()
     top_cellnames = [c.name for c in top_level_cells]
 
-    if not top_cellnames:
-        raise ValueError(f"no top cells found in {str(gdspath)!r}")
-
     D_list = []
     cell_name_to_component = {}
     cell_to_component = {}
@@ -71,59 +306,17 @@ def import_gds(
         D_list += [D]
 
     cellnames = list(cell_name_to_component.keys())
-    if cellname is not None:
-        if cellname not in cell_name_to_component:
-            raise ValueError(
-                f"cell {cellname!r} is not in file {gdspath} with cells {cellnames}"
-            )
-    elif len(top_level_cells) == 1:
-        cellname = top_level_cells[0].name
-    elif len(top_level_cells) > 1:
-        raise ValueError(
-            f"import_gds() There are multiple top-level cells in {gdspath!r}, "
-            f"you must specify `cellname` to select of one of them among {cellnames}"
-        )
+    cellname = _get_cellname(cellname, cellnames, top_cellnames, gdspath)
 
     # create a new ComponentReference for each gdstk CellReference
     for c, D in cell_to_component.items():
         for e in c.references:
-            ref_device = cell_to_component[e.cell]
-            ref = ComponentReference(
-                component=ref_device,
-                origin=e.origin,
-                rotation=e.rotation,
-                magnification=e.magnification,
-                x_reflection=e.x_reflection,
-                columns=e.repetition.columns or 1,
-                rows=e.repetition.rows or 1,
-                spacing=e.repetition.spacing,
-                v1=e.repetition.v1,
-                v2=e.repetition.v2,
-            )
-            D._register_reference(ref)
-            D._references.append(ref)
-            ref._reference = e
+            _add_reference(D, cell_to_component[e.cell], e)
 
     component = cell_name_to_component[cellname]
 
     if read_metadata and metadata_filepath.exists():
-        logger.info(f"Read YAML metadata from {metadata_filepath}")
-        metadata = OmegaConf.load(metadata_filepath)
-
-        if "settings" in metadata:
-            component.settings = Settings(**OmegaConf.to_container(metadata.settings))
-
-        if "ports" in metadata:
-            for port_name, port in metadata.ports.items():
-                if port_name not in component.ports:
-                    component.add_port(
-                        name=port_name,
-                        center=port.center,
-                        width=port.width,
-                        orientation=port.orientation,
-                        layer=tuple(port.layer),
-                        port_type=port.port_type,
-                    )
+        _read_metadata(component, metadata_filepath)
 
     component.info.update(**kwargs)
     component.imported_gds = True
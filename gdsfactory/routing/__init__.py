@@ -37,15 +37,17 @@ from gdsfactory.routing.get_route import (
     get_route_from_waypoints_electrical_m2,
     get_route_from_waypoints_electrical_multilayer,
 )
-from gdsfactory.routing.get_route_astar import get_route_astar
+from gdsfactory.routing.get_route_astar import get_route_astar, get_routing_grid
 from gdsfactory.routing.get_route_from_steps import (
     get_route_from_steps,
     get_route_from_steps_electrical,
     get_route_from_steps_electrical_multilayer,
 )
 from gdsfactory.routing.get_route_sbend import get_route_sbend
+from gdsfactory.routing.get_routes_astar import get_routes_astar
 from gdsfactory.routing.get_routes_bend180 import get_routes_bend180
 from gdsfactory.routing.get_routes_straight import get_routes_straight
+from gdsfactory.routing.manhattan import RoutingContext
 from gdsfactory.routing.route_ports_to_side import route_ports_to_side
 from gdsfactory.routing.route_quad import route_quad
 from gdsfactory.routing.route_sharp import route_sharp
@@ -69,6 +71,8 @@ __all__ = [
     "get_bundle_from_waypoints_electrical_multilayer",
     "get_route",
     "get_route_astar",
+    "get_routing_grid",
+    "get_routes_astar",
     "get_route_electrical",
     "get_route_electrical_m2",
     "get_route_electrical_multilayer",
@@ -89,6 +93,7 @@ __all__ = [
     "route_south",
     "route_quad",
     "route_sharp",
+    "RoutingContext",
     "fanout_component",
     "fanout_ports",
     "sort_ports",
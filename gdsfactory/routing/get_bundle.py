@@ -11,6 +11,7 @@ get_bundle calls different function depending on the port orientation.
 """
 from __future__ import annotations
 
+import warnings
 from functools import partial
 from typing import Callable, List, Optional, Union
 
@@ -21,6 +22,7 @@ import gdsfactory as gf
 from gdsfactory.component import Component
 from gdsfactory.components.bend_euler import bend_euler
 from gdsfactory.components.straight import straight as straight_function
+from gdsfactory.components.taper import taper as taper_function
 from gdsfactory.components.via_corner import via_corner
 from gdsfactory.components.wire import wire_corner
 from gdsfactory.cross_section import strip
@@ -30,8 +32,18 @@ from gdsfactory.routing.get_bundle_from_steps import get_bundle_from_steps
 from gdsfactory.routing.get_bundle_from_waypoints import get_bundle_from_waypoints
 from gdsfactory.routing.get_bundle_sbend import get_bundle_sbend
 from gdsfactory.routing.get_bundle_u import get_bundle_udirect, get_bundle_uindirect
-from gdsfactory.routing.get_route import get_route, get_route_from_waypoints
-from gdsfactory.routing.manhattan import generate_manhattan_waypoints
+from gdsfactory.routing.get_route import (
+    _get_taper,
+    get_route,
+    get_route_from_waypoints,
+)
+from gdsfactory.routing.manhattan import (
+    TOLERANCE,
+    RouteWarning,
+    RoutingContext,
+    generate_manhattan_waypoints,
+    generate_manhattan_waypoints_batch,
+)
 from gdsfactory.routing.path_length_matching import path_length_matched_points
 from gdsfactory.routing.sort_ports import get_port_x, get_port_y
 from gdsfactory.routing.sort_ports import sort_ports as sort_ports_function
@@ -53,6 +65,7 @@ def get_bundle(
     with_sbend: bool = False,
     sort_ports: bool = True,
     cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = "strip",
+    context: Optional[RoutingContext] = None,
     **kwargs,
 ) -> List[Route]:
     """Returns list of routes to connect two groups of ports.
@@ -69,6 +82,8 @@ def get_bundle(
         with_sbend: use s_bend routing when there is no space for manhattan routing.
         sort_ports: sort port coordinates.
         cross_section: CrossSection or function that returns a cross_section.
+        context: resolved bend, taper and cross_section shared by the routes
+            of a same axis bundle, with routing counters. Defaults to a new one.
 
     Keyword Args:
         width: main layer waveguide width (um).
@@ -213,7 +228,7 @@ def get_bundle(
         # print("get_bundle_same_axis")
         if with_sbend:
             return get_bundle_sbend(ports1, ports2, sort_ports=sort_ports, **kwargs)
-        return get_bundle_same_axis(**params)
+        return get_bundle_same_axis(context=context, **params)
 
     elif start_angle == end_angle:
         # print('get_bundle_udirect')
@@ -256,6 +271,7 @@ def get_bundle_same_axis(
     path_length_match_extra_length: float = 0.0,
     path_length_match_modify_segment_i: int = -2,
     cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+    context: Optional[RoutingContext] = None,
     **kwargs,
 ) -> List[Route]:
     r"""Semi auto-routing for two lists of ports.
@@ -275,6 +291,8 @@ def get_bundle_same_axis(
         path_length_match_modify_segment_i: Index of straight segment to add path
             length matching loops to (requires path_length_match_loops != None).
         cross_section: CrossSection or function that returns a cross_section.
+        context: resolved bend, taper and cross_section shared by all the routes,
+            with routing counters. Defaults to a new one.
         kwargs: cross_section settings.
 
 
@@ -323,6 +341,14 @@ def get_bundle_same_axis(
     if sort_ports:
         ports1, ports2 = sort_ports_function(ports1, ports2)
 
+    if context is None:
+        context = RoutingContext(
+            bend=bend,
+            taper=_get_taper(taper_function, cross_section, **kwargs),
+            cross_section=cross_section,
+            **kwargs,
+        )
+
     routes = _get_bundle_waypoints(
         ports1,
         ports2,
@@ -331,8 +357,16 @@ def get_bundle_same_axis(
         cross_section=cross_section,
         end_straight_length=end_straight_length,
         start_straight_length=start_straight_length,
+        context=context,
         **kwargs,
     )
+    errors = get_bundle_spacing_errors(routes, gf.get_constant(separation))
+    if len(errors):
+        warnings.warn(
+            f"{len(errors)} routes are closer than separation={separation} "
+            f"to the next route: {errors[:10].tolist()}",
+            RouteWarning,
+        )
     if path_length_match_loops:
         routes = [np.array(route) for route in routes]
         routes = path_length_matched_points(
@@ -349,6 +383,7 @@ def get_bundle_same_axis(
             route,
             bend=bend,
             cross_section=cross_section,
+            context=context,
             **kwargs,
         )
         for route in routes
@@ -402,81 +437,99 @@ def _get_bundle_waypoints(
             )
         ]
 
-    # Contains end_straight of tracks which need to be adjusted together
-    end_straights_in_group = []
-
-    # Once a group is finished, all the lengths are appended to end_straights
-    end_straights = []
-
-    # Keep track of how many ports should be routed together
-
     if axis in {"X", "x"}:
-        x1_prev = get_port_y(ports1[0])
-        x2_prev = get_port_y(ports2[0])
-        y0 = get_port_x(ports2[0])
+        x1 = np.array([get_port_y(p) for p in ports1])
+        x2 = np.array([get_port_y(p) for p in ports2])
+        y = np.array([get_port_x(p) for p in ports2])
         y1 = get_port_x(ports1[0])
     else:  # X axis
-        x1_prev = get_port_x(ports1[0])
-        x2_prev = get_port_x(ports2[0])
-        y0 = get_port_y(ports2[0])
+        x1 = np.array([get_port_x(p) for p in ports1])
+        x2 = np.array([get_port_x(p) for p in ports2])
+        y = np.array([get_port_y(p) for p in ports2])
         y1 = get_port_y(ports1[0])
 
+    y0 = y[0]
     s = sign(y0 - y1)
-    curr_end_straight = 0
 
     end_straight_length = end_straight_length or 15.0
 
     Le = end_straight_length
 
-    # First pass - loop on all the ports to find the tentative end_straights
-    for i in range(len(ports1)):
-        if axis in {"X", "x"}:
-            x1 = get_port_y(ports1[i])
-            x2 = get_port_y(ports2[i])
-            y = get_port_x(ports2[i])
-        else:
-            x1 = get_port_x(ports1[i])
-            x2 = get_port_x(ports2[i])
-            y = get_port_y(ports2[i])
-
-        if are_decoupled(x2, x2_prev, x1, x1_prev, sep=separation):
-            # If this metal track does not impact the previous one, then start a new
-            # group.
-            L = min(end_straights_in_group)
-            end_straights += [max(x - L, 0) + Le for x in end_straights_in_group]
-
-            # Start new group
-            end_straights_in_group = []
-            curr_end_straight = 0
-
-        elif x2 >= x1:
-            curr_end_straight += separation
-        else:
-            curr_end_straight -= separation
+    # First pass - find the tentative end_straights of each group of tracks
+    # A track that does not impact the previous one starts a new group
+    sep = gf.get_constant(separation)
+    x1_prev = np.concatenate([x1[:1], x1[:-1]])
+    x2_prev = np.concatenate([x2[:1], x2[:-1]])
+    decoupled = (x1_prev + sep <= x2) & (x1 >= x2_prev + sep) & (x1 >= x2_prev - sep)
+    decoupled[0] = False
+    steps = np.where(decoupled, 0.0, np.where(x2 >= x1, separation, -separation))
+
+    starts = np.concatenate([[0], np.flatnonzero(decoupled)])
+    ends = np.append(starts[1:], len(steps))
+    end_straights_in_group = (
+        np.concatenate([np.cumsum(steps[i:j]) for i, j in zip(starts, ends)])
+        + (y - y0) * s
+    )
+    L = np.repeat(np.minimum.reduceat(end_straights_in_group, starts), ends - starts)
+    end_straights = np.maximum(end_straights_in_group - L, 0) + Le
 
-        end_straights_in_group.append(curr_end_straight + (y - y0) * s)
+    # Second pass - route all the ports pairwise
+    return generate_manhattan_waypoints_batch(
+        ports1,
+        ports2,
+        start_straight_length=start_straight_length,
+        end_straight_length=end_straights,
+        cross_section=cross_section,
+        **kwargs,
+    )
 
-        x1_prev = x1
-        x2_prev = x2
 
-    # Append the last group
-    L = min(end_straights_in_group)
+def get_bundle_spacing_errors(routes: List[ndarray], separation: float) -> ndarray:
+    """Returns the indices i of the routes closer than separation to route i + 1.
 
-    end_straights += [max(x - L, 0) + Le for x in end_straights_in_group]
+    Compares the inner segments of neighbouring routes with the same number of
+    points. The first and last segments follow the ports and are not checked.
+    Two parallel segments collide when they overlap along their direction and
+    are less than separation apart.
 
-    # Second pass - route the ports pairwise
-    N = len(ports1)
-    return [
-        generate_manhattan_waypoints(
-            ports1[i],
-            ports2[i],
-            start_straight_length=start_straight_length,
-            end_straight_length=end_straights[i],
-            cross_section=cross_section,
-            **kwargs,
-        )
-        for i in range(N)
-    ]
+    Args:
+        routes: list of route waypoints.
+        separation: minimum center to center distance between routes.
+    """
+    n_points = np.array([len(route) for route in routes])
+    errors = []
+    for n in np.unique(n_points[:-1][n_points[:-1] == n_points[1:]]):
+        if n < 4:
+            continue
+        index = np.flatnonzero((n_points[:-1] == n) & (n_points[1:] == n))
+        pts1 = np.array([routes[i] for i in index])
+        pts2 = np.array([routes[i + 1] for i in index])
+
+        # inner segments, (pairs, n - 3, 2)
+        a1, b1 = pts1[:, 1:-2], pts1[:, 2:-1]
+        a2, b2 = pts2[:, 1:-2], pts2[:, 2:-1]
+        horizontal1 = np.abs(a1[..., 1] - b1[..., 1]) < TOLERANCE
+        horizontal2 = np.abs(a2[..., 1] - b2[..., 1]) < TOLERANCE
+        vertical1 = np.abs(a1[..., 0] - b1[..., 0]) < TOLERANCE
+        vertical2 = np.abs(a2[..., 0] - b2[..., 0]) < TOLERANCE
+
+        # axis along the segment and across it
+        along = np.where(horizontal1, 0, 1)
+        across = 1 - along
+        parallel = (horizontal1 & horizontal2) | (vertical1 & vertical2)
+
+        def _take(points: ndarray, axis: ndarray) -> ndarray:
+            return np.take_along_axis(points, axis[..., None], axis=-1)[..., 0]
+
+        lo1 = np.minimum(_take(a1, along), _take(b1, along))
+        hi1 = np.maximum(_take(a1, along), _take(b1, along))
+        lo2 = np.minimum(_take(a2, along), _take(b2, along))
+        hi2 = np.maximum(_take(a2, along), _take(b2, along))
+        overlap = np.minimum(hi1, hi2) - np.maximum(lo1, lo2) > TOLERANCE
+        distance = np.abs(_take(a1, across) - _take(a2, across))
+        collision = parallel & overlap & (distance < separation - TOLERANCE)
+        errors.append(index[collision.any(axis=1)])
+    return np.sort(np.concatenate(errors)) if errors else np.array([], dtype=int)
 
 
 def compute_ports_max_displacement(ports1: List[Port], ports2: List[Port]) -> float:
@@ -314,75 +314,43 @@ def _generate_manhattan_bundle_waypoints(
         # separation defaults to ports1 separation
         offsets_mid = offsets_start
 
-    def _displace_segment_copy(s, a, sh=1, sv=1):
+    if not ports1:
+        return []
+
+    def _displace_segment(s, a, sh=1, sv=-1):
+        """Returns the axis and the coordinate of segment s displaced by a."""
         sign_seg = _segment_sign(s)
         if _is_horizontal(s):
-            dp = (0, sh * sign_seg * a)
+            return "h", s[0][1] + sh * sign_seg * a
         elif _is_vertical(s):
-            dp = (sv * sign_seg * a, 0)
-        else:
-            raise RouteError(f"Segment should be manhattan, got {s}")
-
-        return [np.array(p) + dp for p in s]
-
-    def _displace_segment_copy_group1(s, a):
-        return _displace_segment_copy(s, a, sh=1, sv=-1)
-
-    def _intersection(s1, s2):
-        if _is_horizontal(s1) and _is_vertical(s2):
-            sh, sv = s1, s2
-        elif _is_horizontal(s2) and _is_vertical(s1):
-            sh, sv = s2, s1
-        else:
+            return "v", s[0][0] + sv * sign_seg * a
+        raise RouteError(f"Segment should be manhattan, got {s}")
+
+    def _intersection(s1, a1, s2, a2):
+        d1, c1 = _displace_segment(s1, a1)
+        d2, c2 = _displace_segment(s2, a2)
+        if d1 == "h" and d2 == "v":
+            return c2, c1
+        elif d1 == "v" and d2 == "h":
+            return c1, c2
+        raise ValueError(f"s1 / s2 should be h/v or v/h. Got {d1} {d2} {s1} {s2}")
+
+    # all the routes follow the same segments, displaced by their offsets
+    offsets_start = np.asarray(offsets_start, dtype=float)
+    offsets_mid = np.asarray(offsets_mid, dtype=float)
+    end_points = np.array([p.center for p in ports2], dtype=float)
+    routes = np.empty((len(ports1), len(way_segments) + 1, 2))
+    routes[:, 0] = [p.center for p in ports1]
+    for j in range(1, len(way_segments)):
+        prev_seg_sep = offsets_start if j == 1 else offsets_mid
+        routes[:, j, 0], routes[:, j, 1] = _intersection(
+            way_segments[j], offsets_mid, way_segments[j - 1], prev_seg_sep
+        )
 
-            if _is_horizontal(s1):
-                s1_dir = "h"
-            elif _is_vertical(s1):
-                s1_dir = "v"
-            else:
-                s1_dir = "u"
-
-            if _is_horizontal(s2):
-                s2_dir = "h"
-            elif _is_vertical(s2):
-                s2_dir = "v"
-            else:
-                s2_dir = "u"
-
-            raise ValueError(
-                f"s1 / s2 should be h/v or v/h. Got {s1_dir} {s2_dir} {s1} {s2}"
-            )
-        return sv[0][0], sh[0][1]
-
-    routes = []
-    _make_segment = _displace_segment_copy_group1
-    for i, start_port in enumerate(ports1):
-        route = []
-        prev_seg_sep = None
-
-        for j, seg in enumerate(way_segments):
-            if j == 0:
-                start_point = start_port.center
-                seg_sep = offsets_start[i]
-            else:
-                seg_sep = offsets_mid[i]
-                d_seg = _make_segment(seg, seg_sep)
-                prev_seg = way_segments[j - 1]
-                tmp_seg = _make_segment(prev_seg, prev_seg_sep)
-                start_point = _intersection(d_seg, tmp_seg)
-
-            route += [start_point]
-
-            # If last point before the ports, adjust the separation to the end ports
-            if j == len(way_segments) - 1:
-                end_point = ports2[i].center
-                route += [end_point]
-
-                if end_angle in [0, 180]:
-                    route = snap_route_to_end_point_y(route, end_point[1])
-                else:
-                    route = snap_route_to_end_point_x(route, end_point[0])
-            prev_seg_sep = seg_sep
-        routes += [route]
-
-    return routes
+    # adjust the separation of the last point before the ports to the end ports
+    routes[:, -1] = end_points
+    if end_angle in [0, 180]:
+        routes[:, -2, 1] = end_points[:, 1]
+    else:
+        routes[:, -2, 0] = end_points[:, 0]
+    return list(routes)
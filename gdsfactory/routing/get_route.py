@@ -48,7 +48,11 @@ from gdsfactory.components.via_corner import via_corner
 from gdsfactory.components.wire import wire_corner
 from gdsfactory.cross_section import metal2, metal3
 from gdsfactory.port import Port
-from gdsfactory.routing.manhattan import round_corners, route_manhattan
+from gdsfactory.routing.manhattan import (
+    RoutingContext,
+    round_corners,
+    route_manhattan,
+)
 from gdsfactory.types import (
     ComponentSpec,
     Coordinates,
@@ -173,12 +177,37 @@ get_route_electrical_multilayer = partial(
 )
 
 
+def _get_taper(
+    taper: Optional[Callable],
+    cross_section: CrossSectionSpec,
+    **kwargs,
+) -> Optional[Union[Callable, Component]]:
+    """Returns the taper to the wide cross_section, None if it does not auto_widen."""
+    if isinstance(cross_section, list):
+        return None
+    if not taper:
+        return taper
+    x = gf.get_cross_section(cross_section, **kwargs)
+    if not x.auto_widen:
+        return None
+    if not callable(taper):
+        return taper
+    return taper(
+        length=x.taper_length,
+        width1=x.width,
+        width2=x.width_wide,
+        cross_section=cross_section,
+        **kwargs,
+    )
+
+
 def get_route_from_waypoints(
     waypoints: Coordinates,
     bend: Callable = bend_euler,
     straight: Callable = straight_function,
     taper: Optional[Callable] = taper_function,
     cross_section: CrossSectionSpec = "strip",
+    context: Optional[RoutingContext] = None,
     **kwargs,
 ) -> Route:
     """Returns a route formed by the given waypoints with bends instead of \
@@ -194,6 +223,8 @@ def get_route_from_waypoints(
         straight: function that returns straight waveguides
         taper: function that returns tapers
         cross_section:
+        context: resolved bend, straight, taper and cross_section shared
+            with other routes. Overrides bend, straight, taper and cross_section.
         kwargs: cross_section settings
 
     .. plot::
@@ -235,31 +266,12 @@ def get_route_from_waypoints(
         c.plot()
 
     """
-    if isinstance(cross_section, list):
-        taper = None
-    elif taper:
-        x = gf.get_cross_section(cross_section, **kwargs)
-        auto_widen = x.auto_widen
-        width1 = x.width
-        width2 = x.width_wide if auto_widen else width1
-        taper_length = x.taper_length
-        if auto_widen:
-            taper = (
-                taper(
-                    length=taper_length,
-                    width1=width1,
-                    width2=width2,
-                    cross_section=cross_section,
-                    **kwargs,
-                )
-                if callable(taper)
-                else taper
-            )
-        else:
-            taper = None
     waypoints = np.array(waypoints)
     kwargs.pop("route_filter", "")
+    if context is not None:
+        return round_corners(points=waypoints, context=context, **kwargs)
 
+    taper = _get_taper(taper, cross_section, **kwargs)
     return round_corners(
         points=waypoints,
         bend=bend,
@@ -1,6 +1,23 @@
+"""A* router over an occupancy grid.
+
+The component is rasterized into a NumPy grid that counts the obstacles
+covering each cell, with one cell every `resolution` um. The search is an A*
+with a binary heap over (cell, direction, straight run) states: each turn
+costs `bend_penalty` um on top of the path length, and turns are only allowed
+after a straight section long enough to fit the bends.
+
+Grids are cached per component, `avoid_layers`, `resolution` and `distance`,
+so routing many port pairs in the same component only rasterizes it once.
+Pass a `RoutingGrid` to `get_route_astar` to route many pairs against one
+shared grid that is updated as each route is committed.
+"""
+
 from __future__ import annotations
 
-from typing import List
+import heapq
+import time
+import weakref
+from typing import Dict, List, Optional, Set, Tuple
 from warnings import warn
 
 import numpy as np
@@ -8,21 +25,402 @@ import numpy as np
 import gdsfactory as gf
 from gdsfactory import Port
 from gdsfactory.component import Component
+from gdsfactory.components.bend_euler import bend_euler
 from gdsfactory.components.wire import wire_corner
+from gdsfactory.cross_section import CrossSection
 from gdsfactory.routing import get_route_from_waypoints
-from gdsfactory.routing.manhattan import route_manhattan
-from gdsfactory.types import CrossSectionSpec, LayerSpec, Route
+from gdsfactory.routing.manhattan import _get_bend_size, route_manhattan
+from gdsfactory.types import ComponentSpec, CrossSectionSpec, LayerSpec, Route
+
+# cell steps for each direction: east, north, west, south
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+ORIENTATION_TO_DIRECTION = {0: 0, 90: 1, 180: 2, 270: 3}
+
+_grid_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+Cell = Tuple[int, int]
+
+
+class RoutingGrid:
+    """Obstacle grid for A* routing.
+
+    Cell (i, j) is centered at (xmin + i * resolution, ymin + j * resolution)
+    and is blocked if any point of the cell gets closer than `distance`
+    to an obstacle.
+
+    Args:
+        xmin: x of the center of the first column of cells.
+        ymin: y of the center of the first row of cells.
+        resolution: cell size in um.
+        counts: (nx, ny) number of obstacles blocking each cell.
+        distance: clearance in um around obstacles and committed routes.
+        obstacles: (N, 5) xmin, ymin, xmax, ymax, distance of each obstacle.
+    """
 
+    def __init__(
+        self,
+        xmin: float,
+        ymin: float,
+        resolution: float,
+        counts: np.ndarray,
+        distance: float = 1,
+        obstacles: Optional[np.ndarray] = None,
+    ) -> None:
+        self.xmin = xmin
+        self.ymin = ymin
+        self.resolution = resolution
+        self.counts = counts
+        self.distance = distance
+        self.obstacles = np.zeros((0, 5)) if obstacles is None else obstacles
+
+    @classmethod
+    def from_component(
+        cls,
+        component: Component,
+        resolution: float = 1,
+        avoid_layers: Optional[List[LayerSpec]] = None,
+        distance: float = 1,
+    ) -> RoutingGrid:
+        """Returns a grid with the obstacles of a component.
+
+        Args:
+            component: to rasterize.
+            resolution: cell size in um.
+            avoid_layers: list of layers to avoid.
+                None avoids the bounding boxes of all references.
+            distance: clearance in um around obstacles.
+        """
+        margin = distance + 2 * resolution
+        (xmin, ymin), (xmax, ymax) = component.bbox
+        xmin, ymin = xmin - margin, ymin - margin
+        nx = int(np.ceil((xmax + margin - xmin) / resolution)) + 1
+        ny = int(np.ceil((ymax + margin - ymin) / resolution)) + 1
+
+        grid = cls(
+            xmin=xmin,
+            ymin=ymin,
+            resolution=resolution,
+            counts=np.zeros((nx, ny), dtype=np.int32),
+            distance=distance,
+        )
+        grid.add_bboxes(_get_obstacle_bboxes(component, avoid_layers))
+        return grid
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.counts.shape
+
+    @property
+    def occupancy(self) -> np.ndarray:
+        """Returns (nx, ny) boolean array, True for blocked cells."""
+        return self.counts > 0
+
+    def copy(self) -> RoutingGrid:
+        return RoutingGrid(
+            xmin=self.xmin,
+            ymin=self.ymin,
+            resolution=self.resolution,
+            counts=self.counts.copy(),
+            distance=self.distance,
+            obstacles=self.obstacles.copy(),
+        )
 
-class Node:
-    def __init__(self, parent=None, position: tuple = ()):
-        """Initializes a node. A node is a point on the grid."""
-        self.parent = parent  # parent node of current node
-        self.position = position  # position of current node
+    def _get_cell_ranges(
+        self, bboxes: np.ndarray, distances: np.ndarray, margin: float = 0.5
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns imin, imax, jmin, jmax (exclusive) of the cells blocked by bboxes.
+
+        Args:
+            bboxes: (N, 4) array of xmin, ymin, xmax, ymax.
+            distances: (N,) clearance around each bbox.
+            margin: in cells. 0.5 blocks cells that get within distance,
+                0 only cells with their center within distance.
+        """
+        nx, ny = self.shape
+        res = self.resolution
+        imin = np.ceil((bboxes[:, 0] - distances - self.xmin) / res - margin)
+        jmin = np.ceil((bboxes[:, 1] - distances - self.ymin) / res - margin)
+        imax = np.floor((bboxes[:, 2] + distances - self.xmin) / res + margin) + 1
+        jmax = np.floor((bboxes[:, 3] + distances - self.ymin) / res + margin) + 1
+        return (
+            np.clip(imin, 0, nx).astype(int),
+            np.clip(imax, 0, nx).astype(int),
+            np.clip(jmin, 0, ny).astype(int),
+            np.clip(jmax, 0, ny).astype(int),
+        )
 
-        self.g = 0  # distance between current node and start node
-        self.h = 0  # distance between current node and end node
-        self.f = self.g + self.h  # cost of the node (sum of g and h)
+    def add_bboxes(self, bboxes: np.ndarray, distance: Optional[float] = None) -> None:
+        """Adds obstacles.
+
+        Args:
+            bboxes: (N, 4) array of xmin, ymin, xmax, ymax.
+            distance: clearance in um. Defaults to the grid distance.
+        """
+        bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+        if not len(bboxes):
+            return
+        distances = np.full(
+            len(bboxes), self.distance if distance is None else distance
+        )
+        self.obstacles = np.vstack(
+            [self.obstacles, np.column_stack([bboxes, distances])]
+        )
+
+        nx, ny = self.shape
+        imin, imax, jmin, jmax = self._get_cell_ranges(bboxes, distances)
+        valid = (imin < imax) & (jmin < jmax)
+        imin, imax, jmin, jmax = imin[valid], imax[valid], jmin[valid], jmax[valid]
+
+        # 2D difference array: one cumulative sum per axis fills all rectangles
+        diff = np.zeros((nx + 1, ny + 1), dtype=np.int32)
+        np.add.at(diff, (imin, jmin), 1)
+        np.add.at(diff, (imax, jmin), -1)
+        np.add.at(diff, (imin, jmax), -1)
+        np.add.at(diff, (imax, jmax), 1)
+        self.counts += diff.cumsum(axis=0).cumsum(axis=1)[:nx, :ny]
+
+    def add_route(self, route: Route, distance: Optional[float] = None) -> None:
+        """Adds a route as an obstacle for the following routes.
+
+        Args:
+            route: to commit.
+            distance: clearance in um. Defaults to the grid distance.
+        """
+        bboxes = [np.ravel(ref.bbox) for ref in route.references]
+        self.add_bboxes(np.array(bboxes), distance=distance)
+
+    def to_index(self, xy) -> Cell:
+        """Returns the cell closest to a point."""
+        return (
+            int(round((xy[0] - self.xmin) / self.resolution)),
+            int(round((xy[1] - self.ymin) / self.resolution)),
+        )
+
+    def get_free_cells(self, xy, tolerance: float = 1e-3) -> Set[Cell]:
+        """Returns the cells only blocked by the clearance of obstacles touching xy.
+
+        A route can always leave a port through the clearance of the obstacle
+        the port belongs to.
+
+        Args:
+            xy: point, usually a port center.
+            tolerance: in um to consider that an obstacle touches xy.
+        """
+        x, y = xy
+        o = self.obstacles
+        owners = o[
+            (o[:, 0] - tolerance <= x)
+            & (x <= o[:, 2] + tolerance)
+            & (o[:, 1] - tolerance <= y)
+            & (y <= o[:, 3] + tolerance)
+        ]
+        if not len(owners):
+            return set()
+
+        imin, imax, jmin, jmax = self._get_cell_ranges(owners[:, :4], owners[:, 4])
+        i0, i1, j0, j1 = imin.min(), imax.max(), jmin.min(), jmax.max()
+        xs = self.xmin + np.arange(i0, i1)[:, None] * self.resolution
+        ys = self.ymin + np.arange(j0, j1)[None, :] * self.resolution
+
+        own = np.zeros((i1 - i0, j1 - j0), dtype=np.int32)
+        inside = np.zeros(own.shape, dtype=bool)
+        for (bx0, by0, bx1, by1, _), a0, a1, b0, b1 in zip(
+            owners, imin, imax, jmin, jmax
+        ):
+            own[a0 - i0 : a1 - i0, b0 - j0 : b1 - j0] += 1
+            inside |= (bx0 < xs) & (xs < bx1) & (by0 < ys) & (ys < by1)
+
+        free = (own > 0) & (self.counts[i0:i1, j0:j1] == own) & ~inside
+        return {(int(i) + i0, int(j) + j0) for i, j in np.argwhere(free)}
+
+    def find_path(
+        self,
+        start: Cell,
+        end: Cell,
+        start_direction: Optional[int] = None,
+        end_direction: Optional[int] = None,
+        bend_penalty: float = 0,
+        bend_size: float = 0,
+        lead: float = 0,
+        free: Optional[Set[Cell]] = None,
+        cost: Optional[np.ndarray] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[List[Cell]]:
+        """Returns the cells of the cheapest path between two cells.
+
+        Returns None if there is no path.
+
+        Args:
+            start: start cell.
+            end: end cell.
+            start_direction: 0-3 (east, north, west, south) to leave start.
+                None for any.
+            end_direction: 0-3 direction to arrive to end. None for any.
+            bend_penalty: extra cost in um for each turn.
+            bend_size: straight length in um that a bend takes on each side
+                of a corner. Two corners need at least 2 * bend_size between them.
+            lead: straight length in um before start and after end.
+            free: cells that can be used even if they are blocked.
+            cost: optional (nx, ny) extra cost in um to enter each cell.
+            deadline: optional time.perf_counter() value to give up the search.
+        """
+        nx, ny = self.shape
+        if not (0 <= start[0] < nx and 0 <= start[1] < ny):
+            return None
+        if not (0 <= end[0] < nx and 0 <= end[1] < ny):
+            return None
+
+        counts = self.counts
+        free = free or set()
+        res = self.resolution
+        eps = 1e-9
+
+        # straight run since the last corner in cells, capped at `cap`.
+        # Runs of the first segment (before any corner) are offset by cap + 1
+        cap = max(int(np.ceil(2 * bend_size / res - eps)), 1)
+        first = cap + 1
+
+        def can_turn(run: int) -> bool:
+            if run >= first:
+                return (
+                    start_direction is None
+                    or (run - first) * res + lead >= bend_size - eps
+                )
+            return run * res >= 2 * bend_size - eps
+
+        def is_end(d: int, run: int) -> bool:
+            if end_direction is not None and d == (end_direction + 2) % 4:
+                return False  # would need a U-turn into the port
+            if end_direction is None or d == end_direction:
+                return run >= first or run * res + lead >= bend_size - eps
+            return can_turn(run) and lead >= bend_size - eps
+
+        ei, ej = end
+        si, sj = start
+        g: Dict[Tuple[int, int, int, int], float] = {}
+        parent: Dict[Tuple[int, int, int, int], Tuple[int, int, int, int]] = {}
+        heap = []
+        counter = 0
+        for d in range(4) if start_direction is None else [start_direction]:
+            state = (si, sj, d, first)
+            g[state] = 0.0
+            heap.append(((abs(si - ei) + abs(sj - ej)) * res, counter, 0.0, state))
+            counter += 1
+        heapq.heapify(heap)
+
+        expanded = 0
+        while heap:
+            expanded += 1
+            if deadline and expanded % 1024 == 0 and time.perf_counter() > deadline:
+                return None
+            _, _, g_current, state = heapq.heappop(heap)
+            if g_current > g[state]:
+                continue  # stale entry
+            i, j, d, run = state
+            if i == ei and j == ej and is_end(d, run):
+                return _trace_back(parent, state)
+
+            for dn in (d, (d + 1) % 4, (d + 3) % 4):
+                if dn == d:
+                    run_new = min(run + 1, 2 * cap + 1 if run >= first else cap)
+                elif can_turn(run):
+                    run_new = 1
+                else:
+                    continue
+
+                di, dj = DIRECTIONS[dn]
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < nx and 0 <= nj < ny):
+                    continue
+                if counts[ni, nj] and (ni, nj) not in free:
+                    continue
+
+                g_new = g_current + res
+                if dn != d:
+                    g_new += bend_penalty
+                if ni == ei and nj == ej and end_direction not in (None, dn):
+                    g_new += bend_penalty
+                if cost is not None:
+                    g_new += cost[ni, nj]
+
+                state_new = (ni, nj, dn, run_new)
+                if g_new < g.get(state_new, np.inf):
+                    g[state_new] = g_new
+                    parent[state_new] = state
+                    h = (abs(ni - ei) + abs(nj - ej)) * res
+                    heapq.heappush(heap, (g_new + h, counter, g_new, state_new))
+                    counter += 1
+        return None
+
+
+def _trace_back(parent: Dict, state: Tuple[int, int, int, int]) -> List[Cell]:
+    cells = [state[:2]]
+    while state in parent:
+        state = parent[state]
+        cells.append(state[:2])
+    return cells[::-1]
+
+
+def _get_obstacle_bboxes(
+    component: Component, avoid_layers: Optional[List[LayerSpec]] = None
+) -> np.ndarray:
+    """Returns (N, 4) array of obstacle bboxes (xmin, ymin, xmax, ymax).
+
+    Uses the component spatial index, so polygon bounding boxes on avoid_layers
+    are computed once per cell instead of flattening the component.
+    """
+    index = component.get_spatial_index()
+    if avoid_layers is None:
+        return index.get_bboxes(polygons=False)
+    return index.get_bboxes(layers=[gf.get_layer(layer) for layer in avoid_layers])
+
+
+def _get_signature(component: Component) -> Tuple:
+    """Returns a cheap signature that changes when the component geometry changes."""
+    index = component.get_spatial_index()
+    return id(index), index.version
+
+
+def get_routing_grid(
+    component: Component,
+    resolution: float = 1,
+    avoid_layers: Optional[List[LayerSpec]] = None,
+    distance: float = 1,
+    copy: bool = True,
+) -> RoutingGrid:
+    """Returns the routing grid of a component.
+
+    Grids are cached per component, avoid_layers, resolution and distance,
+    and rasterized again only when the component references or polygons change.
+
+    Args:
+        component: to rasterize.
+        resolution: cell size in um.
+        avoid_layers: list of layers to avoid.
+            None avoids the bounding boxes of all references.
+        distance: clearance in um around obstacles.
+        copy: returns a copy that can be modified without changing the cache.
+    """
+    layers = (
+        tuple(gf.get_layer(layer) for layer in avoid_layers)
+        if avoid_layers is not None
+        else None
+    )
+    key = (layers, resolution, distance)
+    signature = _get_signature(component)
+    grids: Dict = _grid_cache.setdefault(component, {})
+
+    if key in grids and grids[key][0] == signature:
+        grid = grids[key][1]
+    else:
+        grid = RoutingGrid.from_component(
+            component,
+            resolution=resolution,
+            avoid_layers=avoid_layers,
+            distance=distance,
+        )
+        grids[key] = (signature, grid)
+    return grid.copy() if copy else grid
 
 
 def get_route_astar(
@@ -33,6 +431,8 @@ def get_route_astar(
     avoid_layers: List[LayerSpec] = None,
     distance: float = 1,
     cross_section: CrossSectionSpec = "strip",
+    bend_penalty: Optional[float] = None,
+    grid: Optional[RoutingGrid] = None,
     **kwargs,
 ) -> Route:
     """A* routing function. Finds a route between two ports avoiding obstacles.
@@ -48,282 +448,152 @@ def get_route_astar(
         avoid_layers: list of layers to avoid.
         distance: distance from obstacles in um.
         cross_section: spec.
+        bend_penalty: extra cost of each bend in um.
+            Defaults to the cross_section radius or resolution.
+        grid: optional RoutingGrid shared between routes (see get_routing_grid).
+            The route is added to the grid as an obstacle for the next routes.
+            Overrides resolution, avoid_layers and distance.
         kwargs: cross_section settings.
-    """
-    cross_section = gf.get_cross_section(cross_section, **kwargs)
 
-    grid, x, y = _generate_grid(component, resolution, avoid_layers, distance)
-
-    # Tell the algorithm which start and end directions to follow based on port orientation
-    input_orientation = {
-        0.0: (resolution, 0),
-        90.0: (0, resolution),
-        180.0: (-resolution, 0),
-        270.0: (0, -resolution),
-        None: (0, 0),
-    }[port1.orientation]
-
-    output_orientation = {
-        0.0: (resolution, 0),
-        90.0: (0, resolution),
-        180.0: (-resolution, 0),
-        270.0: (0, -resolution),
-        None: (0, 0),
-    }[port2.orientation]
-
-    # Instantiate nodes
-    start_node = Node(
-        None,
-        (
-            round(port1.x + input_orientation[0]),
-            round(port1.y + input_orientation[1]),
-        ),
-    )
-    start_node.g = start_node.h = start_node.f = 0
-
-    end_node = Node(
-        None,
-        (
-            round(port2.x + output_orientation[0]),
-            round(port2.y + output_orientation[1]),
-        ),
-    )
-    end_node.g = end_node.h = end_node.f = 0
-
-    # Add the start node
-    open_list = [start_node]
-    closed = []
-
-    while open_list:
-        # Current node
-        current_index = 0
-        for index in range(len(open_list)):
-            if open_list[index].f < open_list[current_index].f:
-                current_index = index
-
-        # Pop current off open_list list, add to closed list
-        current_node = open_list[current_index]
-        closed.append(open_list.pop(current_index))
-
-        # Reached end port
-        if (
-            current_node.position[0] == end_node.position[0]
-            and current_node.position[1] == end_node.position[1]
-        ):
-            points = []
-            current = current_node
-
-            # trace back path from end node to start node
-            while current is not None:
-                points.append(current.position)
-                current = current.parent
-            # reverse to get true path
-            points = points[::-1]
-
-            # add the start and end ports
-            points.insert(0, port1.center)
-            points.append(port2.center)
-
-            # return route from points
-            if cross_section.radius:
-                return get_route_from_waypoints(points, cross_section=cross_section)
-            else:
-                return get_route_from_waypoints(
-                    points, cross_section=cross_section, bend=wire_corner
-                )
+    .. code::
+
+        import gdsfactory as gf
 
-        # Generate neighbours
-        neighbours = _generate_neighbours(
-            grid=grid,
-            x=x,
-            y=y,
-            current_node=current_node,
+        grid = gf.routing.get_routing_grid(c, resolution=5, distance=5)
+        for port1, port2 in port_pairs:
+            route = gf.routing.get_route_astar(c, port1, port2, grid=grid)
+            c.add(route.references)
+    """
+    cross_section = gf.get_cross_section(cross_section, **kwargs)
+    shared_grid = grid is not None
+    if grid is None:
+        grid = get_routing_grid(
+            component,
             resolution=resolution,
+            avoid_layers=avoid_layers,
+            distance=distance,
+            copy=False,
         )
 
-        # Loop through neighbours
-        for neighbour in neighbours:
-
-            for closed_neighbour in closed:
-                if neighbour == closed_neighbour:
-                    continue
-
-            # Compute f, g, h
-            neighbour.g = current_node.g + resolution
-            # print(neighbour.g)
-            neighbour.h = np.sqrt(
-                (neighbour.position[0] - end_node.position[0]) ** 2
-            ) + ((neighbour.position[1] - end_node.position[1]) ** 2)
-            neighbour.f = neighbour.g + neighbour.h
-
-            if current_node.parent is not None and (
-                neighbour.position[0] - current_node.parent.position[0],
-                neighbour.position[1] - current_node.parent.position[1],
-            ) in [
-                (resolution, -resolution),
-                (-resolution, resolution),
-                (resolution, resolution),
-                (-resolution, -resolution),
-            ]:
-                neighbour.f *= 1.1  # penalize for turns
-
-            # neighbour is already in the open_list
-            for open_list_node in open_list:
-                if neighbour == open_list_node and neighbour.g > open_list_node.g:
-                    continue
+    bend, bend_size = _get_bend(cross_section)
+    if bend_penalty is None:
+        bend_penalty = cross_section.radius or grid.resolution
 
-            # Add the neighbour to open_list
-            open_list.append(neighbour)
-
-    warn("A* algorithm failed, resorting to Manhattan routing. Watch for overlaps.")
-    return route_manhattan(port1, port2, cross_section=cross_section)
+    points = _get_waypoints(
+        grid, port1, port2, bend_penalty=bend_penalty, bend_size=bend_size
+    )
 
+    if points is None:
+        warn("A* algorithm failed, resorting to Manhattan routing. Watch for overlaps.")
+        route = route_manhattan(port1, port2, cross_section=cross_section)
+    else:
+        route = get_route_from_waypoints(points, cross_section=cross_section, bend=bend)
 
-def _extract_all_bbox(c: Component, avoid_layers: List[LayerSpec] = None):
-    """Extract all polygons whose layer is in `avoid_layers`."""
-    return [c.get_polygons(layer) for layer in avoid_layers]
+    if shared_grid:
+        grid.add_route(route)
+    return route
 
 
-def _generate_grid(
-    c: Component,
-    resolution: float = 0.5,
-    avoid_layers: List[LayerSpec] = None,
-    distance: float = 1,
-) -> np.ndarray:
-    """Generate discretization grid that the algorithm will step through."""
-    bbox = c.bbox
-    x, y = np.meshgrid(
-        np.linspace(
-            bbox[0][0],
-            bbox[1][0],
-            int((bbox[1][0] - bbox[0][0]) / resolution),
-            endpoint=True,
-        ),
-        np.linspace(
-            bbox[0][1],
-            bbox[1][1],
-            int((bbox[1][1] - bbox[0][1]) / resolution),
-            endpoint=True,
-        ),
-    )  # discretize component space
-    x, y = x[0], y[:, 0]  # weed out copies
-    grid = np.zeros(
-        (len(x), len(y))
-    )  # mapping from gdsfactory's x-, y- coordinate to grid vertex
-
-    # assign 1 for obstacles
-    if avoid_layers is None:
-        for ref in c.references:
-            bbox = ref.bbox
-            xmin = np.abs(x - bbox[0][0] + distance).argmin()
-            xmax = np.abs(x - bbox[1][0] - distance).argmin()
-            ymin = np.abs(y - bbox[0][1] + distance).argmin()
-            ymax = np.abs(y - bbox[1][1] - distance).argmin()
-
-            grid[xmin:xmax, ymin:ymax] = 1
-    else:
-        all_refs = _extract_all_bbox(c, avoid_layers)
-        for layer in all_refs:
-            for bbox in layer:
-                xmin = np.abs(x - bbox[0][0] + distance).argmin()
-                xmax = np.abs(x - bbox[2][0] - distance).argmin()
-                ymin = np.abs(y - bbox[0][1] + distance).argmin()
-                ymax = np.abs(y - bbox[2][1] - distance).argmin()
-                grid[xmin:xmax, ymin:ymax] = 1
-
-    return np.ndarray.round(grid, 3), np.ndarray.round(x, 3), np.ndarray.round(y, 3)
-
-
-def _generate_neighbours(
-    current_node: Node,
-    grid,
-    x: np.ndarray,
-    y: np.ndarray,
-    resolution: float,
-) -> List[Node]:
-    """Generate neighbours of a node."""
-    neighbours = []
-
-    for new_position in [
-        (0, -resolution),
-        (0, resolution),
-        (-resolution, 0),
-        (resolution, 0),
-    ]:  # Adjacent nodes along Manhattan path
-
-        # Get node position
-        node_position = (
-            current_node.position[0] + new_position[0],
-            current_node.position[1] + new_position[1],
-        )
+def _get_bend(cross_section: CrossSection) -> Tuple[ComponentSpec, float]:
+    """Returns the bend used to round the route corners and its size."""
+    bend = bend_euler if cross_section.radius else wire_corner
+    return bend, _get_bend_size(gf.get_component(bend, cross_section=cross_section))
 
-        # Make sure within range and not in obstacle
-        if (
-            node_position[0] > x.max()
-            or node_position[0] < x.min()
-            or node_position[1] > y.max()
-            or node_position[1] < y.min()
-        ):
-            continue
-
-        if (
-            grid[
-                next(
-                    i
-                    for i, _ in enumerate(x)
-                    if np.isclose(_, node_position[0], atol=resolution)
-                )
-            ][
-                next(
-                    i
-                    for i, _ in enumerate(y)
-                    if np.isclose(_, node_position[1], atol=resolution)
-                )
-            ]
-            == 1.0
-        ):
-            continue
 
-        # Create new node
-        new_node = Node(current_node, node_position)
+def _get_start(grid: RoutingGrid, port: Port) -> Tuple[np.ndarray, Optional[int]]:
+    """Returns the point one resolution step in front of a port and its direction."""
+    if port.orientation is None:
+        return np.array(port.center), None
+    direction = ORIENTATION_TO_DIRECTION[int(round(port.orientation)) % 360]
+    step = np.array(DIRECTIONS[direction]) * grid.resolution
+    return np.array(port.center) + step, direction
 
-        # Append
-        neighbours.append(new_node)
 
-    return neighbours
+def _get_waypoints(
+    grid: RoutingGrid,
+    port1: Port,
+    port2: Port,
+    bend_penalty: float,
+    bend_size: float = 0,
+    cost: Optional[np.ndarray] = None,
+    deadline: Optional[float] = None,
+) -> Optional[np.ndarray]:
+    """Returns the A* waypoints from port1 to port2 or None if no path is found.
+
+    The path runs on a lattice aligned with the point in front of port1.
+    If the point in front of port2 is off the lattice, the path ends in the
+    closest lattice cell and its last straight run is moved sideways (less
+    than half a resolution step) in line with port2, so it connects to the
+    port center with a short straight stub.
+    """
+    res = grid.resolution
+    xy1, direction1 = _get_start(grid, port1)
+    xy2, direction2 = _get_start(grid, port2)
+
+    steps = np.round((xy2 - xy1) / res).astype(int)
+
+    start = grid.to_index(xy1)
+    end = (start[0] + int(steps[0]), start[1] + int(steps[1]))
+    free = grid.get_free_cells(port1.center) | grid.get_free_cells(port2.center)
+    free |= {start, end}
+
+    cells = grid.find_path(
+        start=start,
+        end=end,
+        start_direction=direction1,
+        end_direction=None if direction2 is None else (direction2 + 2) % 4,
+        bend_penalty=bend_penalty,
+        bend_size=bend_size,
+        lead=res,
+        free=free,
+        cost=cost,
+        deadline=deadline,
+    )
+    if cells is None:
+        return None
 
+    points = (np.array(cells) - start) * res + xy1
+    points = _align_run(points[::-1], port2.center, direction2)
+    points = _align_run(points[::-1], port1.center, direction1)
+    points = np.vstack([port1.center, points, port2.center])
 
-if __name__ == "__main__":
+    # the stubs to both ports can not be aligned if the path is a single run
+    segments = np.abs(np.diff(points, axis=0))
+    if not np.all((segments < 1e-6).any(axis=1)):
+        return None
+    return points
 
-    # cross_section = gf.get_cross_section("metal1", width=3)
 
-    # c = gf.Component("get_route_astar")
-    # w = gf.components.straight(cross_section=cross_section)
+def _align_run(
+    points: np.ndarray, xy: np.ndarray, direction: Optional[int]
+) -> np.ndarray:
+    """Returns points with the first straight run in line with xy.
 
-    # left = c << w
-    # right = c << w
-    # right.move((100, 80))
+    Args:
+        points: (N, 2) lattice path starting next to xy.
+        xy: port center to connect to points[0] with a straight stub.
+        direction: 0-3 of the stub. None uses the direction of the first run.
+    """
+    points = points.copy()
+    if direction is not None:
+        axis = direction % 2
+    elif len(points) > 1:
+        axis = int(abs(points[1, 1] - points[0, 1]) > 1e-6)
+    else:
+        axis = int(abs(xy[1] - points[0, 1]) > abs(xy[0] - points[0, 0]))
+    side = 1 - axis
 
-    # obstacle = gf.components.rectangle(size=(100, 3), layer="M1")
-    # obstacle1 = c << obstacle
-    # obstacle2 = c << obstacle
-    # obstacle1.ymin = 40
-    # obstacle2.xmin = 25
+    run = np.abs(points[:, side] - points[0, side]) < 1e-6
+    n = len(points) if run.all() else int(np.argmin(run))
+    points[:n, side] = xy[side]
 
-    # port1 = left.ports["e2"]
-    # port2 = right.ports["e2"]
+    # drop the first point if xy is already past it along the run
+    if n > 1 and (points[1, axis] - points[0, axis]) * (points[0, axis] - xy[axis]) < 0:
+        points = points[1:]
+    return points
 
-    # routes = get_route_astar(
-    #     component=c,
-    #     port1=port1,
-    #     port2=port2,
-    #     cross_section=cross_section,
-    #     resolution=5,
-    #     distance=6.5,
-    #     avoid_layers=("M1",),
-    # )
-    # c.add(routes.references)
 
+if __name__ == "__main__":
     c = gf.Component("get_route_astar_avoid_layers")
     cross_section = gf.get_cross_section("metal1", width=3)
     w = gf.components.straight(cross_section=cross_section)
@@ -0,0 +1,300 @@
+"""Routes many nets on a shared A* grid with negotiated congestion.
+
+All nets are first routed ignoring each other. Then, while some cells are
+used by more than one route, the congested nets are ripped up and routed again
+with a cost that grows with the present use of each cell (present congestion)
+and with how often the cell was overused before (history), so nets negotiate
+who gets the contested cells, like the PathFinder algorithm for FPGA routing.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from warnings import warn
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+from gdsfactory.port import Port
+from gdsfactory.routing.get_route import get_route_from_waypoints
+from gdsfactory.routing.get_route_astar import (
+    RoutingGrid,
+    _get_bend,
+    _get_waypoints,
+    get_routing_grid,
+)
+from gdsfactory.routing.manhattan import remove_flat_angles, route_manhattan
+from gdsfactory.types import CrossSectionSpec, LayerSpec, Route
+
+
+def _get_footprint(
+    grid: RoutingGrid, points: np.ndarray, distance: float
+) -> np.ndarray:
+    """Returns flat indices of the cells with their center closer than distance \
+    to a Manhattan path."""
+    points = np.asarray(points, dtype=float)
+    bboxes = np.column_stack(
+        [
+            np.minimum(points[:-1], points[1:]),
+            np.maximum(points[:-1], points[1:]),
+        ]
+    )
+    distances = np.full(len(bboxes), distance - 1e-6)
+    imin, imax, jmin, jmax = grid._get_cell_ranges(bboxes, distances, margin=0)
+    indices = [
+        np.ravel_multi_index(
+            np.meshgrid(np.arange(i0, i1), np.arange(j0, j1), indexing="ij"),
+            grid.shape,
+        ).ravel()
+        for i0, i1, j0, j1 in zip(imin, imax, jmin, jmax)
+    ]
+    return np.unique(np.concatenate(indices)) if indices else np.zeros(0, int)
+
+
+def _box_sum(a: np.ndarray, radius: int) -> np.ndarray:
+    """Returns the sum of a over the (2 * radius + 1) square around each cell."""
+    if radius <= 0:
+        return a
+    nx, ny = a.shape
+    s = np.zeros((nx + 1, ny + 1))
+    s[1:, 1:] = a.cumsum(axis=0).cumsum(axis=1)
+    i = np.arange(nx)
+    j = np.arange(ny)
+    i0, i1 = np.clip(i - radius, 0, nx), np.clip(i + radius + 1, 0, nx)
+    j0, j1 = np.clip(j - radius, 0, ny), np.clip(j + radius + 1, 0, ny)
+    return s[i1][:, j1] - s[i0][:, j1] - s[i1][:, j0] + s[i0][:, j0]
+
+
+def get_routes_astar(
+    component: Component,
+    port_pairs: List[Tuple[Port, Port]],
+    resolution: float = 1,
+    avoid_layers: Optional[List[LayerSpec]] = None,
+    distance: float = 1,
+    cross_section: CrossSectionSpec = "metal_routing",
+    bend_penalty: Optional[float] = None,
+    max_iterations: int = 30,
+    timeout: float = 30,
+    present_factor: float = 1.0,
+    present_factor_growth: float = 1.5,
+    history_factor: float = 1.0,
+    **kwargs,
+) -> Tuple[List[Route], Dict[str, Any]]:
+    """Returns routes for many port pairs, avoiding obstacles and each other.
+
+    All nets are planned on one shared RoutingGrid (see get_route_astar).
+    Nets that share cells with other nets are ripped up and routed again with
+    an increasing congestion cost until no cells are shared,
+    max_iterations is reached or timeout seconds have passed.
+
+    Args:
+        component: Component the routes and ports belong to.
+        port_pairs: list of (port1, port2) to connect.
+        resolution: grid cell size in um.
+        avoid_layers: list of layers to avoid.
+            None avoids the bounding boxes of all references.
+        distance: clearance in um to obstacles and between routes.
+        cross_section: spec.
+        bend_penalty: extra cost of each bend in um.
+            Defaults to the cross_section radius or resolution.
+        max_iterations: maximum number of rip-up and reroute iterations.
+        timeout: time budget in seconds.
+        present_factor: initial cost of using a cell used by another net,
+            in units of resolution.
+        present_factor_growth: present_factor multiplier for each iteration.
+        history_factor: cost added to a cell, in units of resolution,
+            for each iteration it is overused.
+        kwargs: cross_section settings.
+
+    Returns:
+        routes: list of routes in the same order as port_pairs.
+        stats: dict with iterations, converged, overflow (number of cells used
+            by more than one net), time, grid (shape, resolution, blocked
+            fraction) and nets (ports, time, reroutes, length, bends
+            and routed for each net).
+
+    .. code::
+
+        import gdsfactory as gf
+
+        routes, stats = gf.routing.get_routes_astar(c, port_pairs, resolution=5)
+        for route in routes:
+            c.add(route.references)
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + timeout
+    x = gf.get_cross_section(cross_section, **kwargs)
+    bend, bend_size = _get_bend(x)
+    grid = get_routing_grid(
+        component,
+        resolution=resolution,
+        avoid_layers=avoid_layers,
+        distance=distance,
+        copy=False,
+    )
+    if bend_penalty is None:
+        bend_penalty = x.radius or resolution
+    # routes keep `distance` from the edges of other routes, like from obstacles
+    half_spacing = (x.width / 2 + distance) / 2
+    radius = int(np.floor(half_spacing / resolution - 1e-6))
+
+    size = grid.counts.size
+    usage = np.zeros(size, dtype=np.int32)  # routes and pins using each cell
+    route_usage = np.zeros(size, dtype=np.int32)
+    history = np.zeros(size)
+
+    # cells in front of each port are reserved for its net
+    pins = []
+    for port1, port2 in port_pairs:
+        pin_points = [
+            (port.center, port.center + _get_step(port, resolution))
+            for port in (port1, port2)
+        ]
+        pin = np.unique(
+            np.concatenate([_get_footprint(grid, p, half_spacing) for p in pin_points])
+        )
+        pins.append(pin)
+        usage[pin] += 1
+
+    nnets = len(port_pairs)
+    paths: List[Optional[np.ndarray]] = [None] * nnets
+    footprints = [np.zeros(0, int) for _ in range(nnets)]
+    nets = [
+        dict(
+            ports=(port1.name, port2.name),
+            time=0.0,
+            reroutes=-1,
+            length=None,
+            bends=None,
+            routed=False,
+        )
+        for port1, port2 in port_pairs
+    ]
+
+    # shortest nets first
+    order = sorted(
+        range(nnets),
+        key=lambda i: np.abs(port_pairs[i][0].center - port_pairs[i][1].center).sum(),
+    )
+    to_route = order
+    present = present_factor
+    iteration = 0
+    overflow = 0
+
+    while to_route and iteration < max_iterations:
+        iteration += 1
+        for i in to_route:
+            if time.perf_counter() > deadline:
+                break
+            t = time.perf_counter()
+            usage[footprints[i]] -= 1
+            route_usage[footprints[i]] -= 1
+            usage[pins[i]] -= 1
+            # a route conflicts with the footprints within its own footprint
+            cost = _box_sum((history + present * usage).reshape(grid.shape), radius)
+            port1, port2 = port_pairs[i]
+            points = _get_waypoints(
+                grid,
+                port1,
+                port2,
+                bend_penalty=bend_penalty,
+                bend_size=bend_size,
+                cost=cost * resolution,
+                deadline=deadline,
+            )
+            if points is not None:
+                paths[i] = points
+                footprint = _get_footprint(grid, points, half_spacing)
+                footprints[i] = np.setdiff1d(footprint, pins[i], assume_unique=True)
+            usage[footprints[i]] += 1
+            route_usage[footprints[i]] += 1
+            usage[pins[i]] += 1
+            nets[i]["time"] += time.perf_counter() - t
+            nets[i]["reroutes"] += 1
+
+        # pins too close to each other are not counted as congestion
+        overused = (usage > 1) & (route_usage > 0)
+        overflow = int(overused.sum())
+        if not overflow or time.perf_counter() > deadline:
+            break
+
+        history[overused] += history_factor
+        present *= present_factor_growth
+        to_route = [i for i in order if overused[footprints[i]].any()]
+
+    routes = []
+    for i, (port1, port2) in enumerate(port_pairs):
+        points = paths[i]
+        if points is None:
+            warn(
+                f"A* could not route {port1.name!r} to {port2.name!r}, "
+                "resorting to Manhattan routing. Watch for overlaps."
+            )
+            route = route_manhattan(port1, port2, cross_section=x)
+        else:
+            route = get_route_from_waypoints(points, cross_section=x, bend=bend)
+            nets[i].update(
+                routed=True,
+                length=float(np.abs(np.diff(points, axis=0)).sum()),
+                bends=len(remove_flat_angles(points)) - 2,
+            )
+        routes.append(route)
+
+    if overflow:
+        warn(
+            f"get_routes_astar did not converge after {iteration} iterations: "
+            f"{overflow} cells are used by more than one route."
+        )
+
+    stats = dict(
+        iterations=iteration,
+        converged=not overflow and all(path is not None for path in paths),
+        overflow=overflow,
+        time=time.perf_counter() - t0,
+        grid=dict(
+            shape=grid.shape,
+            resolution=grid.resolution,
+            blocked=float(grid.occupancy.mean()),
+        ),
+        nets=nets,
+    )
+    return routes, stats
+
+
+def _get_step(port: Port, resolution: float) -> np.ndarray:
+    if port.orientation is None:
+        return np.zeros(2)
+    angle = np.deg2rad(port.orientation)
+    return np.round([np.cos(angle), np.sin(angle)]) * resolution
+
+
+if __name__ == "__main__":
+    c = gf.Component("get_routes_astar")
+    pad = gf.components.pad(size=(20, 20))
+    npads = 6
+    pads_left = [c << pad for _ in range(npads)]
+    pads_right = [c << pad for _ in range(npads)]
+    for i, (left, right) in enumerate(zip(pads_left, pads_right)):
+        left.move((0, 60 * i))
+        right.move((400, 60 * i))
+
+    # all routes need to go through a channel between two obstacles
+    obstacle = gf.components.rectangle(size=(50, 150), layer="M3")
+    bottom = c << obstacle
+    top = c << obstacle
+    bottom.move((175, -100))
+    top.move((175, 200))
+
+    port_pairs = [
+        (left.ports["e3"], right.ports["e1"])
+        for left, right in zip(pads_left, pads_right)
+    ]
+    routes, stats = get_routes_astar(
+        c, port_pairs, resolution=5, distance=10, cross_section="metal_routing"
+    )
+    for route in routes:
+        c.add(route.references)
+    print(stats)
+    c.show()
@@ -5,7 +5,6 @@ from typing import Dict, List, Optional, Union
 import gdsfactory as gf
 from gdsfactory.components.bend_euler import bend_euler
 from gdsfactory.cross_section import strip
-from gdsfactory.difftest import difftest
 from gdsfactory.port import Port
 from gdsfactory.types import ComponentSpec, CrossSectionSpec, Routes
 
@@ -70,6 +69,8 @@ def get_routes_bend180(
 
 
 def test_get_routes_bend180():
+    from gdsfactory.difftest import difftest
+
     c = gf.Component("get_routes_bend180")
     pad_array = gf.components.pad_array(orientation=270)
     c1 = c << pad_array
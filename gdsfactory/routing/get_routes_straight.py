@@ -4,7 +4,6 @@ from typing import Dict, List, Union
 
 import gdsfactory as gf
 from gdsfactory.components.straight import straight
-from gdsfactory.difftest import difftest
 from gdsfactory.port import Port
 from gdsfactory.types import ComponentSpec, Routes
 
@@ -47,6 +46,8 @@ def get_routes_straight(
 
 
 def test_get_routes_straight(check: bool = True):
+    from gdsfactory.difftest import difftest
+
     c = gf.Component("get_routes_straight")
     pad_array = gf.components.pad_array()
     c1 = c << pad_array
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import time
 import uuid
 import warnings
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import gdstk
 import numpy as np
@@ -153,6 +154,11 @@ def gen_sref(
     return ref
 
 
+def _isclose(a: float, b: float) -> bool:
+    """Returns np.isclose(a, b) for two finite floats, without the array overhead."""
+    return abs(a - b) <= 1e-08 + 1e-05 * abs(b)
+
+
 def _is_vertical(p0: ndarray, p1: ndarray) -> bool_:
     return np.abs(p0[0] - p1[0]) < TOLERANCE
 
@@ -419,12 +425,196 @@ def _generate_route_manhattan_points(
     return points
 
 
+def _rotate(points: ndarray, angle_deg: ndarray) -> ndarray:
+    """Rotates (N, K, 2) points by one angle per route, like transform."""
+    c = np.cos(DEG2RAD * angle_deg)[:, None]
+    s = np.sin(DEG2RAD * angle_deg)[:, None]
+    x = points[..., 0]
+    y = points[..., 1]
+    return np.stack([x * c + y * -s, x * s + y * c], axis=-1)
+
+
+def _generate_route_manhattan_points_batch(
+    input_ports: List[Port],
+    output_ports: List[Port],
+    bs1: float,
+    bs2: float,
+    start_straight_length: Union[float, ndarray] = 0.01,
+    end_straight_length: Union[float, ndarray] = 0.01,
+    min_straight_length: Union[float, ndarray] = 0.01,
+) -> List[ndarray]:
+    """Returns the points of many routes, like _generate_route_manhattan_points.
+
+    Runs the same state machine on all the routes at once, one NumPy step for
+    each turn, so every route takes the same branches as with
+    _generate_route_manhattan_points.
+
+    Args:
+        input_ports: list of input ports.
+        output_ports: list of output ports.
+        bs1: bend size.
+        bs2: bend size.
+        start_straight_length: in um, for all or for each route.
+        end_straight_length: in um, for all or for each route.
+        min_straight_length: in um, for all or for each route.
+    """
+    n = len(input_ports)
+    threshold = TOLERANCE
+    ssl = np.broadcast_to(np.asarray(start_straight_length, dtype=float), (n,))
+    esl = np.broadcast_to(np.asarray(end_straight_length, dtype=float), (n,))
+    msl = np.broadcast_to(np.asarray(min_straight_length, dtype=float), (n,))
+
+    # routes with None orientations are rare, leave them to the scalar version
+    routes: List[Optional[ndarray]] = [None] * n
+    index = []
+    for i, (port1, port2) in enumerate(zip(input_ports, output_ports)):
+        if port1.orientation is None or port2.orientation is None:
+            routes[i] = _generate_route_manhattan_points(
+                port1, port2, bs1, bs2, ssl[i], esl[i], msl[i]
+            )
+        else:
+            index.append(i)
+    if not index:
+        return routes
+
+    index = np.array(index)
+    ssl, esl, msl = ssl[index], esl[index], msl[index]
+    ports1 = [input_ports[i] for i in index]
+    ports2 = [output_ports[i] for i in index]
+    p_input = np.array([p.center for p in ports1], dtype=float)
+    p_output = np.array([p.center for p in ports2], dtype=float)
+    angle_input = np.array([p.orientation for p in ports1], dtype=float)
+    bend_orientation = -np.array([p.orientation for p in ports2], dtype=float) + 180
+
+    # transform I/O to the case where output is at (0, 0) pointing east (180)
+    translation = -p_output
+    pts_io = _rotate(
+        np.stack([p_input, p_output], axis=1) + translation[:, None], bend_orientation
+    )
+    px = pts_io[:, 0, 0].copy()
+    py = pts_io[:, 0, 1].copy()
+    p_end = pts_io[:, 1]
+
+    m = len(index)
+    a = np.trunc(angle_input + bend_orientation).astype(int) % 360
+    s = ssl.copy()
+    count = np.zeros(m, dtype=int)
+    active = np.ones(m, dtype=bool)
+    points = np.empty((m, 84, 2))
+    points[:, 0, 0] = px
+    points[:, 0, 1] = py
+    n_points = np.ones(m, dtype=int)
+
+    def _add(mask: ndarray, x: ndarray, y: ndarray) -> None:
+        rows = np.flatnonzero(mask)
+        points[rows, n_points[rows], 0] = x[rows]
+        points[rows, n_points[rows], 1] = y[rows]
+        n_points[rows] += 1
+
+    while active.any():
+        count[active] += 1
+        if (count > 40).any():
+            i = int(np.flatnonzero(count > 40)[0])
+            raise AttributeError(
+                f"Too many iterations for in {ports1[i]} -> out {ports2[i]}"
+            )
+        sigp = np.sign(py)
+        sigp[sigp == 0] = 1
+        abs_py = np.abs(py)
+        nx = px.copy()
+        ny = py.copy()
+        na = a.copy()
+
+        # same directions
+        same = active & (a % 360 == 0)
+        done = same & (abs_py < threshold) & (px <= threshold)
+        free = same & ~done
+        sbend = free & (
+            (px + (bs1 + bs2 + esl + s) < threshold)
+            & (abs_py - (bs1 + bs2 + msl) > -threshold)
+        )
+        free &= ~sbend
+        aside = free & (
+            (px + (2 * bs1 + 2 * bs2 + esl + s + msl) < threshold)
+            | (abs_py - (2 * bs1 + 2 * bs2 + 2 * msl) > -threshold)
+        )
+        other = free & ~aside
+        nx = np.where(sbend, -esl - bs2, nx)
+        nx = np.where(aside | other, px + s + bs1, nx)
+        na = np.where(sbend | aside, -sigp * 90, na)
+        na = np.where(other, sigp * 90, na)
+
+        # opposite directions
+        opposite = active & (a == 180)
+        uturn = opposite & (abs_py - (bs1 + bs2 + msl) > -threshold)
+        turn = opposite & ~uturn
+        nx = np.where(uturn, np.minimum(px - s, -esl) - bs2, nx)
+        nx = np.where(turn, np.minimum(px - s - bs1, -esl - msl - 2 * bs1 - bs2), nx)
+        na = np.where(opposite, -sigp * 90, na)
+
+        # perpendicular
+        side = active & (a % 180 == 90)
+        siga = -np.sign((a % 360) - 180)
+        siga[siga == 0] = 1
+        free = side.copy()
+        simple = free & (
+            ((-py * siga) - (s + bs2) > -threshold) & (-px - (esl + bs2) > -threshold)
+        )
+        free &= ~simple
+        west = free & ((py * siga) <= threshold) & (px + (esl + bs1) > -threshold)
+        free &= ~west
+        up = free & (-px - (esl + 2 * bs1 + bs2 + msl) > -threshold)
+        free &= ~up
+        vsbend = free & (-px - (esl + bs2) > -threshold)
+        stuck = free & ~vsbend
+
+        ny = np.where(simple, 0.0, ny)
+        na = np.where(simple | up, 0, na)
+
+        _y = np.minimum(
+            np.maximum(np.minimum(msl, 0.5 * abs_py), abs_py - s - bs1),
+            bs1 + bs2 + msl,
+        )
+        ny = np.where(west, sigp * _y, ny)
+        ny = np.where(west & (count == 1), -sigp * np.maximum(ssl, _y), ny)
+        na = np.where(west | stuck, 180, na)
+
+        ny = np.where(up, siga * np.maximum(py * siga + s + bs1, bs1 + bs2 + msl), ny)
+
+        y_sbend = py + siga * (bs2 + s)
+        _add(vsbend, px, y_sbend)
+        nx = np.where(
+            vsbend,
+            np.minimum(px - bs1 + bs2 + msl, -2 * bs1 - bs2 - esl - msl),
+            nx,
+        )
+        ny = np.where(vsbend, y_sbend, ny)
+
+        ny = np.where(stuck, py + sigp * (s + bs1), ny)
+
+        # Reach the output!
+        _add(done, p_end[:, 0], p_end[:, 1])
+        active &= ~done
+        px = np.where(active, nx, px)
+        py = np.where(active, ny, py)
+        a = np.where(active, na, a)
+        _add(active, px, py)
+        s = np.where(active, msl + bs1, s)
+
+    # reverse transform
+    points = _rotate(points, -bend_orientation) - translation[:, None]
+    for k, i in enumerate(index):
+        routes[i] = points[k, : n_points[k]]
+    return routes
+
+
 def _get_bend_reference_parameters(
     p0: ndarray,
     p1: ndarray,
     p2: ndarray,
     bend_cell: Component,
     port_layer: Union[Layer, List[Layer]],
+    bend_ports: Optional[List[Port]] = None,
 ) -> Tuple[ndarray, int, bool]:
     """Returns bend reference settings.
 
@@ -434,6 +624,7 @@ def _get_bend_reference_parameters(
         p2: end port points.
         bend_cell: bend component.
         port_layer: for the port.
+        bend_ports: West and North facing bend ports. Defaults to finding them.
 
     8 possible configurations
     First mirror, Then rotate
@@ -471,7 +662,8 @@ def _get_bend_reference_parameters(
         (False, -1, -1): (270, True),  # H R270 + vertical mirror
     }
 
-    b1, b2 = (p.center for p in _get_bend_ports(bend=bend_cell, layer=port_layer))
+    bend_ports = bend_ports or _get_bend_ports(bend=bend_cell, layer=port_layer)
+    b1, b2 = (p.center for p in bend_ports)
 
     bsx = b2[0] - b1[0]
     bsy = b2[1] - b1[1]
@@ -594,6 +786,209 @@ def get_route_error(
     return Route(references=references, ports=[port1, port2], length=-1, labels=labels)
 
 
+class RoutingContext:
+    """Routing settings resolved once and shared by many routes.
+
+    round_corners resolves the cross_section, bend and taper specs and derives
+    the auto_widen settings for every route. A RoutingContext does it once for
+    all the routes of a bundle, caches straights by length snapped to the grid
+    and counts the time spent generating waypoints and instantiating geometry.
+
+    Args:
+        straight: the straight library to use to generate straight portions.
+        bend: the bend to use for 90Deg turns.
+        taper: taper for straight portions. If None, uses the cross_section taper.
+        straight_fall_back_no_taper: in case there is no space for two tapers.
+        cross_section: spec or list of (cross_section, angles).
+        kwargs: cross_section settings.
+
+    .. code::
+
+        import gdsfactory as gf
+
+        context = gf.routing.RoutingContext(cross_section="strip")
+        route1 = gf.routing.get_route_from_waypoints(
+            [(0, 0), (100, 0), (100, 100)], context=context
+        )
+        route2 = gf.routing.get_route_from_waypoints(
+            [(0, 10), (90, 10), (90, 100)], context=context
+        )
+        print(context.to_dict())
+    """
+
+    def __init__(
+        self,
+        straight: ComponentSpec = straight_function,
+        bend: ComponentSpec = bend_euler,
+        taper: Optional[ComponentSpec] = None,
+        straight_fall_back_no_taper: Optional[ComponentSpec] = None,
+        cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+        **kwargs,
+    ) -> None:
+        """Resolves the cross_section, bend and taper specs."""
+        from gdsfactory.pdk import get_layer
+
+        self.straight = straight
+        self.straight_fall_back_no_taper = straight_fall_back_no_taper or straight
+        self.cross_section = cross_section
+        self.kwargs = kwargs
+
+        self.multi_cross_section = isinstance(cross_section, list)
+        if self.multi_cross_section:
+            x = [
+                gf.get_cross_section(xsection[0], **kwargs)
+                for xsection in cross_section
+            ]
+            layer = [_x.layer for _x in x]
+        else:
+            x = gf.get_cross_section(cross_section, **kwargs)
+            layer = x.layer
+        self.x = x
+        self.layer = get_layer(layer)
+
+        self.bend90 = (
+            bend
+            if isinstance(bend, Component)
+            else gf.get_component(bend, cross_section=cross_section, **kwargs)
+        )
+
+        self.auto_widen = (
+            [_x.auto_widen for _x in x] if isinstance(x, list) else x.auto_widen
+        )
+        self.auto_widen_minimum_length = (
+            [_x.auto_widen_minimum_length for _x in x]
+            if isinstance(x, list)
+            else x.auto_widen_minimum_length
+        )
+        self.taper_length = (
+            [_x.taper_length for _x in x] if isinstance(x, list) else x.taper_length
+        )
+        self.width = [_x.width for _x in x] if isinstance(x, list) else x.width
+        self.width_wide = (
+            [_x.width_wide for _x in x] if isinstance(x, list) else x.width_wide
+        )
+
+        if self.multi_cross_section:
+            taper = None
+        elif taper is None:
+            taper = taper_function(
+                cross_section=cross_section,
+                width1=self.width,
+                width2=self.width_wide,
+                length=self.taper_length,
+            )
+        elif not isinstance(taper, Component):
+            taper = gf.get_component(taper, cross_section=cross_section, **kwargs)
+
+        # If there is a taper, make sure its length is known
+        if taper and isinstance(taper, Component) and "length" not in taper.info:
+            _taper_ports = list(taper.ports.values())
+            taper.info["length"] = _taper_ports[-1].x - _taper_ports[0].x
+        self.taper = taper
+
+        self.straight_ports: Optional[List[str]] = None
+        self._bend_ports: Optional[List[Port]] = None
+        self._taper_ports: Optional[List[Port]] = None
+        self._cross_section_wide = None
+        self._straights: Dict[Tuple[bool, int, int], Component] = {}
+
+        self.routes = 0
+        self.straight_hits = 0
+        self.straight_misses = 0
+        self.waypoint_time = 0.0
+        self.geometry_time = 0.0
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"RoutingContext(routes={self.routes}, straights={len(self._straights)}, "
+            f"waypoint_time={self.waypoint_time:.3g}, "
+            f"geometry_time={self.geometry_time:.3g})"
+        )
+
+    @property
+    def bend_ports(self) -> List[Port]:
+        """West and North facing ports of the bend."""
+        if self._bend_ports is None:
+            self._bend_ports = _get_bend_ports(bend=self.bend90, layer=self.layer)
+        return self._bend_ports
+
+    @property
+    def taper_ports(self) -> List[Port]:
+        """West and East facing ports of the taper."""
+        if self._taper_ports is None:
+            self._taper_ports = _get_straight_ports(self.taper, layer=self.layer)
+        return self._taper_ports
+
+    @property
+    def cross_section_wide(self) -> CrossSectionSpec:
+        """Cross_section for the straights between two tapers."""
+        if self._cross_section_wide is None:
+            if callable(self.cross_section):
+                kwargs_wide = self.kwargs.copy()
+                kwargs_wide.update(width=self.width_wide)
+                self._cross_section_wide = gf.partial(self.cross_section, **kwargs_wide)
+            else:
+                self._cross_section_wide = self.x.copy(width=self.width_wide)
+        return self._cross_section_wide
+
+    def get_straight(
+        self,
+        length: float,
+        cross_section: Optional[CrossSectionSpec] = None,
+        wide: bool = False,
+    ) -> Component:
+        """Returns a straight, cached by length snapped to the grid.
+
+        Args:
+            length: straight length in um.
+            cross_section: spec for straight_fall_back_no_taper.
+                Defaults to the context cross_section.
+            wide: if True returns a straight with the wide cross_section.
+        """
+        cross_section = self.cross_section if cross_section is None else cross_section
+        length = snap_to_grid(length)
+        key = (wide, id(cross_section), int(round(length * 1e3)))
+        component = self._straights.get(key)
+        if component is not None:
+            self.straight_hits += 1
+            return component
+
+        self.straight_misses += 1
+        if wide:
+            component = gf.get_component(
+                self.straight, length=length, cross_section=self.cross_section_wide
+            )
+        else:
+            component = gf.get_component(
+                self.straight_fall_back_no_taper,
+                length=length,
+                cross_section=cross_section,
+                **self.kwargs,
+            )
+        self._straights[key] = component
+        return component
+
+    def reset_stats(self) -> None:
+        """Resets all counters."""
+        self.routes = 0
+        self.straight_hits = 0
+        self.straight_misses = 0
+        self.waypoint_time = 0.0
+        self.geometry_time = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the counters."""
+        return dict(
+            routes=self.routes,
+            straights=len(self._straights),
+            straight_hits=self.straight_hits,
+            straight_misses=self.straight_misses,
+            waypoint_time=self.waypoint_time,
+            geometry_time=self.geometry_time,
+        )
+
+
 def round_corners(
     points: Coordinates,
     straight: ComponentSpec = straight_function,
@@ -607,6 +1002,7 @@ def round_corners(
     with_point_markers: bool = False,
     snap_to_grid_nm: Optional[int] = 1,
     with_sbend: bool = False,
+    context: Optional[RoutingContext] = None,
     **kwargs,
 ) -> Route:
     """Returns Route.
@@ -628,66 +1024,63 @@ def round_corners(
         with_point_markers: add route points markers (easy for debugging).
         snap_to_grid_nm: nm to snap to grid.
         with_sbend: add sbend in case there are routing errors.
+        context: resolved straight, bend, taper and cross_section shared
+            with other routes. Overrides straight, bend, taper,
+            straight_fall_back_no_taper, cross_section and kwargs.
         kwargs: cross_section settings.
 
     """
-    from gdsfactory.pdk import get_layer
+    t0 = time.perf_counter()
+    if context is None:
+        context = RoutingContext(
+            straight=straight,
+            bend=bend,
+            taper=taper,
+            straight_fall_back_no_taper=straight_fall_back_no_taper,
+            cross_section=cross_section,
+            **kwargs,
+        )
+    try:
+        return _round_corners(
+            points,
+            context=context,
+            mirror_straight=mirror_straight,
+            straight_ports=straight_ports,
+            on_route_error=on_route_error,
+            with_point_markers=with_point_markers,
+            snap_to_grid_nm=snap_to_grid_nm,
+            with_sbend=with_sbend,
+        )
+    finally:
+        context.routes += 1
+        context.geometry_time += time.perf_counter() - t0
 
-    multi_cross_section = isinstance(cross_section, list)
-    if multi_cross_section:
-        x = [gf.get_cross_section(xsection[0], **kwargs) for xsection in cross_section]
-        layer = [_x.layer for _x in x]
-    else:
-        x = gf.get_cross_section(cross_section, **kwargs)
-        layer = x.layer
 
-    layer = get_layer(layer)
+def _round_corners(
+    points: Coordinates,
+    context: RoutingContext,
+    mirror_straight: bool,
+    straight_ports: Optional[List[str]],
+    on_route_error: Callable,
+    with_point_markers: bool,
+    snap_to_grid_nm: Optional[int],
+    with_sbend: bool,
+) -> Route:
+    multi_cross_section = context.multi_cross_section
+    x = context.x
+    layer = context.layer
     points = (
         gf.snap.snap_to_grid(points, nm=snap_to_grid_nm) if snap_to_grid_nm else points
     )
 
     references = []
 
-    bend90 = (
-        bend
-        if isinstance(bend, Component)
-        else gf.get_component(bend, cross_section=cross_section, **kwargs)
-    )
-
-    # bsx = bsy = _get_bend_size(bend90)
-    auto_widen = [_x.auto_widen for _x in x] if isinstance(x, list) else x.auto_widen
-
-    auto_widen_minimum_length = (
-        [_x.auto_widen_minimum_length for _x in x]
-        if isinstance(x, list)
-        else x.auto_widen_minimum_length
-    )
-
-    taper_length = (
-        [_x.taper_length for _x in x] if isinstance(x, list) else x.taper_length
-    )
-
-    width = [_x.width for _x in x] if isinstance(x, list) else x.width
-    width_wide = [_x.width_wide for _x in x] if isinstance(x, list) else x.width_wide
-
-    if isinstance(cross_section, list):
-        taper = None
-    elif taper is None:
-        taper = taper_function(
-            cross_section=cross_section,
-            width1=width,
-            width2=width_wide,
-            length=taper_length,
-        )
-    elif not isinstance(taper, Component):
-        taper = gf.get_component(taper, cross_section=cross_section, **kwargs)
-
-    # If there is a taper, make sure its length is known
-    if taper and isinstance(taper, Component) and "length" not in taper.info:
-        _taper_ports = list(taper.ports.values())
-        taper.info["length"] = _taper_ports[-1].x - _taper_ports[0].x
-
-    straight_fall_back_no_taper = straight_fall_back_no_taper or straight
+    bend90 = context.bend90
+    auto_widen = context.auto_widen
+    auto_widen_minimum_length = context.auto_widen_minimum_length
+    taper_length = context.taper_length
+    width_wide = context.width_wide
+    taper = context.taper
 
     # Remove any flat angle, otherwise the algorithm won't work
     points = remove_flat_angles(points)
@@ -726,9 +1119,8 @@ def round_corners(
         )
 
     try:
-        pname_west, pname_north = (
-            p.name for p in _get_bend_ports(bend=bend90, layer=layer)
-        )
+        bend_ports = context.bend_ports
+        pname_west, pname_north = (p.name for p in bend_ports)
     except ValueError as exc:
         raise ValueError(
             f"Did not find 2 ports on layer {layer}. Got {list(bend90.ports.values())}"
@@ -742,7 +1134,7 @@ def round_corners(
     # Add bend sections and record straight-section information
     for i in range(1, points.shape[0] - 1):
         bend_origin, rotation, x_reflection = _get_bend_reference_parameters(
-            points[i - 1], points[i], points[i + 1], bend90, layer
+            points[i - 1], points[i], points[i + 1], bend90, layer, bend_ports
         )
         bend_ref = gen_sref(bend90, rotation, x_reflection, pname_west, bend_origin)
         references.append(bend_ref)
@@ -754,14 +1146,14 @@ def round_corners(
             matching_ports = [
                 port
                 for port in bend_ref.ports.values()
-                if np.isclose(port.x, points[i][0])
+                if _isclose(port.x, points[i][0])
             ]
 
         if abs(dy_points) < TOLERANCE:
             matching_ports = [
                 port
                 for port in bend_ref.ports.values()
-                if np.isclose(port.y, points[i][1])
+                if _isclose(port.y, points[i][1])
             ]
 
         if matching_ports:
@@ -826,14 +1218,13 @@ def round_corners(
 
     wg_refs = []
     for straight_origin, angle, length in straight_sections:
-        if isinstance(cross_section, list):
-            for section, angles in cross_section:
+        if multi_cross_section:
+            for section, angles in context.cross_section:
                 if angle in angles:
                     xsection = section
                     break
         else:
-            xsection = cross_section
-        x = gf.get_cross_section(xsection, **kwargs)
+            xsection = context.cross_section
 
         with_taper = False
         # wg_width = list(bend90.ports.values())[0].width
@@ -841,26 +1232,19 @@ def round_corners(
         total_length += length
 
         if (
-            isinstance(cross_section, list)
+            multi_cross_section
             or not auto_widen
             or length <= auto_widen_minimum_length
             or not width_wide
         ):
-            wg = gf.get_component(
-                straight_fall_back_no_taper,
-                length=length,
-                cross_section=xsection,
-                **kwargs,
-            )
+            wg = context.get_straight(length, cross_section=xsection)
         else:
             # Taper starts where straight would have started
             with_taper = True
             length = length - 2 * taper_length
             taper_origin = straight_origin
 
-            pname_west, pname_east = (
-                p.name for p in _get_straight_ports(taper, layer=layer)
-            )
+            pname_west, pname_east = (p.name for p in context.taper_ports)
             taper_ref = taper.ref(
                 position=taper_origin, port_id=pname_west, rotation=angle
             )
@@ -872,18 +1256,13 @@ def round_corners(
             straight_origin = taper_ref.ports[pname_east].center
 
             # Straight waveguide
-            kwargs_wide = kwargs.copy()
-            kwargs_wide.update(width=width_wide)
-
-            if callable(cross_section):
-                cross_section_wide = gf.partial(cross_section, **kwargs_wide)
-            else:
-                cross_section_wide = x.copy(width=width_wide)
-            wg = gf.get_component(
-                straight, length=length, cross_section=cross_section_wide
-            )
+            wg = context.get_straight(length, wide=True)
         if straight_ports is None:
-            straight_ports = [p.name for p in _get_straight_ports(wg, layer=layer)]
+            if context.straight_ports is None:
+                context.straight_ports = [
+                    p.name for p in _get_straight_ports(wg, layer=layer)
+                ]
+            straight_ports = context.straight_ports
 
         pname_west, pname_east = straight_ports
 
@@ -905,9 +1284,7 @@ def round_corners(
             # Origin at end of straight waveguide, starting from east side of taper
 
             taper_origin = wg_ref.ports[pname_east]
-            pname_west, pname_east = (
-                p.name for p in _get_straight_ports(taper, layer=layer)
-            )
+            pname_west, pname_east = (p.name for p in context.taper_ports)
 
             taper_ref = taper.ref(
                 position=taper_origin,
@@ -948,6 +1325,7 @@ def generate_manhattan_waypoints(
     min_straight_length: Optional[float] = None,
     bend: ComponentSpec = bend_euler,
     cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+    context: Optional[RoutingContext] = None,
     **kwargs,
 ) -> ndarray:
     """Return waypoints for a Manhattan route between two ports.
@@ -960,31 +1338,22 @@ def generate_manhattan_waypoints(
         min_straight_length: in um.
         bend: bend spec.
         cross_section: spec.
+        context: resolved bend and cross_section shared with other routes.
+            Overrides bend, cross_section and kwargs.
         kwargs: cross_section settings.
 
     """
     if "straight" in kwargs:
         _ = kwargs.pop("straight")
 
-    bend90 = (
-        bend
-        if isinstance(bend, Component)
-        else gf.get_component(bend, cross_section=cross_section, **kwargs)
-    )
-
-    if isinstance(cross_section, (tuple, list)):
-        x = [gf.get_cross_section(xsection[0], **kwargs) for xsection in cross_section]
-        start_straight_length = start_straight_length or min(_x.min_length for _x in x)
-        end_straight_length = end_straight_length or min(_x.min_length for _x in x)
-        min_straight_length = min_straight_length or min(_x.min_length for _x in x)
-    else:
-        x = gf.get_cross_section(cross_section, **kwargs)
-        start_straight_length = start_straight_length or x.min_length
-        end_straight_length = end_straight_length or x.min_length
-        min_straight_length = min_straight_length or x.min_length
+    t0 = time.perf_counter()
+    bend90, min_length = _get_waypoints_settings(bend, cross_section, context, **kwargs)
+    start_straight_length = start_straight_length or min_length
+    end_straight_length = end_straight_length or min_length
+    min_straight_length = min_straight_length or min_length
 
     bsx = bsy = _get_bend_size(bend90)
-    return _generate_route_manhattan_points(
+    points = _generate_route_manhattan_points(
         input_port,
         output_port,
         bsx,
@@ -993,6 +1362,105 @@ def generate_manhattan_waypoints(
         end_straight_length,
         min_straight_length,
     )
+    if context is not None:
+        context.waypoint_time += time.perf_counter() - t0
+    return points
+
+
+def generate_manhattan_waypoints_batch(
+    input_ports: List[Port],
+    output_ports: List[Port],
+    start_straight_length: Optional[Union[float, ndarray]] = None,
+    end_straight_length: Optional[Union[float, ndarray]] = None,
+    min_straight_length: Optional[float] = None,
+    bend: ComponentSpec = bend_euler,
+    cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+    context: Optional[RoutingContext] = None,
+    **kwargs,
+) -> List[ndarray]:
+    """Return waypoints for many Manhattan routes, like generate_manhattan_waypoints.
+
+    Resolves the bend and cross_section once and computes the waypoints of all
+    the routes together with NumPy.
+
+    Args:
+        input_ports: source ports.
+        output_ports: destination ports.
+        start_straight_length: Optional start length, for all or for each route.
+        end_straight_length: in um, for all or for each route.
+        min_straight_length: in um.
+        bend: bend spec.
+        cross_section: spec.
+        context: resolved bend and cross_section shared with other routes.
+            Overrides bend, cross_section and kwargs.
+        kwargs: cross_section settings.
+
+    """
+    if "straight" in kwargs:
+        _ = kwargs.pop("straight")
+    if len(input_ports) != len(output_ports):
+        raise ValueError(
+            f"input_ports={len(input_ports)} and output_ports={len(output_ports)} "
+            "must be equal"
+        )
+
+    t0 = time.perf_counter()
+    bend90, min_length = _get_waypoints_settings(bend, cross_section, context, **kwargs)
+    start_straight_length = _get_straight_lengths(start_straight_length, min_length)
+    end_straight_length = _get_straight_lengths(end_straight_length, min_length)
+    min_straight_length = min_straight_length or min_length
+
+    bsx = bsy = _get_bend_size(bend90)
+    routes = _generate_route_manhattan_points_batch(
+        input_ports,
+        output_ports,
+        bsx,
+        bsy,
+        start_straight_length,
+        end_straight_length,
+        min_straight_length,
+    )
+    if context is not None:
+        context.waypoint_time += time.perf_counter() - t0
+    return routes
+
+
+def _get_waypoints_settings(
+    bend: ComponentSpec,
+    cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec],
+    context: Optional[RoutingContext] = None,
+    **kwargs,
+) -> Tuple[Component, float]:
+    """Returns the bend and the minimum straight length for waypoints."""
+    if context is None:
+        bend90 = (
+            bend
+            if isinstance(bend, Component)
+            else gf.get_component(bend, cross_section=cross_section, **kwargs)
+        )
+        if isinstance(cross_section, (tuple, list)):
+            x = [
+                gf.get_cross_section(xsection[0], **kwargs)
+                for xsection in cross_section
+            ]
+        else:
+            x = gf.get_cross_section(cross_section, **kwargs)
+    else:
+        bend90 = context.bend90
+        x = context.x
+
+    min_length = min(_x.min_length for _x in x) if isinstance(x, list) else x.min_length
+    return bend90, min_length
+
+
+def _get_straight_lengths(
+    length: Optional[Union[float, ndarray]], min_length: float
+) -> Union[float, ndarray]:
+    """Returns length, with min_length where length is None or 0."""
+    if length is None or np.ndim(length) == 0:
+        return length or min_length
+    length = np.asarray(length, dtype=float)
+    return np.where(length != 0, length, min_length)
 
 
 def _get_bend_size(bend90: Component):
@@ -30,12 +30,17 @@ from gdsfactory.simulation.gmeep.write_sparameters_meep_mpi import (
     write_sparameters_meep_mpi_1x1,
     write_sparameters_meep_mpi_1x1_bend90,
 )
+from gdsfactory.simulation.gmeep.write_sparameters_meep_pool import (
+    get_simulation_cost,
+    write_sparameters_meep_pool,
+)
 
 logger.info(f"Meep {mp.__version__!r} installed at {mp.__path__!r}")
 
 __all__ = [
     "get_meep_adjoint_optimizer",
     "get_simulation",
+    "get_simulation_cost",
     "get_sparameters_data_meep",
     "run_meep_adjoint_optimizer",
     "write_sparameters_meep",
@@ -47,6 +52,7 @@ __all__ = [
     "write_sparameters_meep_batch",
     "write_sparameters_meep_batch_1x1",
     "write_sparameters_meep_batch_1x1_bend90",
+    "write_sparameters_meep_pool",
     "write_sparameters_grating",
     "write_sparameters_grating_mpi",
     "write_sparameters_grating_batch",
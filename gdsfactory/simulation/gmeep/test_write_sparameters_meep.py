@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+
 import numpy as np
 
 import gdsfactory as gf
@@ -113,6 +115,36 @@ def test_sparameters_straight_batch() -> None:
     ), f"filepath returned {filepaths[0]} differs from {filepath2}"
 
 
+def test_sparameters_straight_pool(tmp_path) -> None:
+    """Checks Sparameters for straight waveguides using a local process pool."""
+    components = []
+    p = 3
+    for length in [2, 4]:
+        c = gf.components.straight(length=length)
+        c = gf.add_padding_container(c, default=0, top=p, bottom=p)
+        components.append(c)
+
+    jobs = [{"component": c, **simulation_settings} for c in components]
+    report = tmp_path / "report.json"
+    filepaths = gm.write_sparameters_meep_pool(
+        jobs, workers=2, dirpath=tmp_path, ymargin=0, report=report
+    )
+    results = json.loads(report.read_text())
+    assert [r["skipped"] for r in results] == [False, False]
+    assert results[1]["cost"] > results[0]["cost"]
+
+    sp = dict(np.load(filepaths[0]))
+    assert np.allclose(np.abs(sp["o1@0,o2@0"]), 1, atol=1e-02), np.abs(sp["o1@0,o2@0"])
+    assert np.allclose(np.abs(sp["o1@0,o1@0"]), 0, atol=5e-02), np.abs(sp["o1@0,o1@0"])
+
+    # existing Sparameters are not simulated again
+    filepaths2 = gm.write_sparameters_meep_pool(
+        jobs, workers=2, dirpath=tmp_path, ymargin=0, report=report
+    )
+    assert filepaths2 == filepaths
+    assert [r["skipped"] for r in json.loads(report.read_text())] == [True, True]
+
+
 # def test_sparameters_grating_coupler() -> None:
 #     """Checks Sparameters for a grating coupler."""
 #     sp = gm.write_sparameters_grating()  # fiber_angle_deg = 20
@@ -13,6 +13,7 @@ from typing import Dict, List, Optional
 import numpy as np
 import pydantic
 from tqdm.auto import tqdm
+from typing_extensions import Literal
 
 import gdsfactory as gf
 from gdsfactory.component import Component
@@ -26,6 +27,9 @@ from gdsfactory.simulation.gmeep.write_sparameters_meep import remove_simulation
 from gdsfactory.simulation.gmeep.write_sparameters_meep_mpi import (
     write_sparameters_meep_mpi,
 )
+from gdsfactory.simulation.gmeep.write_sparameters_meep_pool import (
+    write_sparameters_meep_pool,
+)
 from gdsfactory.tech import LayerStack
 
 ncores = multiprocessing.cpu_count()
@@ -42,6 +46,7 @@ def write_sparameters_meep_batch(
     delete_temp_files: bool = True,
     dirpath: Optional[Path] = None,
     layer_stack: Optional[LayerStack] = None,
+    scheduler: Literal["mpi", "local"] = "mpi",
     **kwargs,
 ) -> List[Path]:
     """Write Sparameters for a batch of jobs using MPI and returns results filepaths.
@@ -50,6 +55,9 @@ def write_sparameters_meep_batch(
     different cores using MPI where each simulation runs with `cores_per_run` cores.
     If there are more simulations than cores each batch runs sequentially.
 
+    With scheduler="local" the jobs run in a process pool without MPI instead,
+    see write_sparameters_meep_pool.
+
 
     Args
         jobs: list of Dicts containing the simulation settings for each job.
@@ -61,6 +69,9 @@ def write_sparameters_meep_batch(
         dirpath: directory to store Sparameters.
         layer_stack: contains layer to thickness, zmin and material.
             Defaults to active pdk.layer_stack.
+        scheduler: "mpi" runs batches of MPI jobs. "local" runs
+            total_cores // cores_per_run jobs at a time in a process pool,
+            longest first, with cores_per_run threads each.
 
     keyword Args:
         resolution: in pixels/um (30: for coarse, 100: for fine).
@@ -104,6 +115,16 @@ def write_sparameters_meep_batch(
     """
     layer_stack = layer_stack or get_layer_stack()
 
+    if scheduler == "local":
+        return write_sparameters_meep_pool(
+            jobs=jobs,
+            workers=max(total_cores // cores_per_run, 1),
+            threads_per_job=cores_per_run,
+            dirpath=dirpath,
+            layer_stack=layer_stack,
+            **kwargs,
+        )
+
     # Parse jobs
     jobs_to_run = []
     for job in jobs:
@@ -0,0 +1,286 @@
+"""Compute and write Sparameters using Meep in a local process pool, without MPI."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from tqdm.auto import tqdm
+
+import gdsfactory as gf
+from gdsfactory.cell_cache import to_bytes
+from gdsfactory.component import Component
+from gdsfactory.config import logger
+from gdsfactory.pdk import get_layer_stack
+from gdsfactory.simulation.get_sparameters_path import (
+    get_sparameters_path_meep as get_sparameters_path,
+)
+from gdsfactory.simulation.gmeep.write_sparameters_meep import remove_simulation_kwargs
+from gdsfactory.tech import LayerStack
+from gdsfactory.types import ComponentSpec, PathType
+
+_job_keys_not_passed = (
+    "component",
+    "filepath",
+    "dirpath",
+    "overwrite",
+    "lazy_parallelism",
+    "cores",
+    "temp_dir",
+    "temp_file_str",
+    "wait_to_finish",
+    "live_output",
+    "layer_stack",
+)
+
+
+def get_simulation_cost(
+    component: ComponentSpec,
+    resolution: int = 30,
+    is_3d: bool = False,
+    xmargin: float = 0,
+    ymargin: float = 3,
+    xmargin_left: float = 0,
+    xmargin_right: float = 0,
+    ymargin_top: float = 0,
+    ymargin_bot: float = 0,
+    tpml: float = 1.5,
+    zmargin_top: float = 3.0,
+    zmargin_bot: float = 3.0,
+    layer_stack: Optional[LayerStack] = None,
+    port_source_names: Optional[List[str]] = None,
+    port_symmetries: Optional[Dict] = None,
+    **kwargs,
+) -> float:
+    """Returns the estimated cost of write_sparameters_meep for a component.
+
+    The cost is the number of grid points of the simulation domain (component
+    bbox, margins and PML) times the time steps per um of simulated time, which
+    grow with the resolution, times the number of source ports simulated.
+    Only useful to compare simulations with each other.
+
+    Args:
+        component: to simulate.
+        resolution: in pixels/um.
+        is_3d: if True the domain has a z size.
+        xmargin: left and right distance from component to PML.
+        ymargin: top and bottom distance from component to PML.
+        xmargin_left: west distance from component to PML.
+        xmargin_right: east distance from component to PML.
+        ymargin_top: north distance from component to PML.
+        ymargin_bot: south distance from component to PML.
+        tpml: PML thickness (um).
+        zmargin_top: thickness for cladding above core (um).
+        zmargin_bot: thickness for cladding below core (um).
+        layer_stack: for the 3D thickness. Defaults to active pdk.layer_stack.
+        port_source_names: ports to excite. Defaults to all.
+        port_symmetries: each symmetry saves one simulation.
+        kwargs: other simulation settings (ignored).
+    """
+    component = gf.get_component(component)
+    xmargin_left = xmargin_left or xmargin
+    xmargin_right = xmargin_right or xmargin
+    ymargin_top = ymargin_top or ymargin
+    ymargin_bot = ymargin_bot or ymargin
+
+    xsize = component.xsize + xmargin_left + xmargin_right + 2 * tpml
+    ysize = component.ysize + ymargin_top + ymargin_bot + 2 * tpml
+    points = xsize * ysize * resolution**2
+    if is_3d:
+        layer_stack = layer_stack or get_layer_stack()
+        thickness = max(layer_stack.get_layer_to_thickness().values(), default=0)
+        points *= (thickness + zmargin_top + zmargin_bot + 2 * tpml) * resolution
+
+    port_source_names = port_source_names or list(component.ports)
+    simulations = max(len(port_source_names) - len(port_symmetries or {}), 1)
+    return points * resolution * simulations
+
+
+def _run_job(
+    gds: bytes, metadata: bytes, filepath: pathlib.Path, settings: Dict[str, Any]
+) -> float:
+    """Runs write_sparameters_meep in a worker and returns its wall time in seconds."""
+    from gdsfactory.cell import CACHE
+    from gdsfactory.cell_cache import from_bytes
+    from gdsfactory.simulation.gmeep.write_sparameters_meep import (
+        write_sparameters_meep,
+    )
+
+    component = from_bytes(gds, metadata, cache=CACHE)
+    t0 = time.perf_counter()
+    write_sparameters_meep(
+        component=component, filepath=filepath, overwrite=True, **settings
+    )
+    return time.perf_counter() - t0
+
+
+def _run_pool(
+    to_run: List[Tuple[int, Component, Dict[str, Any]]],
+    filepaths: List[pathlib.Path],
+    results: List[Dict[str, Any]],
+    total_cost: float,
+    max_workers: int,
+    mp_context: multiprocessing.context.BaseContext,
+) -> None:
+    """Runs the jobs in a process pool and stores their wall time in results."""
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context
+    ) as executor, tqdm(total=total_cost, unit="cost", unit_scale=True) as bar:
+        futures = {
+            executor.submit(_run_job, *to_bytes(component), filepaths[i], settings): i
+            for i, component, settings in to_run
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            result = results[i]
+            result["wall_time"] = future.result()
+            bar.update(result["cost"])
+            logger.info(
+                f"Simulation {filepaths[i].name!r} took "
+                f"{result['wall_time']:.1f} s (cost {result['cost']:.3g})"
+            )
+
+
+def write_sparameters_meep_pool(
+    jobs: List[Dict],
+    workers: Optional[int] = None,
+    threads_per_job: int = 1,
+    dirpath: Optional[PathType] = None,
+    layer_stack: Optional[LayerStack] = None,
+    report: Optional[PathType] = None,
+    mp_context: Optional[multiprocessing.context.BaseContext] = None,
+    **kwargs,
+) -> List[pathlib.Path]:
+    """Write Sparameters for a batch of jobs in a process pool and returns filepaths.
+
+    Each job runs write_sparameters_meep in one worker process, without MPI.
+    Jobs whose Sparameters file exists are skipped unless overwrite is True.
+    The others are sorted by estimated cost (see get_simulation_cost) and
+    submitted longest first, so the pool stays busy until the end. The progress
+    bar counts cost, so its rate and remaining time follow the cost model.
+
+    Args:
+        jobs: list of Dicts with write_sparameters_meep settings for each job,
+            including the component.
+        workers: number of processes. Defaults to the number of CPUs.
+        threads_per_job: OMP_NUM_THREADS for each worker.
+        dirpath: directory to store Sparameters.
+        layer_stack: contains layer to thickness, zmin and material.
+            Defaults to active pdk.layer_stack.
+        report: optional JSON filepath to write filepath, estimated cost,
+            wall time and skipped flag of each job.
+        mp_context: multiprocessing context for the process pool.
+            Defaults to spawn, so each worker starts OpenMP with
+            OMP_NUM_THREADS=threads_per_job instead of inheriting the
+            runtime already started in the parent. The components and
+            layer stacks are sent to the workers, so they do not depend
+            on the PDK active in the worker.
+        kwargs: write_sparameters_meep settings for all jobs. Job settings
+            take precedence.
+
+    Returns:
+        filepath list for sparameters numpy saved files, in the order of jobs.
+
+    .. code::
+
+        import gdsfactory as gf
+        import gdsfactory.simulation.gmeep as gm
+
+        jobs = [dict(component=gf.components.straight(length=i)) for i in range(1, 9)]
+        filepaths = gm.write_sparameters_meep_pool(jobs, workers=8, ymargin=3)
+    """
+    layer_stack = layer_stack or get_layer_stack()
+    workers = workers or os.cpu_count() or 1
+
+    filepaths: List[pathlib.Path] = []
+    results: List[Dict[str, Any]] = []
+    to_run: List[Tuple[int, Component, Dict[str, Any]]] = []
+
+    for i, job in enumerate(jobs):
+        job = {**kwargs, **job}
+        component = gf.get_component(job["component"])
+        job_layer_stack = job.get("layer_stack") or layer_stack
+        settings = {k: v for k, v in job.items() if k not in _job_keys_not_passed}
+        filepath = job.get("filepath") or get_sparameters_path(
+            component=component,
+            dirpath=job.get("dirpath", dirpath),
+            layer_stack=job_layer_stack,
+            **remove_simulation_kwargs(settings),
+        )
+        filepath = pathlib.Path(filepath)
+        filepaths.append(filepath)
+        results.append(
+            dict(
+                filepath=str(filepath),
+                cost=get_simulation_cost(
+                    component, layer_stack=job_layer_stack, **settings
+                ),
+                wall_time=0.0,
+                skipped=False,
+            )
+        )
+
+        if filepath.exists() and not job.get("overwrite", False):
+            logger.info(f"Simulation {str(filepath)!r} found. Skipping it.")
+            results[i]["skipped"] = True
+            continue
+        if filepath.exists():
+            logger.info(f"Simulation {str(filepath)!r} found and overwrite is True.")
+            filepath.unlink()
+        to_run.append((i, component, {**settings, "layer_stack": job_layer_stack}))
+
+    # longest jobs first
+    to_run.sort(key=lambda job: -results[job[0]]["cost"])
+    total_cost = sum(results[i]["cost"] for i, _, _ in to_run)
+    logger.info(
+        f"Running {len(to_run)} of {len(jobs)} simulations "
+        f"with {workers} workers and {threads_per_job} threads per job"
+    )
+
+    t0 = time.perf_counter()
+    # workers read OMP_NUM_THREADS from the environment they start with
+    omp_num_threads = os.environ.get("OMP_NUM_THREADS")
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_job)
+    try:
+        if to_run:
+            _run_pool(
+                to_run,
+                filepaths=filepaths,
+                results=results,
+                total_cost=total_cost,
+                max_workers=min(workers, len(to_run)),
+                mp_context=mp_context or multiprocessing.get_context("spawn"),
+            )
+    finally:
+        if omp_num_threads is None:
+            os.environ.pop("OMP_NUM_THREADS")
+        else:
+            os.environ["OMP_NUM_THREADS"] = omp_num_threads
+
+    logger.info(
+        f"Ran {len(to_run)} simulations in {time.perf_counter() - t0:.1f} s, "
+        f"{sum(r['wall_time'] for r in results):.1f} s of simulation time"
+    )
+    if report:
+        report = pathlib.Path(report)
+        report.parent.mkdir(parents=True, exist_ok=True)
+        report.write_text(json.dumps(results, indent=2))
+    return filepaths
+
+
+if __name__ == "__main__":
+    jobs = [
+        {
+            "component": gf.components.straight(length=i),
+            "run": True,
+            "overwrite": True,
+            "ymargin": 3,
+        }
+        for i in range(1, 4)
+    ]
+    filepaths = write_sparameters_meep_pool(jobs=jobs, workers=3)
@@ -0,0 +1,427 @@
+"""Spatial index over the bounding boxes of the references and polygons of a Component.
+
+Bounding boxes are stored in a uniform grid of buckets, so routers can find the
+geometry close to a route or a region without flattening the component.
+`Component.get_spatial_index()` returns the index of a component, which is
+updated incrementally by `add_ref`, `add`, `add_polygon` and `remove`, and
+re-indexes references that moved the next time it is queried.
+
+Per layer bounding boxes of a reference are the polygon bounding boxes of its
+parent, taken from the index of the parent and transformed, so each cell of
+the hierarchy is only indexed once. References rotated by angles that are not
+a multiple of 90 degrees, and arrays of references, are flattened instead.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import gdstk
+import numpy as np
+
+from gdsfactory.component_reference import ComponentReference
+
+Layer = Tuple[int, int]
+Bbox = Tuple[float, float, float, float]
+Item = Union[ComponentReference, gdstk.Polygon, gdstk.FlexPath, gdstk.RobustPath]
+
+_geometry_types = (gdstk.Polygon, gdstk.FlexPath, gdstk.RobustPath)
+
+
+class _Entry:
+    """Indexed item with its bounding box and the buckets it is stored in."""
+
+    __slots__ = ("item", "key", "bbox", "cells", "order", "layer_bboxes")
+
+    def __init__(self, item: Item, key, bbox: Bbox, order: int) -> None:
+        self.item = item
+        self.key = key
+        self.bbox = bbox
+        self.cells: Optional[List[Tuple[int, int]]] = None
+        self.order = order
+        self.layer_bboxes: Optional[Dict[Layer, np.ndarray]] = None
+
+
+class SpatialIndex:
+    """Grid of buckets over the bounding boxes of the references and polygons \
+    of a Component.
+
+    Args:
+        component: to index.
+        cell_size: bucket size in um.
+        max_cells: items spanning more buckets are checked by every query instead.
+    """
+
+    def __init__(
+        self, component, cell_size: float = 100.0, max_cells: int = 1024
+    ) -> None:
+        self.component = component
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.version = 0
+        self._entries: Dict[int, _Entry] = {}
+        self._buckets: Dict[Tuple[int, int], Set[int]] = {}
+        self._large: Set[int] = set()
+        self._order = itertools.count()
+        self._geometry_count = (0, 0)
+        self._layer_bboxes: Optional[Tuple[int, Dict[Layer, np.ndarray]]] = None
+
+        for ref in component.references:
+            self.add(ref)
+        self._sync_geometry()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"SpatialIndex({self.component.name!r}, entries={len(self)}, "
+            f"buckets={len(self._buckets)}, cell_size={self.cell_size})"
+        )
+
+    def add(self, item: Item) -> None:
+        """Adds or re-indexes a reference, polygon or path. Ignores other items."""
+        if isinstance(item, ComponentReference):
+            key = _get_reference_key(item)
+            bbox = tuple(np.ravel(item.bbox).tolist())
+        elif isinstance(item, _geometry_types):
+            bounding_box = item.bounding_box()
+            if bounding_box is None:
+                return
+            key = None
+            bbox = (*bounding_box[0], *bounding_box[1])
+        else:
+            return
+
+        if id(item) in self._entries:
+            self.remove(item)
+        if key is None:
+            self._geometry_count = _count(self._geometry_count, item, 1)
+        entry = _Entry(item, key, bbox, next(self._order))
+        self._entries[id(item)] = entry
+        self._insert(id(item), entry)
+        self.version += 1
+
+    def remove(self, item: Item) -> None:
+        """Removes an item from the index, if indexed."""
+        entry = self._entries.pop(id(item), None)
+        if entry is None:
+            return
+        if entry.cells is None:
+            self._large.discard(id(item))
+        else:
+            for cell in entry.cells:
+                bucket = self._buckets[cell]
+                bucket.discard(id(item))
+                if not bucket:
+                    del self._buckets[cell]
+        if not isinstance(item, ComponentReference):
+            self._geometry_count = _count(self._geometry_count, item, -1)
+        self.version += 1
+
+    def update(self) -> None:
+        """Re-indexes the references that moved and the items added or removed \
+        without going through the Component."""
+        references = self.component.references
+        n_references = 0
+        for ref in references:
+            entry = self._entries.get(id(ref))
+            if entry is None or entry.key != _get_reference_key(ref):
+                self.add(ref)
+            n_references += 1
+
+        indexed = [
+            entry.item
+            for entry in self._entries.values()
+            if isinstance(entry.item, ComponentReference)
+        ]
+        if len(indexed) != n_references:
+            ids = {id(ref) for ref in references}
+            for ref in indexed:
+                if id(ref) not in ids:
+                    self.remove(ref)
+        self._sync_geometry()
+
+    def query(
+        self,
+        bbox,
+        layers: Optional[Iterable[Layer]] = None,
+        distance: float = 0.0,
+        references: bool = True,
+        polygons: bool = True,
+    ) -> List[Item]:
+        """Returns the items overlapping a bounding box, in the order they were indexed.
+
+        Items that only touch the bounding box do not overlap it.
+
+        Args:
+            bbox: ((xmin, ymin), (xmax, ymax)) or (xmin, ymin, xmax, ymax).
+            layers: only items with polygons on these layers overlapping the bbox.
+                None uses the bounding box of each item.
+            distance: in um, grows the bbox on each side.
+            references: include references.
+            polygons: include polygons and paths of the component.
+        """
+        self.update()
+        xmin, ymin, xmax, ymax = np.ravel(bbox).tolist()
+        xmin, ymin = xmin - distance, ymin - distance
+        xmax, ymax = xmax + distance, ymax + distance
+        layers = None if layers is None else [tuple(layer) for layer in layers]
+
+        i0, j0, i1, j1 = self._get_cells((xmin, ymin, xmax, ymax))
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._buckets):
+            candidates = set(self._entries)
+        else:
+            candidates = set(self._large)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    candidates.update(self._buckets.get((i, j), ()))
+
+        entries = []
+        for item_id in candidates:
+            entry = self._entries[item_id]
+            is_reference = isinstance(entry.item, ComponentReference)
+            if (is_reference and not references) or (not is_reference and not polygons):
+                continue
+            bxmin, bymin, bxmax, bymax = entry.bbox
+            if bxmin >= xmax or bxmax <= xmin or bymin >= ymax or bymax <= ymin:
+                continue
+            if layers is not None:
+                layer_bboxes = self._get_layer_bboxes(entry)
+                if not any(
+                    _overlaps(layer_bboxes[layer], xmin, ymin, xmax, ymax)
+                    for layer in layers
+                    if layer in layer_bboxes
+                ):
+                    continue
+            entries.append(entry)
+        return [entry.item for entry in sorted(entries, key=lambda e: e.order)]
+
+    def get_bboxes(
+        self,
+        layers: Optional[Iterable[Layer]] = None,
+        references: bool = True,
+        polygons: bool = True,
+    ) -> np.ndarray:
+        """Returns (N, 4) array of xmin, ymin, xmax, ymax.
+
+        Args:
+            layers: polygon bounding boxes on these layers.
+                None returns one bounding box for each item.
+            references: include references.
+            polygons: include polygons and paths of the component.
+        """
+        self.update()
+        entries = [
+            entry
+            for entry in sorted(self._entries.values(), key=lambda e: e.order)
+            if (references if isinstance(entry.item, ComponentReference) else polygons)
+        ]
+        if layers is None:
+            bboxes = [entry.bbox for entry in entries]
+        else:
+            layers = [tuple(layer) for layer in layers]
+            bboxes = []
+            for entry in entries:
+                layer_bboxes = self._get_layer_bboxes(entry)
+                bboxes += [
+                    layer_bboxes[layer] for layer in layers if layer in layer_bboxes
+                ]
+            if bboxes:
+                return np.concatenate(bboxes)
+        return np.array(bboxes, dtype=float).reshape(-1, 4)
+
+    def get_layer_bboxes(self) -> Dict[Layer, np.ndarray]:
+        """Returns the polygon bounding boxes of the component for each layer."""
+        self.update()
+        if self._layer_bboxes is not None and self._layer_bboxes[0] == self.version:
+            return self._layer_bboxes[1]
+
+        bboxes: Dict[Layer, List[np.ndarray]] = {}
+        for entry in self._entries.values():
+            for layer, layer_bboxes in self._get_layer_bboxes(entry).items():
+                bboxes.setdefault(layer, []).append(layer_bboxes)
+        layer_bboxes = {layer: np.concatenate(b) for layer, b in bboxes.items()}
+        self._layer_bboxes = (self.version, layer_bboxes)
+        return layer_bboxes
+
+    def get_collisions(
+        self,
+        items: Iterable[Item],
+        layers: Optional[Iterable[Layer]] = None,
+        distance: float = 0.0,
+    ) -> List[Tuple[Item, Item]]:
+        """Returns (item, indexed item) pairs where items overlap the component.
+
+        Useful to check a route, `get_collisions(route.references)`, before
+        adding it to the component. Items that are already indexed are skipped.
+
+        Args:
+            items: references, polygons or paths.
+            layers: only check polygons on these layers.
+                None compares the bounding box of each item.
+            distance: minimum clearance in um.
+        """
+        items = list(items)
+        own = {id(item) for item in items}
+        collisions = []
+        for item in items:
+            if id(item) in self._entries:
+                continue
+            if isinstance(item, ComponentReference):
+                bbox = item.bbox
+            else:
+                bbox = item.bounding_box()
+                if bbox is None:
+                    continue
+            for other in self.query(bbox, layers=layers, distance=distance):
+                if id(other) not in own:
+                    collisions.append((item, other))
+        return collisions
+
+    def _get_cells(self, bbox: Bbox) -> Tuple[int, int, int, int]:
+        xmin, ymin, xmax, ymax = bbox
+        size = self.cell_size
+        return (
+            int(np.floor(xmin / size)),
+            int(np.floor(ymin / size)),
+            int(np.floor(xmax / size)),
+            int(np.floor(ymax / size)),
+        )
+
+    def _insert(self, item_id: int, entry: _Entry) -> None:
+        i0, j0, i1, j1 = self._get_cells(entry.bbox)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self.max_cells:
+            self._large.add(item_id)
+            return
+        entry.cells = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        for cell in entry.cells:
+            self._buckets.setdefault(cell, set()).add(item_id)
+
+    def _sync_geometry(self) -> None:
+        """Re-indexes polygons and paths if some were added or removed directly in the cell."""
+        cell = self.component._cell
+        count = (len(cell.polygons), len(cell.paths))
+        if count == self._geometry_count:
+            return
+        for entry in list(self._entries.values()):
+            if not isinstance(entry.item, ComponentReference):
+                self.remove(entry.item)
+        for item in itertools.chain(cell.polygons, cell.paths):
+            self.add(item)
+        self._geometry_count = count
+
+    def _get_layer_bboxes(self, entry: _Entry) -> Dict[Layer, np.ndarray]:
+        if entry.layer_bboxes is None:
+            item = entry.item
+            if isinstance(item, ComponentReference):
+                entry.layer_bboxes = _get_reference_layer_bboxes(item)
+            elif isinstance(item, gdstk.Polygon):
+                entry.layer_bboxes = {
+                    (item.layer, item.datatype): np.array([entry.bbox], dtype=float)
+                }
+            else:
+                entry.layer_bboxes = _get_polygons_bboxes(item.to_polygons())
+        return entry.layer_bboxes
+
+
+def _count(count: Tuple[int, int], item: Item, step: int) -> Tuple[int, int]:
+    polygons, paths = count
+    if isinstance(item, gdstk.Polygon):
+        return polygons + step, paths
+    return polygons, paths + step
+
+
+def _get_reference_key(ref: ComponentReference) -> Tuple:
+    """Returns a key that changes when the reference bounding box may change."""
+    reference = ref._reference
+    parent = ref.parent
+    key = (
+        reference.origin,
+        reference.rotation,
+        reference.x_reflection,
+        reference.magnification,
+        ref.rows,
+        ref.columns,
+        ref.spacing,
+        id(parent),
+    )
+    if not parent._locked:
+        cell = parent._cell
+        key += (len(parent.references), len(cell.polygons), len(cell.paths))
+    return key
+
+
+def _get_polygons_bboxes(polygons: Iterable[gdstk.Polygon]) -> Dict[Layer, np.ndarray]:
+    bboxes: Dict[Layer, List[Bbox]] = {}
+    for polygon in polygons:
+        (xmin, ymin), (xmax, ymax) = polygon.bounding_box()
+        bboxes.setdefault((polygon.layer, polygon.datatype), []).append(
+            (xmin, ymin, xmax, ymax)
+        )
+    return {layer: np.array(b, dtype=float) for layer, b in bboxes.items()}
+
+
+def _get_reference_layer_bboxes(ref: ComponentReference) -> Dict[Layer, np.ndarray]:
+    """Returns the polygon bounding boxes of a reference for each layer."""
+    rotation = ref.rotation or 0
+    if ref.rows > 1 or ref.columns > 1 or rotation % 90:
+        polygons = ref.get_polygons(as_array=False)
+        return _get_polygons_bboxes(polygons)
+
+    parent_bboxes = ref.parent.get_spatial_index().get_layer_bboxes()
+    return {
+        layer: transform_bboxes(
+            bboxes,
+            origin=ref.origin,
+            rotation=rotation,
+            x_reflection=ref.x_reflection,
+            magnification=ref.magnification,
+        )
+        for layer, bboxes in parent_bboxes.items()
+    }
+
+
+def transform_bboxes(
+    bboxes: np.ndarray,
+    origin=(0, 0),
+    rotation: float = 0,
+    x_reflection: bool = False,
+    magnification: float = 1,
+) -> np.ndarray:
+    """Returns (N, 4) bounding boxes transformed like a GDS reference.
+
+    Args:
+        bboxes: (N, 4) array of xmin, ymin, xmax, ymax.
+        origin: translation.
+        rotation: in degrees, multiple of 90.
+        x_reflection: mirror along the x axis before rotating.
+        magnification: scale factor.
+    """
+    bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+    x = bboxes[:, [0, 2]] * magnification
+    y = bboxes[:, [1, 3]] * magnification
+    if x_reflection:
+        y = -y
+    quarter_turns = int(round(rotation / 90)) % 4
+    if quarter_turns == 1:
+        x, y = -y, x
+    elif quarter_turns == 2:
+        x, y = -x, -y
+    elif quarter_turns == 3:
+        x, y = y, -x
+    x = x + origin[0]
+    y = y + origin[1]
+    return np.column_stack([x.min(axis=1), y.min(axis=1), x.max(axis=1), y.max(axis=1)])
+
+
+def _overlaps(bboxes: np.ndarray, xmin, ymin, xmax, ymax) -> bool:
+    return bool(
+        np.any(
+            (bboxes[:, 0] < xmax)
+            & (bboxes[:, 2] > xmin)
+            & (bboxes[:, 1] < ymax)
+            & (bboxes[:, 3] > ymin)
+        )
+    )
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import gdsfactory as gf
+
+
+def test_build_parallel() -> None:
+    gf.clear_cache()
+    specs = [gf.partial(gf.components.straight, length=length) for length in (1, 2)]
+    specs += ["mmi1x2", dict(component="mzi", settings=dict(delta_length=5))]
+    components = gf.build_parallel(specs, workers=2)
+
+    for component, spec in zip(components, specs):
+        assert gf.get_component(spec) is component
+        assert component.settings.function_name
+        assert component.ports
+
+    mzi = components[-1]
+    assert mzi.settings.changed["delta_length"] == 5
+    assert len(mzi.references) > 0
+
+
+if __name__ == "__main__":
+    test_build_parallel()
@@ -21,6 +21,21 @@ def test_validator_error() -> None:
         _dummy2(length="error")
 
 
+@gf.cell_without_validator
+def _dummy3(length: float = 3) -> gf.Component:
+    return gf.Component()
+
+
+def test_fast_path_names() -> None:
+    """Equal arguments of different type have different names on cache hits."""
+    for _ in range(2):
+        assert _dummy3(length=4).name == "_dummy3_length4"
+        assert _dummy3(length=4.0).name == "_dummy3_length4p0"
+        assert _dummy3(length=True).name == "_dummy3_lengthTrue"
+        assert _dummy3(4).name == "_dummy3_length4"
+        assert _dummy3(length=3).name == "_dummy3"
+
+
 if __name__ == "__main__":
     # test_raise_error_args()
     test_validator_error()
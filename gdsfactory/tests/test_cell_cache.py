@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import gdsfactory as gf
+from gdsfactory import cell_cache
+
+
+def test_disk_cache(tmpdir) -> None:
+    """Components built in a previous process load from disk with settings and ports."""
+    disk_cache = cell_cache.enable_disk_cache(dirpath=tmpdir)
+    try:
+        c1 = gf.components.mzi(delta_length=13)
+        assert len(disk_cache) > 0
+
+        gf.clear_cache()
+        c2 = gf.components.mzi(delta_length=13)
+    finally:
+        cell_cache.disable_disk_cache()
+        gf.clear_cache()
+
+    assert c1 is not c2
+    assert c2.name == c1.name
+    assert c2.settings.changed == c1.settings.changed
+    assert abs(c2.area() - c1.area()) < 1e-2
+    assert (c2.bbox == c1.bbox).all()
+    assert sorted(c2.named_references) == sorted(c1.named_references)
+    for name, port in c1.ports.items():
+        assert port.orientation == c2.ports[name].orientation
+        assert tuple(port.center) == tuple(c2.ports[name].center)
+
+    assert c2.get_netlist()["connections"] == c1.get_netlist()["connections"]
+
+
+def test_disk_cache_subcell_source_changed(tmpdir) -> None:
+    """Entries are invalidated when the source of a subcell function changes."""
+    import orjson
+
+    disk_cache = cell_cache.DiskCache(dirpath=tmpdir)
+    c = gf.components.mzi(delta_length=17)
+    disk_cache.save("mzi_a_0", c)
+    jsonpath = disk_cache.get_jsonpath("mzi_a_0")
+    metadata = orjson.loads(jsonpath.read_bytes())
+    assert "gdsfactory.components.straight.straight" in metadata["sources"]
+    assert disk_cache.load("mzi_a_0") is not None
+
+    metadata["sources"]["gdsfactory.components.straight.straight"] = "changed"
+    jsonpath.write_bytes(orjson.dumps(metadata))
+    assert disk_cache.load("mzi_a_0") is None
+    assert "mzi_a_0" not in disk_cache
+
+
+def test_disk_cache_evict(tmpdir) -> None:
+    disk_cache = cell_cache.DiskCache(dirpath=tmpdir, max_size=0)
+    c = gf.components.straight(length=11)
+    disk_cache.save("straight_0_0", c)
+    assert len(disk_cache) == 0
+
+
+def test_disk_cache_remove_stale(tmpdir) -> None:
+    """Entries built with an older function source are removed."""
+    disk_cache = cell_cache.DiskCache(dirpath=tmpdir)
+    c = gf.components.straight(length=11)
+    disk_cache.save("module.straight_a_0", c)
+    disk_cache.save("module.straight_a_1", c)
+    assert len(disk_cache) == 2
+
+    disk_cache.save("module.straight_b_0", c)
+    assert "module.straight_b_0" in disk_cache
+    assert len(disk_cache) == 1
+
+
+def test_cache_limits() -> None:
+    cache = cell_cache.ComponentCache(max_entries=2)
+    components = [gf.components.straight(length=length) for length in (1, 2, 3)]
+    for component in components:
+        cache[component.name] = component
+
+    assert len(cache._components) == 2
+    assert cache.evictions == 1
+
+    # evicted components that are still alive are returned instead of rebuilt
+    assert cache[components[0].name] is components[0]
+
+
+def test_cache_evicted_components_are_released() -> None:
+    cache = cell_cache.ComponentCache(max_entries=1)
+    cache["a"] = gf.Component("a")
+    cache["b"] = gf.Component("b")
+    assert "a" not in cache
+    assert "b" in cache
+
+
+def test_cache_stats() -> None:
+    from gdsfactory.cell import CACHE
+
+    gf.clear_cache()
+    CACHE.reset_stats()
+    gf.components.straight(length=7)
+    gf.components.straight(length=7)
+
+    stats = CACHE.functions["straight"]
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.build_time > 0
+    assert cell_cache.get_cache_stats()["functions"]["straight"]["hits"] == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_disk_cache(tempfile.mkdtemp())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+
+import gdsfactory as gf
+
+
+def test_ports_cached() -> None:
+    """Ports are only transformed again after the reference moves."""
+    c = gf.Component("test_ports_cached")
+    ref = c << gf.components.mmi1x2()
+    ports = ref.ports
+    port = ports["o2"]
+    assert ref.ports is ports
+    assert ref.ports["o2"] is port
+
+    center = port.center.copy()
+    ref.movex(10)
+    assert np.allclose(ref.ports["o2"].center, center + (10, 0))
+
+    ref.rotate(90)
+    ref.mirror()
+    for name, port in ref.ports.items():
+        p = ref.parent.ports[name]
+        new_center, new_orientation = ref._transform_port(
+            p.center, p.orientation, ref.origin, ref.rotation, ref.x_reflection
+        )
+        assert np.array_equal(port.center, new_center)
+        assert port.orientation == new_orientation
+        assert port.parent is ref
+
+
+def test_ports_unlocked_parent() -> None:
+    """Ports added to or removed from an unlocked parent show up in the reference."""
+    child = gf.Component("test_ports_unlocked_parent_child")
+    child.add_port("o1", center=(0, 0), width=0.5, orientation=180, layer=(1, 0))
+    c = gf.Component("test_ports_unlocked_parent")
+    ref = c << child
+    ref.movey(5)
+    assert list(ref.ports) == ["o1"]
+
+    child.add_port("o2", center=(1, 0), width=0.5, orientation=None, layer=(1, 0))
+    assert list(ref.ports) == ["o1", "o2"]
+    assert np.allclose(ref.ports["o2"].center, (1, 5))
+    assert ref.ports["o2"].orientation is None
+
+    child.ports["o1"].center = np.array([2.0, 0.0])
+    assert np.allclose(ref.ports["o1"].center, (2, 5))
+
+    child.ports.pop("o1")
+    assert list(ref.ports) == ["o2"]
+
+
+def test_ports_cached_port_moved() -> None:
+    """Moving a cached port does not persist in the reference ports."""
+    c = gf.Component("test_ports_cached_port_moved")
+    ref = c << gf.components.mmi1x2()
+    ref.movex(10)
+    center = ref.ports["o1"].center.copy()
+
+    ref.ports["o1"].move((5, 5))
+    assert np.allclose(ref.ports["o1"].center, center)
+
+    ref.ports["o1"].center[0] += 5
+    assert np.allclose(ref.ports["o1"].center, center)
+
+    ref.ports["o1"].orientation = 0
+    assert ref.ports["o1"].orientation == 180
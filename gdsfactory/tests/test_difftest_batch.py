@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.difftest import GeometryDifference, _layouts, difftest_batch
+
+
+def test_difftest_batch(tmp_path) -> None:
+    components = {
+        "mzi": gf.components.mzi(),
+        "straight": gf.components.straight(),
+    }
+    with pytest.raises(AssertionError):
+        difftest_batch(components, dirpath=tmp_path, workers=1)
+    report = difftest_batch(components, dirpath=tmp_path, workers=1)
+    assert {r["status"] for r in report["components"].values()} == {"same"}
+
+    def top(width: float) -> gf.Component:
+        child = gf.Component("child")
+        child.add_polygon([(0, 0), (10, 0), (10, width), (0, width)], layer=(1, 0))
+        c = gf.Component("top")
+        c.add_ref(child)
+        c.add_ref(gf.components.straight()).movey(5)
+        return c
+
+    top(width=1).write_gds(tmp_path / "gds_ref" / "top.gds")
+    with pytest.raises(GeometryDifference):
+        difftest_batch({"top": top(width=2)}, dirpath=tmp_path, workers=2)
+    assert not _layouts
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    result = report["components"]["top"]
+    assert result["status"] == "changed"
+    assert result["changed_cells"] == ["child"]
+    assert list(result["differences"]) == ["child"]
+    assert list(result["differences"]["child"]["layers"]) == ["1/0"]
+    assert result["differences"]["child"]["time"] > 0
+
+
+if __name__ == "__main__":
+    import pathlib
+
+    test_difftest_batch(pathlib.Path("/tmp"))
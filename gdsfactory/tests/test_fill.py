@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.fill import (
+    _expand_raster,
+    _rasterize_polygons,
+    fill_rectangle,
+    get_density_map,
+)
+
+
+def _get_fill_origins(component: gf.Component) -> set:
+    origins = []
+    for reference in component._cell.references:
+        repetition = reference.repetition
+        offsets = repetition.get_offsets() if repetition.size else np.zeros((1, 2))
+        origins.append(np.round(np.array(reference.origin) + offsets, 3))
+    return set(map(tuple, np.concatenate(origins).tolist()))
+
+
+def test_rasterize_polygons() -> None:
+    raster = _rasterize_polygons(
+        [[(1.2, 1.2), (3.8, 1.2), (3.8, 2.8), (1.2, 2.8)]],
+        bounds=((0, 0), (6, 5)),
+        dx=1,
+        dy=1,
+    )
+    assert raster.shape == (5, 6)
+    assert raster[1:3, 1:4].all()
+    assert raster.sum() == 6
+
+    window = _rasterize_polygons(
+        [[(1.2, 1.2), (3.8, 1.2), (3.8, 2.8), (1.2, 2.8)]],
+        bounds=((0, 0), (6, 5)),
+        dx=1,
+        dy=1,
+        window=(1, 3, 2, 6),
+    )
+    assert (window == raster[1:3, 2:6]).all()
+
+
+def test_expand_raster() -> None:
+    raster = np.zeros((7, 7), dtype=bool)
+    raster[3, 3] = True
+    expanded = _expand_raster(raster, distance=(1, 1))
+    assert expanded.sum() == 9
+    assert expanded[2:5, 2:5].all()
+
+
+def test_fill_tiled() -> None:
+    """Tiles give the same fill as one raster, added as array references."""
+    c = gf.components.mzi()
+    kwargs = dict(
+        fill_size=(0.5, 0.5),
+        fill_layers=((2, 0),),
+        fill_densities=(0.8,),
+        margin=5,
+        avoid_layers=((1, 0),),
+    )
+    fill = fill_rectangle(c, **kwargs)
+    fill_tiled = fill_rectangle(c, tile_size=(20, 30), **kwargs)
+
+    origins = _get_fill_origins(fill)
+    assert origins == _get_fill_origins(fill_tiled)
+    assert len(fill.references) < len(origins)
+    assert any(ref.rows > 1 for ref in fill.references)
+
+    tiles = fill_tiled.info["tiles"]
+    assert len(tiles) > 1
+    assert sum(tile["fill_cells"] for tile in tiles) == len(origins)
+    assert all(0 <= tile["density"][0] <= 0.8 for tile in tiles)
+
+
+def test_get_density_map() -> None:
+    c = gf.components.rectangle(size=(10, 5), layer=(1, 0))
+    density, x, y = get_density_map(
+        c, layer=(1, 0), window_size=(5, 5), bbox=((0, 0), (10, 10))
+    )
+    assert density.shape == (2, 2)
+    assert np.allclose(density, [[1, 1], [0, 0]])
+    assert np.allclose(x, [2.5, 7.5])
+    assert np.allclose(y, [2.5, 7.5])
+
+    density, x, y = get_density_map(
+        c, layer=(1, 0), window_size=(5, 5), step=(2.5, 2.5), bbox=((0, 0), (10, 10))
+    )
+    assert density.shape == (3, 3)
+    assert np.allclose(density[:, 0], [1, 0.5, 0])
+
+
+def test_fill_target_density() -> None:
+    """Windows away from the edges reach the target density and not more."""
+    c0 = gf.components.spiral_inner_io()
+    kwargs = dict(
+        fill_layers=((1, 0),),
+        fill_size=(1, 1),
+        fill_densities=(0.5,),
+        margin=2,
+        avoid_layers=((1, 0),),
+        density_window=(50, 50),
+    )
+    fill = fill_rectangle(c0, **kwargs)
+    fill_target = fill_rectangle(c0, target_density=0.3, **kwargs)
+
+    c = gf.Component("fill_target_density")
+    c << c0
+    c << fill_target
+    c_full = gf.Component("fill_full_density")
+    c_full << c0
+    c_full << fill
+    density0, _, _ = get_density_map(c0, (1, 0), window_size=(50, 50))
+    density, _, _ = get_density_map(c, (1, 0), window_size=(50, 50))
+    density_full, _, _ = get_density_map(c_full, (1, 0), window_size=(50, 50))
+
+    # windows reach the target unless they run out of space for fill
+    expected = np.maximum(density0, np.minimum(0.3, density_full))
+    assert np.allclose(density[1:-1, 1:-1], expected[1:-1, 1:-1], atol=0.01)
+    assert len(_get_fill_origins(fill_target)) < len(_get_fill_origins(fill))
@@ -51,6 +51,36 @@ def test_boolean_and_klayout() -> None:
     assert int(c3.area()) == 113
 
 
+def test_boolean_hierarchical() -> None:
+    """Hierarchical and tiled booleans match the flat boolean."""
+    import gdstk
+
+    inner = gf.Component("boolean_inner")
+    inner << gf.components.circle(radius=3, layer=(1, 0))
+    inner.add_ref(gf.components.rectangle(size=(4, 1), layer=(1, 0))).rotate(30)
+    A = gf.Component("boolean_A")
+    array = A.add_ref(inner, columns=5, rows=4, spacing=(9, 8))
+    array.rotate(15)
+    mirrored = A << inner
+    mirrored.mirror()
+    mirrored.move((60, 0))
+
+    B = gf.Component("boolean_B")
+    B.add_ref(gf.components.rectangle(size=(15, 50), layer=(1, 0))).move((10, -10))
+    B.add_ref(gf.components.circle(radius=6, layer=(1, 0))).move((55, 2))
+
+    for operation in ("not", "and", "or", "xor", "B-A"):
+        flat = gf.geometry.boolean(A, B, operation=operation, hierarchical=False)
+        for num_divisions in ((1, 1), (3, 2)):
+            c = gf.geometry.boolean(
+                A, B, operation=operation, num_divisions=num_divisions
+            )
+            xor = gdstk.boolean(
+                flat.get_polygons(), c.get_polygons(), "xor", precision=1e-4
+            )
+            assert sum(p.area() for p in xor) < 0.05, (operation, num_divisions)
+
+
 def test_trim() -> None:
     c = gf.components.straight_pin(length=10, taper=None)
     rectangle = [[0, -5], [0, 5], [5, 5], [5, -5]]
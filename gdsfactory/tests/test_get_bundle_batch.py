@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from gdsfactory.port import Port
+from gdsfactory.routing.get_bundle import get_bundle_spacing_errors
+from gdsfactory.routing.manhattan import (
+    generate_manhattan_waypoints,
+    generate_manhattan_waypoints_batch,
+)
+
+
+def _ports(orientation1: int, orientation2: int, n: int = 6):
+    ports1 = [
+        Port(f"a{i}", orientation1, (i * 5.0, i * 3.0), 0.5, (1, 0)) for i in range(n)
+    ]
+    ports2 = [
+        Port(f"b{i}", orientation2, (i * 7.0 - 50, 100 - i * 11.0), 0.5, (1, 0))
+        for i in range(n)
+    ]
+    return ports1, ports2
+
+
+@pytest.mark.parametrize("orientation1", [0, 90, 180, 270])
+@pytest.mark.parametrize("orientation2", [0, 90, 180, 270])
+def test_generate_manhattan_waypoints_batch(orientation1, orientation2) -> None:
+    ports1, ports2 = _ports(orientation1, orientation2)
+    end_straight_length = np.arange(len(ports1)) * 2.0
+    routes = generate_manhattan_waypoints_batch(
+        ports1, ports2, end_straight_length=end_straight_length
+    )
+    for p1, p2, length, route in zip(ports1, ports2, end_straight_length, routes):
+        expected = generate_manhattan_waypoints(p1, p2, end_straight_length=length)
+        assert np.array_equal(route, expected)
+
+
+def test_get_bundle_spacing_errors() -> None:
+    route = np.array([(0, 0), (0, 10), (20, 10), (20, 30)], dtype=float)
+    # route 3 is 1 um above route 2 but does not overlap it along x
+    routes = [route, route + (5, 3), route + (10, 6), route + (40, 7)]
+    assert get_bundle_spacing_errors(routes, separation=3).tolist() == []
+    assert get_bundle_spacing_errors(routes, separation=5).tolist() == [0, 1]
+    assert get_bundle_spacing_errors(routes[:1], separation=5).tolist() == []
@@ -4,7 +4,7 @@ import pytest
 
 import gdsfactory as gf
 from gdsfactory.decorators import flatten_invalid_refs
-from gdsfactory.get_netlist import get_netlist_recursive
+from gdsfactory.get_netlist import get_netlist, get_netlist_recursive
 
 
 def test_get_netlist_cell_array() -> gf.Component:
@@ -339,6 +339,37 @@ def test_get_netlist_transformed():
     assert i2_netlist["placements"][None]["rotation"] == rotation_value
 
 
+def test_get_netlist_recursive_extracts_each_cell_once():
+    c = gf.Component("test_get_netlist_recursive_extracts_each_cell_once")
+    mzi = gf.components.mzi()
+    for i in range(3):
+        ref = c.add_ref(mzi, f"mzi{i}")
+        ref.movey(i * 100)
+
+    extracted = []
+
+    def get_netlist_func(component, **kwargs):
+        extracted.append(component.name)
+        return get_netlist(component, **kwargs)
+
+    netlists = get_netlist_recursive(c, get_netlist_func=get_netlist_func)
+    assert sorted(extracted) == sorted(set(extracted))
+    assert set(netlists) == set(extracted)
+    top_netlist = netlists[c.name]
+    assert {top_netlist["instances"][f"mzi{i}"]["component"] for i in range(3)} == {
+        mzi.name
+    }
+
+
+def test_get_netlist_tolerance_zero():
+    c = gf.Component("test_get_netlist_tolerance_zero")
+    i1 = c.add_ref(gf.components.straight(), "i1")
+    i2 = c.add_ref(gf.components.straight(), "i2")
+    i2.connect("o1", i1.ports["o2"])
+    netlist = c.get_netlist(tolerance=0)
+    assert netlist["connections"] == {"i1,o2": "i2,o1"}
+
+
 if __name__ == "__main__":
     # c = gf.c.array()
     # n = c.get_netlist()
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import warnings
+
+import gdstk
+import numpy as np
+
 import gdsfactory as gf
 from gdsfactory.cell import cell
 from gdsfactory.component import Component
@@ -31,11 +36,75 @@ def test_astar_pass() -> Component:
         radius=5,
     )
     c.add(route.references)
-    route_length = 179.908
+    route_length = 183.272
     assert route.length == route_length, print(f"route_length = {route.length}")
     return c
 
 
+def test_astar_shared_grid() -> None:
+    c = gf.Component("get_route_astar_shared_grid")
+    w = gf.components.straight()
+    lefts = [c << w for _ in range(2)]
+    rights = [c << w for _ in range(2)]
+    for i, (left, right) in enumerate(zip(lefts, rights)):
+        left.movey(20 * i)
+        right.move((100, 20 * i))
+
+    grid = gf.routing.get_routing_grid(c, resolution=5, distance=2)
+    blocked = grid.occupancy.sum()
+    routes = [
+        gf.routing.get_route_astar(
+            c, left.ports["o2"], right.ports["o1"], grid=grid, radius=5
+        )
+        for left, right in zip(lefts, rights)
+    ]
+    assert grid.occupancy.sum() > blocked
+    assert [route.length for route in routes] == [90, 90]
+
+
+def test_astar_grid_cache() -> None:
+    from gdsfactory.routing.get_route_astar import get_routing_grid
+
+    c = gf.Component("get_route_astar_grid_cache")
+    c << gf.components.rectangle(size=(10, 10))
+    grid1 = get_routing_grid(c, resolution=1, copy=False)
+    grid2 = get_routing_grid(c, resolution=1, copy=False)
+    assert grid1 is grid2
+
+    ref = c << gf.components.rectangle(size=(10, 10))
+    ref.movex(20)
+    grid3 = get_routing_grid(c, resolution=1, copy=False)
+    assert grid3 is not grid1
+    assert grid3.occupancy.sum() > grid1.occupancy.sum()
+
+
+def test_astar_off_lattice() -> None:
+    c = gf.Component("get_route_astar_off_lattice")
+    w = gf.components.straight()
+    left = c << w
+    right = c << w
+    right.move((100, 82.4))
+    obstacle = c << gf.components.rectangle(size=(100, 10))
+    obstacle.ymin = 40
+    obstacle.xmin = 25
+
+    port1 = left.ports["o2"]
+    port2 = right.ports["o2"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        route = gf.routing.get_route_astar(
+            c, port1, port2, resolution=5, distance=5.5, radius=5
+        )
+
+    polygons = [p for ref in route.references for p in ref.get_polygons()]
+    assert not gdstk.boolean(polygons, gdstk.rectangle(*obstacle.bbox), "and")
+    waypoints = np.vstack(
+        [ref.ports[name].center for ref in route.references for name in ref.ports]
+    )
+    for port in (port1, port2):
+        assert np.isclose(waypoints, port.center).all(axis=1).any()
+
+
 # @cell
 # def test_astar_fail() -> Component:
 #     c = gf.Component()
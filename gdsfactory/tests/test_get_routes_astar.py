@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.routing.get_routes_astar import get_routes_astar
+
+
+def _pads_through_channel(npads: int = 4, gap: float = 120):
+    c = gf.Component()
+    pad = gf.components.pad(size=(20, 20))
+    port_pairs = []
+    for i in range(npads):
+        left = c << pad
+        right = c << pad
+        left.movey(60 * i)
+        right.move((400, 60 * i))
+        port_pairs.append((left.ports["e3"], right.ports["e1"]))
+
+    # two obstacles leave a channel of height gap in the middle
+    ycenter = 30 * (npads - 1) + 10
+    obstacle = gf.components.rectangle(size=(50, 400), layer="M3")
+    bottom = c << obstacle
+    top = c << obstacle
+    bottom.move((175, ycenter - gap / 2 - 400))
+    top.move((175, ycenter + gap / 2))
+    return c, port_pairs
+
+
+def test_get_routes_astar() -> None:
+    c, port_pairs = _pads_through_channel()
+    routes, stats = get_routes_astar(c, port_pairs, resolution=5, distance=10)
+
+    assert stats["converged"]
+    assert len(routes) == len(port_pairs)
+    assert all(net["routed"] for net in stats["nets"])
+
+    bboxes = [np.array([ref.bbox for ref in route.references]) for route in routes]
+    for i, bboxes1 in enumerate(bboxes):
+        for bboxes2 in bboxes[i + 1 :]:
+            for (xmin, ymin), (xmax, ymax) in bboxes1:
+                overlap = (
+                    (bboxes2[:, 0, 0] < xmax)
+                    & (xmin < bboxes2[:, 1, 0])
+                    & (bboxes2[:, 0, 1] < ymax)
+                    & (ymin < bboxes2[:, 1, 1])
+                )
+                assert not overlap.any()
+
+
+def test_get_routes_astar_rip_up() -> None:
+    """Routing the nets one by one fails, negotiating the channel does not."""
+    c, port_pairs = _pads_through_channel(npads=6, gap=120)
+    routes, stats = get_routes_astar(c, port_pairs, resolution=5, distance=10)
+    assert stats["converged"]
+    assert stats["iterations"] > 1
+
+
+def test_get_routes_astar_timeout() -> None:
+    c, port_pairs = _pads_through_channel(npads=2)
+    with pytest.warns(UserWarning):
+        routes, stats = get_routes_astar(c, port_pairs, resolution=5, timeout=0)
+    assert len(routes) == 2
+    assert not stats["converged"]
@@ -20,6 +20,90 @@ def test_hash_geometry() -> None:
     assert h1 != h2
 
 
+def test_hash_geometry_hierarchical() -> None:
+    """Test Merkle hash of the cell hierarchy."""
+    wg = gf.components.straight(length=10)
+    bend = gf.components.bend_circular()
+
+    def _component(name: str, order: int, dx: float = 0):
+        c = gf.Component(name)
+        refs = [(wg, (0, 0)), (bend, (20, 0)), (wg, (50 + dx, 0))]
+        for component, origin in refs[::order]:
+            c.add_ref(component).move(origin)
+        c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+        return c
+
+    c1 = _component("hash_hierarchical1", order=1)
+    c2 = _component("hash_hierarchical2", order=-1)
+    c3 = _component("hash_hierarchical3", order=1, dx=0.01)
+    h1 = c1.hash_geometry(hierarchical=True)
+    assert h1 == c2.hash_geometry(hierarchical=True)
+    assert h1 != c3.hash_geometry(hierarchical=True)
+    assert h1 != c1.hash_geometry()
+
+    # hashes of locked cells are cached
+    assert wg._geometry_hashes
+    assert not c1._geometry_hashes
+    c1.add_ref(wg).move((0, 10))
+    assert h1 != c1.hash_geometry(hierarchical=True)
+
+    # unlock clears the cached hash
+    c1.lock()
+    h2 = c1.hash_geometry(hierarchical=True)
+    assert c1._geometry_hashes
+    c1.unlock()
+    c1.add_polygon([(0, 0), (2, 0), (2, 2)], layer=(2, 0))
+    c1.lock()
+    assert h2 != c1.hash_geometry(hierarchical=True)
+
+
+
+def test_hash_geometry_hierarchical_child_changed() -> None:
+    """Editing a child clears the cached hashes of the cells referencing it."""
+    from gdsfactory.gdsdiff.gdsdiff import xor_polygons
+
+    def _parent(name: str) -> gf.Component:
+        child = gf.Component(f"{name}_child")
+        child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+        c = gf.Component(name)
+        c.add_ref(child)
+        child.lock()
+        c.lock()
+        return c
+
+    a = _parent("hash_child_changed_a")
+    b = _parent("hash_child_changed_b")
+    h = b.hash_geometry(hierarchical=True)
+    assert h == a.hash_geometry(hierarchical=True)
+    assert b._geometry_hashes
+
+    child = b.references[0].parent
+    child.remap_layers({(1, 0): (2, 0)})
+    assert h != b.hash_geometry(hierarchical=True)
+    assert xor_polygons(a, b).polygons
+
+    child.unlock()
+    child.remap_layers({(2, 0): (1, 0)})
+    assert h == b.hash_geometry(hierarchical=True)
+    # b is not cached while it references an unlocked cell
+    assert not b._geometry_hashes
+    child.add_polygon([(0, 0), (2, 0), (2, 2)], layer=(1, 0))
+    child.lock()
+    assert h != b.hash_geometry(hierarchical=True)
+    assert xor_polygons(a, b).polygons
+
+
+def test_hash_gds(tmp_path) -> None:
+    from gdsfactory.difftest import hash_gds
+
+    c = gf.components.mzi()
+    gdspath1 = c.write_gds(tmp_path / "a.gds")
+    gdspath2 = c.write_gds(tmp_path / "b.gds")
+    gdspath3 = gf.components.mzi(delta_length=11).write_gds(tmp_path / "c.gds")
+    assert hash_gds(gdspath1) == hash_gds(gdspath2)
+    assert hash_gds(gdspath1) != hash_gds(gdspath3)
+
+
 def _test_hash_array_file() -> None:
     """Test hash of a component with an array of references."""
     c = gf.Component("array")
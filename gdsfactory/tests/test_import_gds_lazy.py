@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import gdsfactory as gf
+from gdsfactory.read.import_gds import LazyComponent, get_gds_index, import_gds
+
+
+def test_import_gds_lazy(tmp_path) -> None:
+    """Lazy imports read ports from metadata and load geometry on first use."""
+    c0 = gf.components.mzi_lattice()
+    gdspath = c0.write_gds_with_metadata(tmp_path / "mzi_lattice.gds")
+
+    gf.clear_cache()
+    c1 = import_gds(gdspath, read_metadata=True)
+    gf.clear_cache()
+    c2 = import_gds(gdspath, read_metadata=True, lazy=True)
+
+    assert not c2.loaded
+    assert c2.name == c1.name
+    assert list(c2.ports) == list(c1.ports)
+    assert not c2.loaded
+
+    assert (c2.bbox == c1.bbox).all()
+    assert c2.loaded
+    assert abs(c2.area() - c1.area()) < 1e-3
+    assert sorted(c.name for c in c2.get_dependencies(recursive=True)) == sorted(
+        c.name for c in c1.get_dependencies(recursive=True)
+    )
+
+
+def test_import_gds_lazy_subcell(tmp_path) -> None:
+    """Importing a subcell only loads the cell and its dependencies."""
+    c0 = gf.components.mzi_lattice()
+    gdspath = c0.write_gds(tmp_path / "mzi_lattice.gds")
+    index = get_gds_index(gdspath)
+    top = index.top_cellnames[0]
+    cellname = index.children[top][0]
+
+    gf.clear_cache()
+    c1 = import_gds(gdspath, cellname=cellname, hashed_name=False)
+    gf.clear_cache()
+    c2 = import_gds(gdspath, cellname=cellname, hashed_name=False, lazy=True)
+
+    assert (c2.bbox == c1.bbox).all()
+    assert top not in c2._components
+    assert len(c2._components) == 1 + len(index.rawcells[cellname].dependencies(True))
+
+    # loading the top cell later reuses the already loaded subcell
+    top_component = LazyComponent(index, top, c2._components, hashed_name=False)
+    assert any(ref.parent is c2 for ref in top_component.references)
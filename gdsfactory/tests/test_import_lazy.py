@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import gdsfactory as gf
+
+
+def test_import_lazy() -> None:
+    code = (
+        "import sys, gdsfactory; "
+        "print([m for m in ('gdsfactory.components', 'gdsfactory.routing', "
+        "'gdsfactory.pdk') if m in sys.modules])"
+    )
+    p = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert p.stdout.strip().splitlines()[-1] == "[]", p.stdout
+
+
+# dir(gdsfactory) before the lazy imports, without dunder names
+dir_eager = (
+    "CONF Component ComponentReference CrossSection Group LAYER Label PATH Path "
+    "Pdk Port Section add_labels add_padding add_padding_container add_pins "
+    "add_ports add_tapers add_termination annotations asserts c call_if_func cell "
+    "cell_without_validator clear_cache component component_layout "
+    "component_reference components compose config constants containers "
+    "cross_section decorators difftest events export fill fill_rectangle "
+    "functions gdsdiff geometry get_active_pdk get_cell get_cells get_component "
+    "get_constant get_cross_section get_cross_section_factories get_factories "
+    "get_layer get_padding_points grid grid_with_text import_gds klive labels "
+    "layers materials name pack partial path pdk port read routing "
+    "serialization show snap symbols tech types write_cells"
+).split()
+
+
+def test_lazy_attributes() -> None:
+    import gdsfactory.grid  # noqa: F401
+
+    assert callable(gf.grid)
+    assert callable(gf.pack)
+    assert gf.c is gf.components
+    for name in gf.__all__:
+        assert getattr(gf, name) is not None, name
+    assert set(gf.__all__) <= set(dir(gf))
+
+    # every name of the eager gdsfactory namespace is available on first access
+    code = (
+        "import gdsfactory as gf; "
+        f"names = {dir_eager!r}; "
+        "print([n for n in names if n not in dir(gf)]); "
+        "print([n for n in names if getattr(gf, n, None) is None])"
+    )
+    p = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert p.stdout.strip().splitlines()[-2:] == ["[]", "[]"], p.stdout
+    assert gf.pdk.GENERIC
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 import gdsfactory as gf
 from gdsfactory.tech import LAYER
 
@@ -44,6 +46,24 @@ def test_extrude_transition():
     assert actual_area == expected_area
 
 
+def test_centerpoint_offset_curves() -> None:
+    """All section edges of a path are offset at once."""
+    p = gf.path.arc(radius=10, angle=90)
+    widths = np.linspace(1, 2, len(p.points))
+    curves = p._centerpoint_offset_curves(
+        p.points, [1, -1, widths], p.start_angle, p.end_angle
+    )
+    assert curves.shape == (3, len(p.points), 2)
+
+    radius = np.hypot(curves[..., 0], curves[..., 1] - 10)
+    assert np.allclose(radius[0], 11, atol=0.01)
+    assert np.allclose(radius[1], 9, atol=0.01)
+    assert np.allclose(radius[2], 10 + widths, atol=0.01)
+
+    curve = p._centerpoint_offset_curve(p.points, 1, p.start_angle, p.end_angle)
+    assert np.array_equal(curve, curves[0])
+
+
 if __name__ == "__main__":
     c = test_path_extrude_multiple_ports()
     c.show(show_ports=True)
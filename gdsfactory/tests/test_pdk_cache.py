@@ -0,0 +1,58 @@
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.cross_section import cross_sections, strip
+from gdsfactory.pdk import Pdk
+
+
+def test_get_cross_section_cache() -> None:
+    pdk = Pdk(name="cache", cross_sections=dict(cross_sections))
+    x1 = pdk.get_cross_section("strip", width=0.6)
+    assert pdk.get_cross_section("strip", width=0.6) == x1
+    assert (
+        pdk.get_cross_section(dict(cross_section="strip", settings=dict(width=0.6)))
+        == x1
+    )
+    assert pdk.get_cross_section(gf.partial(strip, width=0.6)) == x1
+    assert pdk.get_cross_section("strip", width=0.5) != x1
+
+    stats = pdk.get_stats()["cross_section"]
+    assert stats["calls"] == 5
+    assert stats["hits"] == 3
+
+    with pytest.warns(UserWarning):
+        pdk.register_cross_sections(strip=gf.partial(strip, layer=(2, 0)))
+    x2 = pdk.get_cross_section("strip", width=0.6)
+    assert x2 != x1
+    assert x2.layer == (2, 0)
+
+
+def test_get_cross_section_cache_copy() -> None:
+    """Modifying a cached CrossSection does not change the cache."""
+    pdk = Pdk(name="cache_copy", cross_sections=dict(cross_sections))
+    x1 = pdk.get_cross_section("pn")
+    x1.width = 2
+    x1.sections[0].width = 3
+    x1.sections.pop()
+    x1.info["key"] = "value"
+
+    x2 = pdk.get_cross_section("pn")
+    assert x2 == pdk.get_cross_section("pn")
+    assert x2 is not x1
+    assert x2.width != 2
+    assert x2.sections[0].width != 3
+    assert len(x2.sections) == len(x1.sections) + 1
+    assert "key" not in x2.info
+    assert pdk.get_stats()["cross_section"]["hits"] == 2
+
+    x2.sections[0].width = 3
+    assert pdk.get_cross_section("pn").sections[0].width != 3
+
+
+def test_get_component_lookup() -> None:
+    pdk = Pdk(name="lookup", cells=dict(straight=gf.components.straight))
+    pdk.cells["straight2"] = gf.components.straight
+    assert pdk.get_component("straight2", length=3).info["length"] == 3
+    with pytest.raises(ValueError):
+        pdk.get_component("unknown")
+    assert pdk.get_stats()["component"]["calls"] == 2
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import gdsfactory as gf
+from gdsfactory.port import Port
+from gdsfactory.routing import RoutingContext
+
+
+def _ports(n: int = 8):
+    ports1 = [Port(f"a{i}", 90, (i * 10.0, 0), 0.5, (1, 0)) for i in range(n)]
+    ports2 = [Port(f"b{i}", 270, (i * 10.0 + 100, 200), 0.5, (1, 0)) for i in range(n)]
+    return ports1, ports2
+
+
+def _references(routes):
+    return [
+        [(ref.parent.name, tuple(ref.origin), ref.rotation) for ref in route.references]
+        for route in routes
+    ]
+
+
+def test_routing_context_bundle() -> None:
+    context = RoutingContext(cross_section="strip")
+    routes = gf.routing.get_bundle(*_ports(), context=context)
+    assert _references(routes) == _references(gf.routing.get_bundle(*_ports()))
+
+    counters = context.to_dict()
+    assert counters["routes"] == 8
+    assert counters["straight_hits"] > 0
+    assert counters["straights"] == counters["straight_misses"]
+    assert counters["waypoint_time"] > 0
+    assert counters["geometry_time"] > 0
+
+    context.reset_stats()
+    assert context.routes == 0
+
+
+def test_routing_context_waypoints() -> None:
+    xs = gf.partial(gf.cross_section.strip, auto_widen=True)
+    context = RoutingContext(cross_section=xs)
+    waypoints = [(0, 0), (100, 0), (100, 100), (300, 100)]
+    route = gf.routing.get_route_from_waypoints(waypoints, context=context)
+    route_no_context = gf.routing.get_route_from_waypoints(
+        waypoints, cross_section=xs, taper=None
+    )
+    assert _references([route]) == _references([route_no_context])
+
+    route = gf.routing.get_route_from_waypoints(waypoints, context=context)
+    assert context.routes == 2
+    assert context.straight_hits == context.straight_misses
+    assert context.get_straight(10.0004) is context.get_straight(10.0)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.port import Port, _sort_ports_vectorized
+
+
+def test_sort_ports_vectorized() -> None:
+    """The NumPy sort for many ports matches the Python sort, including ties."""
+    rng = np.random.default_rng(0)
+    n = 200
+    orientations = rng.choice([0, 45, 90, 135, 180, 225, 270, 315, -90, None], n)
+    centers = rng.integers(0, 5, (n, 2))
+    ports = {
+        f"p{i}": Port(
+            name=f"p{i}",
+            orientation=orientations[i],
+            center=centers[i],
+            width=0.5,
+            layer=(1, 0),
+        )
+        for i in range(n)
+    }
+    assert list(_sort_ports_vectorized(ports, clockwise=True)) == list(
+        gf.port.sort_ports_clockwise(ports)
+    )
+    assert list(_sort_ports_vectorized(ports, clockwise=False)) == list(
+        gf.port.sort_ports_counter_clockwise(ports)
+    )
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+
+import gdsfactory as gf
+
+
+def test_spatial_index_query() -> None:
+    c = gf.Component("test_spatial_index_query")
+    rectangle = gf.components.rectangle(size=(10, 10), layer=(1, 0))
+    r1 = c << rectangle
+    r2 = c << rectangle
+    r2.move((100, 0))
+    polygon = c.add_polygon([(0, 50), (10, 50), (10, 60), (0, 60)], layer=(2, 0))
+
+    index = c.get_spatial_index(cell_size=20)
+    assert len(index) == 3
+    assert index.query(((-5, -5), (5, 5))) == [r1]
+    assert index.query(((10, 0), (20, 10))) == []
+    assert index.query(((10, 0), (20, 10)), distance=1) == [r1]
+    assert index.query(((0, 0), (200, 100))) == [r1, r2, polygon]
+    assert index.query(((0, 0), (200, 100)), layers=[(2, 0)]) == [polygon]
+    assert index.query(((0, 0), (200, 100)), polygons=False) == [r1, r2]
+
+    r3 = c << rectangle
+    r3.move((200, 200))
+    r2.move((0, 100))
+    assert index.query(((95, -5), (105, 5))) == []
+    assert index.query(((95, 95), (105, 105))) == [r2]
+    assert index.query(((195, 195), (205, 205))) == [r3]
+
+    c.remove(r3)
+    c.remove(polygon)
+    assert index.query(((0, 0), (300, 300))) == [r1, r2]
+
+
+def test_spatial_index_layers() -> None:
+    c = gf.Component("test_spatial_index_layers")
+    mmi = gf.components.mmi1x2()
+    ref = c << mmi
+    ref.rotate(90)
+    ref.mirror()
+    ref.move((10, 20))
+
+    bboxes = c.get_spatial_index().get_bboxes(layers=[(1, 0)])
+    expected = [(*p.min(axis=0), *p.max(axis=0)) for p in c.get_polygons((1, 0))]
+    assert np.allclose(np.sort(bboxes, axis=0), np.sort(expected, axis=0))
+
+
+def test_spatial_index_collisions() -> None:
+    c = gf.Component("test_spatial_index_collisions")
+    obstacle = c << gf.components.rectangle(size=(10, 10), layer=(1, 0))
+    obstacle.move((50, -5))
+
+    route = gf.routing.get_route_from_waypoints([(0, 0), (100, 0)])
+    collisions = c.get_spatial_index().get_collisions(route.references)
+    assert [other for _, other in collisions] == [obstacle]
+
+    route = gf.routing.get_route_from_waypoints([(0, 20), (100, 20)])
+    assert not c.get_spatial_index().get_collisions(route.references)
+    assert c.get_spatial_index().get_collisions(route.references, distance=20)
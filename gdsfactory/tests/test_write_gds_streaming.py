@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import gdstk
+import pytest
+
+import gdsfactory as gf
+
+
+def test_write_gds_streaming(tmpdir) -> None:
+    c = gf.components.mzi()
+    gdspath1 = c.write_gds(gdspath=tmpdir / "library.gds")
+    gdspath2 = c.write_gds(gdspath=tmpdir / "streaming.gds", streaming=True)
+
+    lib1 = gdstk.read_gds(gdspath1)
+    lib2 = gdstk.read_gds(gdspath2)
+
+    assert sorted(cell.name for cell in lib1.cells) == sorted(
+        cell.name for cell in lib2.cells
+    )
+    assert [cell.name for cell in lib2.top_level()] == [c.name]
+    assert lib1.top_level()[0].area() == lib2.top_level()[0].area()
+
+
+def test_write_gds_streaming_free_memory(tmpdir) -> None:
+    from gdsfactory.cell import CACHE
+
+    c = gf.components.straight(length=13)
+    area = c.area()
+    gdspath = c.write_gds(
+        gdspath=tmpdir / "streaming.gds", streaming=True, free_memory=True
+    )
+
+    assert c.name not in CACHE
+    assert not c.polygons
+    assert gdstk.read_gds(gdspath).top_level()[0].area() == area
+
+
+def test_write_gds_streaming_free_memory_shared_cell(tmpdir) -> None:
+    mzi = gf.components.mzi(length_x=0.15)
+    mmi = mzi.named_references["cp1"].parent
+    c = gf.Component("shares_mmi")
+    c << mmi
+    area = c.area()
+
+    mzi.write_gds(gdspath=tmpdir / "mzi.gds", streaming=True, free_memory=True)
+
+    assert mzi._freed
+    assert not mmi._freed
+    assert mmi.polygons
+    gdspath = c.write_gds(gdspath=tmpdir / "shares_mmi.gds")
+    assert gdstk.read_gds(gdspath).top_level()[0].area() == area
+
+    with pytest.raises(ValueError):
+        mzi.write_gds(gdspath=tmpdir / "mzi2.gds")
+    with pytest.raises(ValueError):
+        gf.Component() << mzi
+
+
+def _top(length: float) -> gf.Component:
+    c = gf.Component(f"top_incremental_{length}")
+    c << gf.components.mzi()
+    ref = c << gf.components.straight(length=length)
+    ref.movey(50)
+    c.name = "top_incremental"
+    return c
+
+
+def test_write_gds_incremental(tmpdir) -> None:
+    gdspath = tmpdir / "incremental.gds"
+    _top(length=10).write_gds(gdspath=gdspath, incremental=True)
+    data = gdspath.read_binary()
+
+    # nothing changed: all cells are copied from the previous file
+    _top(length=10).write_gds(gdspath=gdspath, incremental=True)
+    assert gdspath.read_binary() == data
+
+    c = _top(length=20)
+    c.write_gds(gdspath=gdspath, incremental=True)
+    gdspath_ref = c.write_gds(gdspath=tmpdir / "reference.gds")
+
+    lib = gdstk.read_gds(gdspath)
+    lib_ref = gdstk.read_gds(gdspath_ref)
+    areas = {cell.name: cell.area() for cell in lib.cells}
+    areas_ref = {cell.name: cell.area() for cell in lib_ref.cells}
+    assert areas == areas_ref
+
+
+def test_write_gds_incremental_locked_cell_changed(tmpdir) -> None:
+    """Locked cells edited between incremental writes are encoded again."""
+    gdspath = tmpdir / "incremental_locked.gds"
+    c = gf.Component("incremental_locked")
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    c.add_label("label", layer=(10, 0))
+    c.lock()
+
+    c.write_gds(gdspath=gdspath, incremental=True)
+    c.remap_layers({(1, 0): (2, 0)})
+    c.write_gds(gdspath=gdspath, incremental=True)
+    assert gdstk.read_gds(gdspath).layers_and_datatypes() == {(2, 0)}
+
+    c.remove_labels()
+    c.write_gds(gdspath=gdspath, incremental=True)
+    assert not gdstk.read_gds(gdspath).cells[0].labels
+
+    c.remove(c.polygons)
+    c.write_gds(gdspath=gdspath, incremental=True)
+    assert not gdstk.read_gds(gdspath).cells[0].polygons
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_write_gds_streaming(pathlib.Path(tempfile.mkdtemp()))